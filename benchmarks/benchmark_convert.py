@@ -0,0 +1,65 @@
+"""
+Benchmarks for copying meshes out of pymeshlab.
+
+``time_polygonal_face_list`` is how faces used to be extracted,
+``time_faces_to_numpy`` is the current conversion layer.
+
+Run with ``asv run`` or, for a quick look, ``python -m benchmarks.benchmark_convert``.
+"""
+import numpy as np
+import pymeshlab as ml
+
+from napari_pymeshlab._convert import faces_to_numpy, vertices_to_numpy
+
+
+def grid_mesh(n_faces):
+    """A flat triangulated grid with ``n_faces`` faces (rounded to even)."""
+    nx = int(np.sqrt(n_faces / 2))
+    ny = max(1, n_faces // (2 * nx))
+    y, x = np.mgrid[: ny + 1, : nx + 1]
+    vertices = np.column_stack([x.ravel(), y.ravel(), np.zeros(x.size)]).astype(
+        np.float64
+    )
+
+    corner = (np.arange(ny)[:, None] * (nx + 1) + np.arange(nx)).ravel()
+    faces = np.concatenate(
+        [
+            np.column_stack([corner, corner + 1, corner + nx + 1]),
+            np.column_stack([corner + 1, corner + nx + 2, corner + nx + 1]),
+        ]
+    ).astype(np.int32)
+    return ml.Mesh(vertices, faces)
+
+
+class FaceExtraction:
+    params = [100_000, 1_000_000]
+    param_names = ["n_faces"]
+
+    def setup(self, n_faces):
+        self.mesh = grid_mesh(n_faces)
+
+    def time_polygonal_face_list(self, n_faces):
+        np.asarray(self.mesh.polygonal_face_list())
+
+    def time_faces_to_numpy(self, n_faces):
+        faces_to_numpy(self.mesh)
+
+    def time_vertices_to_numpy(self, n_faces):
+        vertices_to_numpy(self.mesh)
+
+    def peakmem_polygonal_face_list(self, n_faces):
+        np.asarray(self.mesh.polygonal_face_list())
+
+    def peakmem_faces_to_numpy(self, n_faces):
+        faces_to_numpy(self.mesh)
+
+
+if __name__ == "__main__":
+    import timeit
+
+    for n in FaceExtraction.params:
+        bench = FaceExtraction()
+        bench.setup(n)
+        for name in ("time_polygonal_face_list", "time_faces_to_numpy"):
+            t = min(timeit.repeat(lambda: getattr(bench, name)(n), number=1, repeat=3))
+            print(f"{name:<28} {n:>9} faces  {1000 * t:9.1f} ms")
@@ -0,0 +1,118 @@
+"""
+Benchmarks for the surface filters of the widgets.
+
+Each filter runs through its synchronous twin in ``_widget.py``, with the
+widget's default parameters and without the filter cache.
+``DiscreteCurvature`` times the NumPy alternative to APSS, and
+``SparseSmoothing`` the sparse smoothing backend once the connectivity of the
+surface is cached. ``CleanMesh`` cleans up the triangle soup an STL file of
+the sphere would be, with every vertex repeated in each of its faces.
+
+Run with ``asv run`` or, for a quick look, ``python -m benchmarks.benchmark_filters``.
+"""
+import numpy as np
+
+import napari_pymeshlab
+from benchmarks.common import N_FACES, SLOW, quick_run, spheres
+from napari_pymeshlab import (
+    CurvatureType,
+    clean_mesh,
+    discrete_curvature,
+    sparse_laplacian_smooth,
+    sparse_taubin_smooth,
+)
+
+FILTERS = [
+    "convex_hull",
+    "laplacian_smooth",
+    "taubin_smooth",
+    "simplification_clustering_decimation",
+    "colorize_curvature_apss",
+]
+
+
+class Filters:
+    params = [N_FACES, FILTERS]
+    param_names = ["n_faces", "filter"]
+    timeout = SLOW["timeout"]
+    repeat = SLOW["repeat"]
+
+    def setup_cache(self):
+        return spheres()
+
+    def setup(self, surfaces, n_faces, name):
+        self.surface = surfaces[n_faces]
+        self.filter = getattr(napari_pymeshlab, name)
+
+    def time_filter(self, surfaces, n_faces, name):
+        self.filter(self.surface)
+
+    def peakmem_filter(self, surfaces, n_faces, name):
+        self.filter(self.surface)
+
+
+class DiscreteCurvature:
+    params = [N_FACES, [CurvatureType.mean.name, CurvatureType.gauss.name]]
+    param_names = ["n_faces", "curvature_type"]
+
+    def setup_cache(self):
+        return spheres()
+
+    def setup(self, surfaces, n_faces, curvature_type):
+        self.vertices, self.faces = surfaces[n_faces][:2]
+        self.curvature_type = CurvatureType[curvature_type]
+
+    def time_discrete_curvature(self, surfaces, n_faces, curvature_type):
+        discrete_curvature(self.vertices, self.faces, self.curvature_type)
+
+    def peakmem_discrete_curvature(self, surfaces, n_faces, curvature_type):
+        discrete_curvature(self.vertices, self.faces, self.curvature_type)
+
+
+class SparseSmoothing:
+    params = [N_FACES, ["laplacian", "taubin"]]
+    param_names = ["n_faces", "smoothing"]
+
+    def setup_cache(self):
+        return spheres()
+
+    def setup(self, surfaces, n_faces, smoothing):
+        self.vertices, self.faces = surfaces[n_faces][:2]
+        self.smooth = {
+            "laplacian": sparse_laplacian_smooth,
+            "taubin": sparse_taubin_smooth,
+        }[smoothing]
+        # build and cache the operator
+        self.smooth(self.vertices, self.faces, step_smooth_num=0)
+
+    def time_smooth(self, surfaces, n_faces, smoothing):
+        self.smooth(self.vertices, self.faces)
+
+    def peakmem_smooth(self, surfaces, n_faces, smoothing):
+        self.smooth(self.vertices, self.faces)
+
+
+class CleanMesh:
+    params = [N_FACES]
+    param_names = ["n_faces"]
+
+    def setup_cache(self):
+        return spheres()
+
+    def setup(self, surfaces, n_faces):
+        vertices, faces = surfaces[n_faces][:2]
+        self.vertices = vertices[faces].reshape(-1, 3)
+        self.faces = np.arange(len(self.vertices)).reshape(-1, 3)
+
+    def time_clean_mesh(self, surfaces, n_faces):
+        clean_mesh(self.vertices, self.faces)
+
+    def peakmem_clean_mesh(self, surfaces, n_faces):
+        clean_mesh(self.vertices, self.faces)
+
+
+if __name__ == "__main__":
+    quick_run(Filters)
+    quick_run(DiscreteCurvature)
+    quick_run(SparseSmoothing)
+    quick_run(CleanMesh)
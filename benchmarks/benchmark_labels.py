@@ -0,0 +1,51 @@
+"""
+Benchmarks for meshing every label of a label image with ``labels_to_surfaces``.
+
+The images hold a grid of balls of random radius, one label each.
+
+Run with ``asv run`` or, for a quick look, ``python -m benchmarks.benchmark_labels``.
+"""
+import numpy as np
+
+from benchmarks.common import quick_run
+from napari_pymeshlab import labels_to_surfaces
+
+# number of labels along y and x; the images are 4 balls deep
+GRIDS = [8, 16, 32]
+
+
+def ball_labels(n, spacing=16):
+    """Label image of ``4 * n * n`` balls, of radius 3 to 7 voxels."""
+    rng = np.random.default_rng(0)
+    shape = (4 * spacing, n * spacing, n * spacing)
+    labels = np.zeros(shape, dtype=np.int32)
+    centers = np.stack(
+        np.meshgrid(*(np.arange(spacing // 2, s, spacing) for s in shape)),
+        axis=-1,
+    ).reshape(-1, 3)
+    radius = spacing // 2
+    z, y, x = np.ogrid[-radius:radius, -radius:radius, -radius:radius]
+    squared = z**2 + y**2 + x**2
+    for label_id, center in enumerate(centers, 1):
+        box = tuple(slice(c - radius, c + radius) for c in center)
+        labels[box][squared < rng.uniform(3, 7) ** 2] = label_id
+    return labels
+
+
+class MeshLabels:
+    params = [GRIDS, [0, 5]]
+    param_names = ["grid", "decimation_percentage"]
+    timeout = 300
+
+    def setup_cache(self):
+        return {n: ball_labels(n) for n in GRIDS}
+
+    def setup(self, images, grid, decimation_percentage):
+        self.labels = images[grid]
+
+    def time_labels_to_surfaces(self, images, grid, decimation_percentage):
+        labels_to_surfaces(self.labels, decimation_percentage=decimation_percentage)
+
+
+if __name__ == "__main__":
+    quick_run(MeshLabels)
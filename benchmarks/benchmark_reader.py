@@ -0,0 +1,40 @@
+"""
+Benchmarks for reading surfaces with ``mesh_reader``.
+
+Binary PLY and STL go through the native readers, OBJ and OFF through
+pymeshlab. The on-disk mesh cache is bypassed.
+
+Run with ``asv run`` or, for a quick look, ``python -m benchmarks.benchmark_reader``.
+"""
+import os
+
+from benchmarks.common import N_FACES, quick_run, spheres
+from napari_pymeshlab import mesh_reader, write_single_surface
+
+EXTENSIONS = [".ply", ".stl", ".obj", ".off"]
+
+
+class ReadSurface:
+    params = [N_FACES, EXTENSIONS]
+    param_names = ["n_faces", "extension"]
+    timeout = 300
+
+    def setup_cache(self):
+        # asv runs this in a temporary directory it removes afterwards
+        for n_faces, surface in spheres().items():
+            for extension in EXTENSIONS:
+                write_single_surface(f"{n_faces}{extension}", surface, {})
+        return os.getcwd()
+
+    def setup(self, directory, n_faces, extension):
+        self.path = os.path.join(directory, f"{n_faces}{extension}")
+
+    def time_mesh_reader(self, directory, n_faces, extension):
+        mesh_reader(self.path, use_cache=False)
+
+    def peakmem_mesh_reader(self, directory, n_faces, extension):
+        mesh_reader(self.path, use_cache=False)
+
+
+if __name__ == "__main__":
+    quick_run(ReadSurface)
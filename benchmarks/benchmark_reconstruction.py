@@ -0,0 +1,47 @@
+"""
+Benchmarks for screened Poisson reconstruction.
+
+The points are the vertices of the benchmark icospheres (about 10k, 40k and
+650k points), reconstructed with the widget's default parameters.
+
+The widget runs the reconstruction in a worker process, whose memory asv's
+``peakmem`` does not see, so the reconstruction itself is measured in the
+benchmark process. ``time_screened_poisson_steps`` times the widget's path,
+worker process included.
+
+Run with ``asv run`` or, for a quick look,
+``python -m benchmarks.benchmark_reconstruction``.
+"""
+from benchmarks.common import N_FACES, SLOW, quick_run, spheres
+from napari_pymeshlab._background import run_steps
+from napari_pymeshlab._reconstruction import (
+    _params,
+    _reconstruct_points,
+    screened_poisson_steps,
+)
+
+
+class ScreenedPoisson:
+    params = N_FACES
+    param_names = ["n_faces"]
+    timeout = SLOW["timeout"]
+    repeat = SLOW["repeat"]
+
+    def setup_cache(self):
+        return {n_faces: surface[0] for n_faces, surface in spheres().items()}
+
+    def setup(self, points, n_faces):
+        self.points = points[n_faces]
+
+    def time_screened_poisson(self, points, n_faces):
+        _reconstruct_points(_params(), self.points)
+
+    def peakmem_screened_poisson(self, points, n_faces):
+        _reconstruct_points(_params(), self.points)
+
+    def time_screened_poisson_steps(self, points, n_faces):
+        run_steps(screened_poisson_steps(self.points))
+
+
+if __name__ == "__main__":
+    quick_run(ScreenedPoisson)
@@ -0,0 +1,33 @@
+"""
+Benchmarks for the synthetic sample data used as benchmark and load test inputs.
+
+Run with ``asv run`` or ``python -m benchmarks.benchmark_sample_data``.
+"""
+from benchmarks.common import quick_run
+from napari_pymeshlab import make_shell, make_sphere
+
+
+class MakeSphere:
+    # about 20k, 1.3M and 21M faces
+    params = [5, 8, 10]
+    param_names = ["subdiv"]
+    timeout = 300
+
+    def time_make_sphere(self, subdiv):
+        make_sphere(subdiv=subdiv)
+
+    def peakmem_make_sphere(self, subdiv):
+        make_sphere(subdiv=subdiv)
+
+
+class MakeShell:
+    params = [10_000, 1_000_000, 10_000_000]
+    param_names = ["n_points"]
+
+    def time_make_shell(self, n_points):
+        make_shell(n_points, seed=0)
+
+
+if __name__ == "__main__":
+    quick_run(MakeSphere)
+    quick_run(MakeShell)
@@ -0,0 +1,54 @@
+"""
+Benchmarks for writing surfaces.
+
+``time_pymeshlab`` is how surfaces used to be written, through a ``MeshSet``.
+``time_write_single_surface`` streams PLY, STL and OBJ natively and still
+goes through pymeshlab for OFF.
+
+Run with ``asv run`` or, for a quick look, ``python -m benchmarks.benchmark_writer``.
+"""
+import os
+import tempfile
+
+import pymeshlab as ml
+
+from benchmarks.common import N_FACES, quick_run, spheres
+from napari_pymeshlab import write_single_surface
+
+
+class WriteSurface:
+    params = [N_FACES, [".ply", ".stl", ".obj", ".off"]]
+    param_names = ["n_faces", "extension"]
+    timeout = 300
+
+    def setup_cache(self):
+        return spheres()
+
+    def setup(self, surfaces, n_faces, extension):
+        self.surface = surfaces[n_faces]
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "surface" + extension)
+
+    def teardown(self, surfaces, n_faces, extension):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rmdir(self.directory)
+
+    def time_pymeshlab(self, surfaces, n_faces, extension):
+        vertices, faces, colors = self.surface
+        ms = ml.MeshSet()
+        ms.add_mesh(ml.Mesh(vertices, faces, v_color_matrix=colors.T))
+        ms.save_current_mesh(self.path)
+
+    def time_write_single_surface(self, surfaces, n_faces, extension):
+        write_single_surface(self.path, self.surface, {})
+
+    def peakmem_pymeshlab(self, surfaces, n_faces, extension):
+        self.time_pymeshlab(surfaces, n_faces, extension)
+
+    def peakmem_write_single_surface(self, surfaces, n_faces, extension):
+        self.time_write_single_surface(surfaces, n_faces, extension)
+
+
+if __name__ == "__main__":
+    quick_run(WriteSurface)
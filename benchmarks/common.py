@@ -0,0 +1,65 @@
+"""
+Synthetic meshes and helpers shared by the benchmarks.
+
+Sizes are face counts of icospheres from ``make_sphere``, which have
+``20 * 4**subdiv`` faces: about 20k, 80k and 1.3M.
+"""
+import itertools
+import math
+import os
+import tempfile
+import time
+
+from napari_pymeshlab import make_sphere
+
+N_FACES = [20_480, 81_920, 1_310_720]
+
+# the slow benchmarks run at most a few times, for at most a minute
+SLOW = dict(timeout=900, repeat=(1, 3, 60.0))
+
+
+def sphere(n_faces):
+    """Surface data of an icosphere with ``n_faces`` faces."""
+    subdiv = round(math.log(n_faces / 20, 4))
+    if 20 * 4**subdiv != n_faces:
+        raise ValueError(f"No icosphere has {n_faces} faces")
+    return make_sphere(subdiv=subdiv)[0][0]
+
+
+def spheres(sizes=N_FACES):
+    """Surface data of icospheres, by number of faces."""
+    return {n_faces: sphere(n_faces) for n_faces in sizes}
+
+
+def quick_run(cls):
+    """Run every ``time_`` benchmark of ``cls`` once per parameter set.
+
+    A quick look without asv; use ``asv run`` for numbers worth comparing.
+    Like asv, this runs everything in a temporary working directory.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            _quick_run(cls)
+        finally:
+            os.chdir(cwd)
+
+
+def _quick_run(cls):
+    params = [cls.params] if len(cls.param_names) == 1 else cls.params
+    cache = (cls().setup_cache(),) if hasattr(cls, "setup_cache") else ()
+    names = sorted(name for name in dir(cls) if name.startswith("time_"))
+    for combination in itertools.product(*params):
+        args = cache + combination
+        bench = cls()
+        if hasattr(bench, "setup"):
+            bench.setup(*args)
+        for name in names:
+            start = time.perf_counter()
+            getattr(bench, name)(*args)
+            elapsed = 1000 * (time.perf_counter() - start)
+            label = " ".join(str(p) for p in combination)
+            print(f"{cls.__name__}.{name:<28} {label:<40} {elapsed:9.1f} ms")
+        if hasattr(bench, "teardown"):
+            bench.teardown(*args)
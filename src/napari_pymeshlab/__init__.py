@@ -1,16 +1,70 @@
 __version__ = "0.0.6"
 
+# Public names are imported on first access, so that napari can discover the
+# plugin and probe files with ``get_mesh_reader`` without loading pymeshlab,
+# napari.layers or magicgui.
+_LAZY_IMPORTS = {
+    "get_mesh_reader": "_reader",
+    "mesh_reader": "_reader",
+    "clear_mesh_cache": "_cache",
+    "mesh_cache": "_cache",
+    "probe_mesh": "_probe",
+    "MeshSequence": "_sequence",
+    "find_sequences": "_sequence",
+    "attach_sequence": "_sequence",
+    "write_single_surface": "_writer",
+    "write_multiple": "_writer",
+    "make_sphere": "_sample_data",
+    "make_shell": "_sample_data",
+    "make_bunny": "_sample_data",
+    "screened_poisson_reconstruction": "_widget",
+    "convex_hull": "_widget",
+    "laplacian_smooth": "_widget",
+    "taubin_smooth": "_widget",
+    "simplification_clustering_decimation": "_widget",
+    "colorize_curvature_apss": "_widget",
+    "lod_pyramid": "_widget",
+    "mesh_labels": "_widget",
+    "labels_to_surfaces": "_labels",
+    "build_lod_pyramid": "_lod",
+    "decimate_to": "_lod",
+    "batch_apply": "_batch",
+    "batch_convex_hull": "_batch",
+    "batch_laplacian_smooth": "_batch",
+    "batch_taubin_smooth": "_batch",
+    "batch_simplification_clustering_decimation": "_batch",
+    "batch_colorize_curvature_apss": "_batch",
+    "voxel_downsample": "_downsample",
+    "filter_cache": "_memo",
+    "MeshPipeline": "_pipeline",
+    "CurvatureType": "_pipeline",
+    "CurvatureBackend": "_curvature",
+    "discrete_curvature": "_curvature",
+    "SmoothingBackend": "_smooth",
+    "sparse_laplacian_smooth": "_smooth",
+    "sparse_taubin_smooth": "_smooth",
+    "clean_mesh": "_clean",
+    "clean_surface": "_clean",
+    "profiling": "_instrument",
+    "set_profiling": "_instrument",
+    "format_records": "_instrument",
+    "set_precision": "_convert",
+    "get_precision": "_convert",
+}
 
-from ._reader import get_mesh_reader, mesh_reader  # noqa
-from ._writer import write_single_surface  # noqa , write_multiple
-from ._sample_data import make_sphere, make_shell  # noqa
-from ._widget import (
-    screened_poisson_reconstruction,  # noqa
-)  # ExampleQWidget, example_magic_widget
-from ._widget import (
-    convex_hull,  # noqa
-    laplacian_smooth,  # noqa
-    taubin_smooth,  # noqa
-    simplification_clustering_decimation,  # noqa
-    colorize_curvature_apss,  # noqa
-)
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    value = getattr(import_module(f".{_LAZY_IMPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
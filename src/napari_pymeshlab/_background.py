@@ -0,0 +1,120 @@
+"""
+Run widget work in napari worker threads.
+
+pymeshlab releases the GIL while a filter runs, so running the filters in a
+worker thread keeps the viewer responsive. Work is split into steps by a
+generator; each ``yield`` advances the progress bar in napari's activity dock
+and is a point where the run can be cancelled. A filter that is already
+running inside MeshLab cannot be interrupted, so a cancelled run stops at the
+end of its current step and its result is discarded.
+"""
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Set
+
+from ._instrument import stage
+
+# workers still running, by the name of the widget that started them
+_RUNNING: Dict[Optional[str], Set[Any]] = {}
+
+
+def _staged(steps, name, *args, **kwargs):
+    # the whole run is one stage, around the stages of the steps
+    with stage(name):
+        return (yield from steps(*args, **kwargs))
+
+
+def run_in_background(steps, *args, desc=None, total=0, empty=None, **kwargs):
+    """Run the generator function ``steps(*args, **kwargs)`` in a worker.
+
+    Parameters
+    ----------
+    steps: callable
+        Generator function. Its return value is the result of the run.
+    desc: str, optional
+        Label of the progress bar, and the name under which the run can be
+        cancelled with :func:`cancel`.
+    total: int, optional
+        Number of times ``steps`` yields, for the progress bar. If that is not
+        known in advance, ``steps`` can yield the number of times it has yet
+        to yield, counting that yield, once it is.
+    empty: optional
+        Result if the run is cancelled or fails. napari adds nothing to the
+        viewer for ``None`` or an empty list of layer data tuples. Errors are
+        still shown as napari notifications.
+
+    Returns
+    -------
+    concurrent.futures.Future
+        napari adds the result to the viewer once the future is done.
+    """
+    from napari.qt.threading import create_worker
+
+    future = Future()
+    worker = create_worker(
+        _staged,
+        steps,
+        desc or steps.__name__,
+        *args,
+        _progress={"total": total, "desc": desc},
+        **kwargs,
+    )
+    running = _RUNNING.setdefault(desc, set())
+    running.add(worker)
+
+    def _on_finished():
+        running.discard(worker)
+        if not future.done():
+            future.set_result(empty)
+
+    def _on_yielded(value):
+        pbar = getattr(worker, "pbar", None)
+        if isinstance(value, int) and pbar is not None:
+            pbar.total = pbar.n + value - 1
+
+    worker.yielded.connect(_on_yielded)
+    worker.returned.connect(future.set_result)
+    worker.finished.connect(_on_finished)
+    worker.start()
+    return future
+
+
+def run_steps(steps, progress=None):
+    """Run the generator ``steps`` to the end in this thread.
+
+    Parameters
+    ----------
+    steps: generator
+        As made by the generator functions :func:`run_in_background` takes.
+    progress: callable, optional
+        Called with every value ``steps`` yields.
+
+    Returns
+    -------
+    The return value of ``steps``.
+    """
+    while True:
+        try:
+            value = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        if progress is not None:
+            progress(value)
+
+
+def cancel(desc):
+    """Cancel all runs started under the name ``desc``."""
+    for worker in list(_RUNNING.get(desc, ())):
+        worker.quit()
+
+
+def add_cancel_button(desc):
+    """``widget_init`` for ``magic_factory`` adding a button calling :func:`cancel`."""
+
+    def _widget_init(widget):
+        from magicgui.widgets import PushButton
+
+        button = PushButton(text="Cancel")
+        button.changed.connect(lambda: cancel(desc))
+        widget.append(button)
+
+    return _widget_init
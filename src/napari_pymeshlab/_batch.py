@@ -0,0 +1,146 @@
+"""
+Batch versions of the surface filters.
+
+Each function applies one filter to a sequence of surfaces in a process pool.
+Input and output arrays go through shared memory rather than being pickled.
+Results come back in input order. A surface that fails does not stop the batch:
+its slot in the results holds an ``ItemError`` and a warning is emitted.
+"""
+import warnings
+from functools import partial
+from typing import List, Optional, Sequence, Union
+
+from ._curvature import CurvatureBackend
+from ._parallel import ItemError, map_shared
+from ._pipeline import CurvatureType
+from ._smooth import SmoothingBackend
+from ._widget import (
+    colorize_curvature_apss,
+    convex_hull,
+    laplacian_smooth,
+    simplification_clustering_decimation,
+    taubin_smooth,
+)
+
+
+def _apply(func, args, kwargs, surface):
+    return func(tuple(surface), *args, **kwargs)
+
+
+def batch_apply(
+    func, surfaces, *args, n_workers=None, **kwargs
+) -> List[Union[tuple, ItemError]]:
+    """Apply ``func(surface, *args, **kwargs)`` to every surface.
+
+    Parameters
+    ----------
+    func: callable
+        A module-level function taking ``napari.types.SurfaceData`` first.
+    surfaces: iterable of napari.types.SurfaceData
+        Consumed as workers become free, so a generator loading surfaces one
+        at a time keeps only a few of them in memory.
+    n_workers: int, optional
+        Number of processes. Defaults to one per surface, up to the CPU
+        count. With 1, surfaces are processed in this process.
+
+    Returns
+    -------
+    list
+        One ``napari.types.SurfaceData`` per surface, or an ``ItemError`` for
+        the surfaces that failed.
+    """
+    work = partial(_apply, func, args, kwargs)
+
+    if n_workers == 1:
+        results = []
+        for i, surface in enumerate(surfaces):
+            try:
+                results.append(work(surface))
+            except Exception as e:  # noqa: BLE001
+                results.append(ItemError(i, repr(e)))
+    else:
+        results = map_shared(
+            work, surfaces, n_workers, share_inputs=True, return_errors=True
+        )
+
+    errors = [r for r in results if isinstance(r, ItemError)]
+    if errors:
+        warnings.warn(
+            f"{len(errors)} of {len(results)} surfaces failed in "
+            f"{getattr(func, '__name__', func)}: " + "; ".join(map(str, errors))
+        )
+    return results
+
+
+def batch_convex_hull(surfaces: Sequence, n_workers: Optional[int] = None):
+    """Batch version of :func:`convex_hull`, see :func:`batch_apply`."""
+    return batch_apply(convex_hull, surfaces, n_workers=n_workers)
+
+
+def batch_laplacian_smooth(
+    surfaces: Sequence,
+    step_smooth_num: int = 10,
+    backend: SmoothingBackend = SmoothingBackend.pymeshlab,
+    n_workers: Optional[int] = None,
+):
+    """Batch version of :func:`laplacian_smooth`, see :func:`batch_apply`."""
+    return batch_apply(
+        laplacian_smooth, surfaces, step_smooth_num, backend, n_workers=n_workers
+    )
+
+
+def batch_taubin_smooth(
+    surfaces: Sequence,
+    lambda_: float = 0.5,
+    mu: float = -0.53,
+    step_smooth_num: int = 10,
+    backend: SmoothingBackend = SmoothingBackend.pymeshlab,
+    n_workers: Optional[int] = None,
+):
+    """Batch version of :func:`taubin_smooth`, see :func:`batch_apply`."""
+    return batch_apply(
+        taubin_smooth,
+        surfaces,
+        lambda_,
+        mu,
+        step_smooth_num,
+        backend,
+        n_workers=n_workers,
+    )
+
+
+def batch_simplification_clustering_decimation(
+    surfaces: Sequence, threshold_percentage: float = 1, n_workers: Optional[int] = None
+):
+    """Batch version of :func:`simplification_clustering_decimation`, see
+    :func:`batch_apply`."""
+    return batch_apply(
+        simplification_clustering_decimation,
+        surfaces,
+        threshold_percentage,
+        n_workers=n_workers,
+    )
+
+
+def batch_colorize_curvature_apss(
+    surfaces: Sequence,
+    filter_scale: float = 2,
+    projection_accuracy: float = 0.0001,
+    max_projection_iterations: int = 15,
+    spherical_parameter: float = 1,
+    curvature_type: CurvatureType = CurvatureType.mean,
+    backend: CurvatureBackend = CurvatureBackend.apss,
+    n_workers: Optional[int] = None,
+):
+    """Batch version of :func:`colorize_curvature_apss`, see :func:`batch_apply`."""
+    return batch_apply(
+        colorize_curvature_apss,
+        surfaces,
+        filter_scale,
+        projection_accuracy,
+        max_projection_iterations,
+        spherical_parameter,
+        curvature_type,
+        backend,
+        n_workers=n_workers,
+    )
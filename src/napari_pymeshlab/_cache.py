@@ -0,0 +1,193 @@
+"""
+On-disk cache of parsed meshes.
+
+Parsed arrays are stored as uncompressed ``.npy`` files, one directory per
+mesh, and read back memory-mapped, so opening a cached file is close to free
+and does not hold a second copy in RAM. Entries are keyed on the path, size,
+modification time and a hash of (a sample of) the file content, and the least
+recently used entries are evicted once the cache grows past ``max_bytes``.
+
+The cache is off unless ``NAPARI_PYMESHLAB_CACHE=1`` is set or
+``mesh_reader`` is called with ``use_cache=True``. Clear it with
+``clear_mesh_cache()`` or ``napari-pymeshlab-cache clear``.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from ._convert import get_precision
+
+_NAMES = ("vertices", "faces", "colors")
+
+# bumped when the layout of the stored arrays changes, so that older entries
+# are missed rather than read wrong
+_FORMAT_VERSION = 2
+
+# files larger than this are hashed from samples rather than in full
+_FULL_HASH_BYTES = 16 * 1024**2
+_SAMPLE_BYTES = 64 * 1024
+_N_SAMPLES = 64
+
+
+def _default_directory():
+    root = os.environ.get("XDG_CACHE_HOME", os.path.join("~", ".cache"))
+    return os.path.join(os.path.expanduser(root), "napari-pymeshlab", "meshes")
+
+
+def _content_hash(path, size):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= _FULL_HASH_BYTES:
+            h.update(f.read())
+        else:
+            # evenly spaced samples, always including the first and last block
+            for offset in np.linspace(0, size - _SAMPLE_BYTES, _N_SAMPLES):
+                f.seek(int(offset))
+                h.update(f.read(_SAMPLE_BYTES))
+    return h.hexdigest()
+
+
+def _entry_bytes(entry):
+    return sum(e.stat().st_size for e in os.scandir(entry) if e.is_file())
+
+
+class MeshCache:
+    """Read-through cache of parsed mesh arrays.
+
+    Parameters
+    ----------
+    directory: str, optional
+        Where entries are stored. Defaults to ``$NAPARI_PYMESHLAB_CACHE_DIR``
+        or ``~/.cache/napari-pymeshlab/meshes``.
+    max_bytes: int, optional
+        Size cap of the cache. Defaults to ``$NAPARI_PYMESHLAB_CACHE_MAX_BYTES``
+        or 8 GiB.
+    enabled: bool, optional
+        Whether ``mesh_reader`` uses the cache by default. Defaults to
+        ``$NAPARI_PYMESHLAB_CACHE``.
+    """
+
+    def __init__(self, directory=None, max_bytes=None, enabled=None):
+        if directory is None:
+            directory = os.environ.get(
+                "NAPARI_PYMESHLAB_CACHE_DIR", _default_directory()
+            )
+        if max_bytes is None:
+            max_bytes = int(
+                os.environ.get("NAPARI_PYMESHLAB_CACHE_MAX_BYTES", 8 * 1024**3)
+            )
+        if enabled is None:
+            enabled = os.environ.get("NAPARI_PYMESHLAB_CACHE", "0") == "1"
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+    def key(self, path):
+        """Cache key of the file at ``path`` in its current state."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        h = hashlib.blake2b(digest_size=16)
+        # arrays are stored in the precision they were parsed in
+        h.update(f"{_FORMAT_VERSION}:{get_precision()}:{path}".encode())
+        h.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+        h.update(_content_hash(path, stat.st_size).encode())
+        return h.hexdigest()
+
+    def get(self, path):
+        """Memory-mapped arrays for ``path``, or None on a miss."""
+        return self.load(self.key(path))
+
+    def put(self, path, arrays):
+        """Store the parsed ``arrays`` of ``path`` and evict old entries."""
+        self.store(self.key(path), arrays)
+
+    def load(self, key):
+        """Memory-mapped arrays stored under ``key``, or None on a miss."""
+        entry = os.path.join(self.directory, key)
+        try:
+            arrays = tuple(
+                np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r")
+                for name in _NAMES
+            )
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(entry)  # mark as recently used
+        return arrays
+
+    def store(self, key, arrays):
+        """Store vertices, faces and per-vertex colors or values under ``key``.
+
+        ``key`` must be usable as a directory name. Old entries are evicted
+        once the cache is over ``max_bytes``.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = os.path.join(self.directory, key)
+        if os.path.isdir(entry):
+            return
+
+        # write to a temporary directory first, so readers never see a
+        # partially written entry
+        tmp = tempfile.mkdtemp(dir=self.directory, prefix=".tmp-")
+        try:
+            for name, array in zip(_NAMES, arrays):
+                np.save(os.path.join(tmp, f"{name}.npy"), array)
+            os.replace(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(entry):
+                raise
+        self.evict()
+
+    def size(self):
+        """Total size of all entries, in bytes."""
+        return sum(_entry_bytes(entry) for entry in self._entries())
+
+    def evict(self):
+        """Remove least recently used entries until under ``max_bytes``."""
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        sizes = [_entry_bytes(entry) for entry in entries]
+        total = sum(sizes)
+        for entry, size in zip(entries, sizes):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry.path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove every entry."""
+        for entry in self._entries():
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            e
+            for e in os.scandir(self.directory)
+            if e.is_dir() and not e.name.startswith(".")
+        ]
+
+
+mesh_cache = MeshCache()
+
+
+def clear_mesh_cache():
+    """Remove every entry from the mesh cache."""
+    mesh_cache.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="napari-pymeshlab-cache",
+        description="Manage the napari-pymeshlab parsed mesh cache.",
+    )
+    parser.add_argument("command", choices=["clear", "info"])
+    args = parser.parse_args(argv)
+
+    if args.command == "clear":
+        clear_mesh_cache()
+    print(f"{mesh_cache.directory}: {mesh_cache.size() / 1024**2:.1f} MiB")
@@ -0,0 +1,175 @@
+"""
+Vectorized cleaning of triangle meshes.
+
+Surfaces from ``marching_cubes`` and STL files come with duplicate vertices,
+faces of zero area and faces listed twice. None of them change the shape, but
+every filter pays for them, and APSS curvature fits a sphere around each
+duplicate vertex again. Cleaning them up in NumPy takes a few sorts:
+
+* vertices are merged on a grid, whose cells are packed into one integer key
+  per vertex, so vertices in the same cell are merged by sorting the keys,
+* faces with a repeated corner or no area, and copies of a face, whatever
+  their orientation, are dropped,
+* vertices no face refers to anymore are dropped.
+
+The first of the vertices merged into one keeps its position, and so do the
+vertex order and the face order, so a clean mesh comes out unchanged.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from ._convert import FACE_DTYPE, as_vertices
+from ._instrument import stage
+
+# ``vertex_map`` gives the index in the clean mesh of every input vertex, or
+# -1 for vertices dropped with the faces using them
+CleanedMesh = namedtuple("CleanedMesh", ["vertices", "faces", "vertex_map"])
+
+
+def _grid_keys(vertices, tolerance):
+    """A key per vertex, equal for vertices in the same grid cell."""
+    if tolerance <= 0 or not len(vertices):
+        # vertices are merged only if they are equal: compare their bytes,
+        # once -0.0 is 0.0
+        rows = np.ascontiguousarray(vertices, dtype=np.float64) + 0.0
+        return rows.view(np.dtype((np.void, rows.itemsize * 3))).ravel()
+    # cells are centred on multiples of the tolerance, so that vertices near
+    # round coordinates, which are common, are not split by a cell boundary
+    cells = np.rint(np.asarray(vertices, dtype=np.float64) / tolerance)
+    cells = (cells - cells.min(axis=0)).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    if np.prod(dims.astype(float)) < 2**62:
+        return np.ravel_multi_index(tuple(cells.T), dims)
+    return cells.view(np.dtype((np.void, 8 * 3))).ravel()
+
+
+def _first_ids(keys):
+    """Ids of equal keys, numbered in the order of their first occurrence.
+
+    Returns
+    -------
+    ids: np.ndarray
+        Id of every key.
+    first: np.ndarray
+        Index of the first key of every id.
+    """
+    if not len(keys):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    sorted_ids = np.cumsum(starts) - 1
+    # the stable sort puts the first occurrence at the start of every run
+    first = order[starts]
+    renumber = np.empty(len(first), dtype=np.intp)
+    renumber[np.argsort(first)] = np.arange(len(first))
+    ids = np.empty(len(keys), dtype=np.intp)
+    ids[order] = renumber[sorted_ids]
+    return ids, np.sort(first)
+
+
+def _degenerate(vertices, faces):
+    """Faces with a repeated corner or of zero area."""
+    a, b, c = faces.T
+    repeated = (a == b) | (b == c) | (c == a)
+    p0 = vertices[a]
+    cross = np.cross(vertices[b] - p0, vertices[c] - p0)
+    return repeated | ~cross.any(axis=1)
+
+
+def _face_keys(faces, n_vertices):
+    """A key per face, equal for faces with the same corners."""
+    corners = np.sort(faces, axis=1).astype(np.int64)
+    if float(n_vertices) ** 3 < 2**62:
+        return np.ravel_multi_index(tuple(corners.T), (n_vertices,) * 3)
+    return corners.view(np.dtype((np.void, 8 * 3))).ravel()
+
+
+def clean_mesh(vertices, faces, tolerance=0):
+    """Merge duplicate vertices and drop degenerate and duplicate faces.
+
+    Parameters
+    ----------
+    vertices: np.ndarray
+        ``(N, 3)`` vertex coordinates.
+    faces: np.ndarray
+        ``(M, 3)`` vertex indices of the triangles.
+    tolerance: float, optional
+        Size of the grid cells vertices are merged in; 0 merges equal
+        vertices only. Vertices closer than ``tolerance`` on either side of a
+        cell boundary are not merged.
+
+    Returns
+    -------
+    CleanedMesh
+        Vertices, faces, and the index in the clean mesh of every input
+        vertex, see :func:`take_vertices`.
+    """
+    vertices = np.asarray(vertices)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    n_vertices = len(vertices)
+
+    with stage("clean", n_vertices, len(faces)) as s:
+        merged, first = _first_ids(_grid_keys(vertices, tolerance))
+        unique = vertices[first]
+        faces = merged[faces]
+
+        faces = faces[~_degenerate(unique, faces)]
+        _, kept = _first_ids(_face_keys(faces, len(unique)))
+        faces = faces[kept]
+
+        used = np.zeros(len(unique), dtype=bool)
+        used[faces.ravel()] = True
+        compact = np.cumsum(used) - 1
+        compact[~used] = -1
+        faces = compact[faces]
+        vertex_map = compact[merged]
+        vertices = as_vertices(unique[used])
+        s.output(len(vertices), len(faces))
+    return CleanedMesh(vertices, faces.astype(FACE_DTYPE), vertex_map)
+
+
+def take_vertices(values, vertex_map):
+    """Per-vertex ``values`` carried over to the vertices of a clean mesh.
+
+    Every vertex of the clean mesh takes the values of the first input vertex
+    merged into it.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        Values of the input vertices, along the last axis, as surface values
+        with a time dimension, or along the first, as ``(N, 4)`` colors.
+    vertex_map: np.ndarray
+        From :func:`clean_mesh`.
+
+    Returns
+    -------
+    np.ndarray
+    """
+    values = np.asarray(values)
+    new_ids, first = np.unique(vertex_map, return_index=True)
+    source = first[new_ids >= 0]
+    axis = -1 if values.shape[-1] == len(vertex_map) else 0
+    return np.take(values, source, axis=axis)
+
+
+def clean_surface(surface, tolerance=0):
+    """Clean up a surface, see :func:`clean_mesh`, keeping its values.
+
+    Parameters
+    ----------
+    surface: napari.types.SurfaceData
+    tolerance: float, optional
+
+    Returns
+    -------
+    napari.types.SurfaceData
+    """
+    vertices, faces, vertex_map = clean_mesh(surface[0], surface[1], tolerance)
+    if len(surface) > 2:
+        values = take_vertices(surface[2], vertex_map)
+    else:
+        values = np.ones(len(vertices))
+    return vertices, faces, values
@@ -0,0 +1,189 @@
+"""
+Conversion of pymeshlab meshes to the NumPy arrays napari expects.
+
+All readers, sample data and filters go through these functions so the arrays
+handed to napari follow one contract:
+
+* vertices are ``float64`` of shape ``(N, 3)``, or ``float32`` in single
+  precision, see :func:`set_precision`
+* faces are ``int32`` of shape ``(M, 3)``
+* vertex colors are ``uint8`` RGBA of shape ``(N, 4)``, or ones of shape
+  ``(N,)`` when every vertex has the same color
+
+and all are C-contiguous, so napari and vispy can use them without another
+copy. Colors only become the floats pymeshlab and napari take at the boundary
+with them, with :func:`colors_to_float`. pymeshlab stores every mesh as
+triangles, so ``face_matrix()`` is always valid here; the much slower
+``polygonal_face_list()`` is only used when polygons are explicitly asked for.
+
+Single precision halves the memory of the vertices of every surface, and is
+plenty for display. It is off unless ``NAPARI_PYMESHLAB_PRECISION=single`` is
+set, or turned on with :func:`set_precision`. Filters still compute in double
+precision, pymeshlab always does; only the arrays they hand back are cast.
+"""
+import os
+
+import numpy as np
+
+from ._instrument import stage
+
+VERTEX_DTYPE = np.float64
+FACE_DTYPE = np.int32
+COLOR_DTYPE = np.uint8
+
+# dtype of the vertices handed out, by precision
+PRECISIONS = {"double": np.float64, "single": np.float32}
+
+_precision = (
+    "single" if os.environ.get("NAPARI_PYMESHLAB_PRECISION") == "single" else "double"
+)
+
+
+def set_precision(precision="double"):
+    """Set the precision of the vertices of the surfaces made from now on.
+
+    Parameters
+    ----------
+    precision: str, optional
+        ``"double"`` for ``float64`` vertices, or ``"single"`` for ``float32``.
+    """
+    global _precision
+
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"precision must be one of {list(PRECISIONS)}, got {precision!r}"
+        )
+    _precision = precision
+
+
+def get_precision():
+    """Precision of the vertices of new surfaces, ``"double"`` or ``"single"``."""
+    return _precision
+
+
+def vertex_dtype():
+    """dtype of the vertices of new surfaces."""
+    return PRECISIONS[_precision]
+
+
+def as_vertices(vertices):
+    """``vertices`` in the current precision, copied only if they are not."""
+    return np.ascontiguousarray(vertices, dtype=vertex_dtype())
+
+
+def vertices_to_numpy(mesh):
+    """Vertex coordinates of a ``pymeshlab.Mesh`` as an ``(N, 3)`` array."""
+    return as_vertices(mesh.vertex_matrix())
+
+
+def faces_to_numpy(mesh, polygonal=False):
+    """Faces of a ``pymeshlab.Mesh``.
+
+    Parameters
+    ----------
+    mesh: pymeshlab.Mesh
+    polygonal: bool, optional
+        If True, rebuild the polygons MeshLab kept track of when the mesh was
+        triangulated. Faces are still returned as an ``(M, 3)`` array if they
+        all turn out to be triangles, otherwise as a list of index arrays.
+
+    Returns
+    -------
+    np.ndarray or list of np.ndarray
+    """
+    if not polygonal:
+        return np.ascontiguousarray(mesh.face_matrix(), dtype=FACE_DTYPE)
+
+    polygons = mesh.polygonal_face_list()
+    if all(len(p) == 3 for p in polygons):
+        return np.ascontiguousarray(np.reshape(polygons, (-1, 3)), dtype=FACE_DTYPE)
+    return [np.asarray(p, dtype=FACE_DTYPE) for p in polygons]
+
+
+def mesh_to_surface(mesh, values=None):
+    """Convert a ``pymeshlab.Mesh`` to ``napari.types.SurfaceData``.
+
+    Parameters
+    ----------
+    mesh: pymeshlab.Mesh
+    values: np.ndarray, optional
+        Per-vertex values. Defaults to ones.
+
+    Returns
+    -------
+    napari.types.SurfaceData
+    """
+    with stage("to surface", mesh=mesh) as s:
+        vertices = vertices_to_numpy(mesh)
+        faces = faces_to_numpy(mesh)
+        s.output(len(vertices), len(faces))
+    if values is None:
+        values = np.ones(len(vertices))
+    return (vertices, faces, values)
+
+
+def compact_colors(colors):
+    """``(N, 4)`` RGBA bytes, or ones if every vertex has the same color."""
+    colors = np.ascontiguousarray(colors, dtype=COLOR_DTYPE)
+    words = colors.view(np.uint32).ravel()
+    if len(words) == 0 or (words == words[0]).all():
+        return np.ones(len(colors))
+    return colors
+
+
+def colors_to_numpy(mesh, compact=True):
+    """Vertex colors of a ``pymeshlab.Mesh`` as ``(N, 4)`` RGBA bytes.
+
+    With ``compact``, ones if they are all the same, see :func:`compact_colors`.
+    """
+    packed = np.ascontiguousarray(mesh.vertex_color_array(), dtype="<u4")
+    # ARGB words are BGRA bytes in little-endian order
+    colors = packed.view(COLOR_DTYPE).reshape(-1, 4)[:, [2, 1, 0, 3]]
+    return compact_colors(colors) if compact else colors
+
+
+def color_bytes(colors, n_vertices):
+    """Vertex colors as ``(N, 4)`` RGBA bytes.
+
+    Parameters
+    ----------
+    colors: np.ndarray or None
+        ``(N, 4)`` or ``(N, 3)`` bytes, or floats in [0, 1]. ``(4, N)`` floats,
+        as earlier versions of the reader returned, are taken too.
+    n_vertices: int
+
+    Returns
+    -------
+    np.ndarray or None
+        None if ``colors`` are per-vertex values rather than colors.
+    """
+    if not isinstance(colors, np.ndarray) or colors.ndim != 2:
+        return None
+    if colors.shape == (4, n_vertices) and n_vertices != 4:
+        colors = colors.T
+    if len(colors) != n_vertices or colors.shape[1] not in (3, 4):
+        return None
+    if colors.dtype != COLOR_DTYPE:
+        colors = np.rint(np.clip(colors, 0, 1) * 255).astype(COLOR_DTYPE)
+    if colors.shape[1] == 3:
+        colors = np.hstack([colors, np.full((n_vertices, 1), 255, COLOR_DTYPE)])
+    return np.ascontiguousarray(colors)
+
+
+def colors_to_float(colors, dtype=np.float32):
+    """RGBA bytes as floats in [0, 1], as napari and pymeshlab take them."""
+    return np.multiply(colors, 1 / 255, dtype=dtype)
+
+
+def surface_layer_data(surface, add_kwargs=None):
+    """Layer data tuple of a surface whose third array may be colors.
+
+    napari takes colors as the ``vertex_colors`` of the layer rather than as
+    its values, so a surface with RGBA bytes gets ones as values instead.
+    """
+    add_kwargs = dict(add_kwargs or {})
+    vertices, faces, colors = surface[:3]
+    if getattr(colors, "dtype", None) == COLOR_DTYPE and np.ndim(colors) == 2:
+        add_kwargs["vertex_colors"] = colors_to_float(colors)
+        surface = (vertices, faces, np.ones(len(vertices)))
+    return (surface, add_kwargs, "surface")
@@ -0,0 +1,132 @@
+"""
+Voxel-grid downsampling of point clouds.
+
+Oversampled point clouds make normal estimation and screened Poisson
+reconstruction slow without making the surface any better. Thinning them on a
+voxel grid replaces the points in each occupied voxel by their mean, which is
+fully vectorized in NumPy.
+"""
+import numpy as np
+
+# stop searching for a voxel size once the budget is filled this well
+_BUDGET_TOLERANCE = 0.95
+_MAX_SEARCH_STEPS = 32
+
+
+def _voxel_keys(points, voxel_size):
+    """A key per point, equal for points in the same voxel."""
+    keys = np.floor((points - points.min(axis=0)) / voxel_size).astype(np.int64)
+    dims = keys.max(axis=0) + 1
+    if np.prod(dims.astype(float)) < 2**62:
+        return np.ravel_multi_index(tuple(keys.T), dims)
+    return keys
+
+
+def _voxel_ids(points, voxel_size):
+    """Index of the occupied voxel of every point, and the number per voxel."""
+    keys = _voxel_keys(points, voxel_size)
+    if keys.ndim > 1:
+        _, inverse, counts = np.unique(
+            keys, axis=0, return_inverse=True, return_counts=True
+        )
+        return inverse.ravel(), counts
+
+    # a plain sort is much faster than np.unique for this
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    first = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    inverse = np.empty(len(keys), dtype=np.intp)
+    inverse[order] = np.cumsum(first) - 1
+    return inverse, np.diff(np.r_[np.flatnonzero(first), len(keys)])
+
+
+def _count_voxels(points, voxel_size):
+    keys = _voxel_keys(points, voxel_size)
+    if keys.ndim > 1:
+        return len(np.unique(keys, axis=0))
+    keys.sort()
+    return 1 + np.count_nonzero(keys[1:] != keys[:-1])
+
+
+def _voxel_size_for(points, max_points, lower=None):
+    """Smallest voxel size (roughly) leaving at most ``max_points`` points."""
+    # a single voxel always fits
+    upper = float(np.ptp(points, axis=0).max()) * (1 + 1e-9) or 1.0
+    n_upper = 1
+    if lower is None:
+        # points usually sample a surface, so start near one point per voxel
+        # of such a surface and refine from there
+        lower = upper / np.sqrt(len(points))
+        n_lower = _count_voxels(points, lower)
+        while n_lower <= max_points and lower > upper / len(points):
+            upper, n_upper = lower, n_lower
+            lower /= 16
+            n_lower = _count_voxels(points, lower)
+    else:
+        n_lower = _count_voxels(points, lower)
+    if n_lower <= max_points:
+        return lower
+
+    # the number of voxels is close to a power of their size, so interpolate
+    # in log-log space, keeping count(lower) > max_points >= count(upper)
+    target = np.log(max_points * (1 + _BUDGET_TOLERANCE) / 2)
+    for _ in range(_MAX_SEARCH_STEPS):
+        if n_upper >= _BUDGET_TOLERANCE * max_points:
+            break
+        t = (np.log(n_lower) - target) / (np.log(n_lower) - np.log(n_upper))
+        # stay well inside the bracket so it always shrinks
+        t = min(max(t, 0.05), 0.95)
+        middle = lower * (upper / lower) ** t
+        n = _count_voxels(points, middle)
+        if n > max_points:
+            lower, n_lower = middle, n
+        else:
+            upper, n_upper = middle, n
+    return upper
+
+
+def voxel_downsample(points, voxel_size=None, max_points=None):
+    """Replace the points in each cell of a voxel grid by their mean.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        ``(N, D)`` point coordinates.
+    voxel_size: float, optional
+        Edge length of the voxels, in the units of ``points``.
+    max_points: int, optional
+        Point budget. Without ``voxel_size``, the voxel size is searched for
+        that leaves close to, but no more than, ``max_points`` points. With
+        it, the voxels are only made larger than ``voxel_size`` if needed to
+        stay within the budget.
+
+    Returns
+    -------
+    np.ndarray
+        ``(M, D)`` points, ``M <= N``, ordered by voxel.
+    """
+    if voxel_size is None and max_points is None:
+        raise ValueError("Either voxel_size or max_points is required")
+    if voxel_size is not None and voxel_size <= 0:
+        raise ValueError(f"voxel_size must be positive, got {voxel_size}")
+    if max_points is not None and max_points < 1:
+        raise ValueError(f"max_points must be at least 1, got {max_points}")
+
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) == 0:
+        return points.copy()
+
+    if voxel_size is None:
+        if len(points) <= max_points:
+            return points.copy()
+        voxel_size = _voxel_size_for(points, max_points)
+    inverse, counts = _voxel_ids(points, voxel_size)
+    if max_points is not None and len(counts) > max_points:
+        voxel_size = _voxel_size_for(points, max_points, lower=voxel_size)
+        inverse, counts = _voxel_ids(points, voxel_size)
+
+    downsampled = np.empty((len(counts), points.shape[1]))
+    for axis in range(points.shape[1]):
+        sums = np.bincount(inverse, weights=points[:, axis], minlength=len(counts))
+        downsampled[:, axis] = sums / counts
+    return downsampled
@@ -0,0 +1,342 @@
+"""
+Per-stage timing and memory instrumentation.
+
+Readers, writers and filters wrap each phase of their work in :func:`stage`:
+copying arrays into a pymeshlab mesh, the pymeshlab filter itself, and copying
+the result back out. While profiling is on, every stage records its wall
+time, the peak memory allocated during it, and the vertex and face counts
+going in and out. Records are logged to the ``napari_pymeshlab`` logger, with
+the fields of the record as the ``stage`` attribute of the log record, and
+collected by :func:`profiling`.
+
+Profiling is off unless ``NAPARI_PYMESHLAB_PROFILE=1`` is set, or turned on
+with :func:`set_profiling` or :func:`profiling`. While it is off, :func:`stage`
+returns a shared no-op context manager, so an instrumented stage costs one
+function call.
+
+Peak memory comes from ``tracemalloc``. It covers NumPy arrays and Python
+objects, but not what pymeshlab allocates internally, and tracing slows down
+code that allocates many small Python objects.
+
+Stages that run in the worker processes of ``map_shared`` are recorded there
+while the parent profiles, and sent back with each result. The parent then
+records them as part of the stage it collects the result in; their peak
+memory is the worker's.
+"""
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import List
+
+logger = logging.getLogger("napari_pymeshlab")
+
+StageRecord = namedtuple(
+    "StageRecord",
+    [
+        "name",
+        "seconds",
+        "peak_bytes",
+        "vertices_in",
+        "faces_in",
+        "vertices_out",
+        "faces_out",
+        "depth",
+    ],
+)
+
+_enabled = os.environ.get("NAPARI_PYMESHLAB_PROFILE", "0") == "1"
+_memory = True
+_started_tracing = False
+
+# record lists of the active profiling() blocks
+_collectors: List[List[StageRecord]] = []
+_lock = threading.Lock()
+
+# stages entered and not exited yet, per thread
+_local = threading.local()
+
+# whether this is a worker process sending its records to the parent, which
+# logs them, rather than logging them itself
+_forwarding = False
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def _mesh_counts(mesh):
+    if mesh is None:
+        return None, None
+    return mesh.vertex_number(), mesh.face_number()
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def output(self, vertices=None, faces=None, mesh=None):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, vertices, faces, mesh):
+        self.name = name
+        if mesh is not None:
+            vertices, faces = _mesh_counts(mesh)
+        self.vertices_in = vertices
+        self.faces_in = faces
+        self.vertices_out = self.faces_out = None
+
+    def output(self, vertices=None, faces=None, mesh=None):
+        """Record the vertex and face counts the stage produced."""
+        if mesh is not None:
+            vertices, faces = _mesh_counts(mesh)
+        self.vertices_out = vertices
+        self.faces_out = faces
+
+    def __enter__(self):
+        stack = _stack()
+        self.depth = len(stack)
+        self.base = None
+        self.inner_peak = 0
+        if _memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # resetting the peak below would lose the parent's
+                stack[-1].inner_peak = max(stack[-1].inner_peak, peak)
+            tracemalloc.reset_peak()
+            self.base = current
+        stack.append(self)
+        self.stack = stack
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        # a generator closed by the garbage collector exits in another thread
+        stack = self.stack
+        if self in stack:
+            del stack[stack.index(self) :]
+
+        peak_bytes = None
+        if self.base is not None and tracemalloc.is_tracing():
+            peak = max(tracemalloc.get_traced_memory()[1], self.inner_peak)
+            peak_bytes = peak - self.base
+            if stack:
+                stack[-1].inner_peak = max(stack[-1].inner_peak, peak)
+
+        _emit(
+            StageRecord(
+                self.name,
+                seconds,
+                peak_bytes,
+                self.vertices_in,
+                self.faces_in,
+                self.vertices_out,
+                self.faces_out,
+                self.depth,
+            )
+        )
+        return False
+
+
+def _emit(record):
+    if not _forwarding and logger.isEnabledFor(logging.INFO):
+        logger.info(format_record(record), extra={"stage": record._asdict()})
+    with _lock:
+        for records in _collectors:
+            records.append(record)
+
+
+def stage(name, vertices=None, faces=None, mesh=None):
+    """Context manager timing one stage of work while profiling is on.
+
+    Parameters
+    ----------
+    name: str
+    vertices, faces: int, optional
+        Counts going into the stage.
+    mesh: pymeshlab.Mesh, optional
+        Mesh going into the stage, to take the counts from.
+
+    Returns
+    -------
+    context manager
+        Its ``output(vertices, faces, mesh)`` method records the counts the
+        stage produced.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, vertices, faces, mesh)
+
+
+def profiling_enabled():
+    """Whether stages are being recorded."""
+    return _enabled
+
+
+def set_profiling(enabled=True, memory=True):
+    """Turn profiling on or off for the whole process.
+
+    Parameters
+    ----------
+    enabled: bool, optional
+    memory: bool, optional
+        Also record peak memory, with ``tracemalloc``.
+    """
+    global _enabled, _memory, _started_tracing
+
+    _enabled, _memory = enabled, memory
+    if enabled and memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+    elif _started_tracing and not (enabled and memory):
+        tracemalloc.stop()
+        _started_tracing = False
+
+
+@contextmanager
+def profiling(memory=True, notify=False):
+    """Record the stages run inside the block, in any thread.
+
+    Parameters
+    ----------
+    memory: bool, optional
+        Also record peak memory, with ``tracemalloc``.
+    notify: bool, optional
+        Show a summary of the stages as a napari notification at the end.
+
+    Yields
+    ------
+    list of StageRecord
+        Filled in as stages finish, so inner stages come before the stage
+        they are part of.
+
+    Examples
+    --------
+    >>> with profiling() as records:
+    ...     taubin_smooth(surface)
+    >>> print(format_records(records))
+    """
+    previous = _enabled, _memory
+    records = []
+    with _lock:
+        _collectors.append(records)
+    set_profiling(True, memory)
+    try:
+        yield records
+    finally:
+        with _lock:
+            _collectors.remove(records)
+        set_profiling(*previous)
+        if notify and records:
+            from napari.utils.notifications import show_info
+
+            show_info(format_records(records))
+
+
+def worker_profiling():
+    """Profiling setting for worker processes: None while profiling is off,
+    otherwise whether to record peak memory."""
+    return _memory if _enabled else None
+
+
+def start_forwarding(memory):
+    """Record stages in this worker process for :func:`forward_stages`.
+
+    Called when a worker process starts, with :func:`worker_profiling` of the
+    parent; a no-op for None.
+    """
+    global _forwarding
+
+    if memory is None:
+        return
+    # a forked worker starts with the collectors and the stages of the
+    # thread that started it, which are the parent's to record
+    with _lock:
+        _collectors.clear()
+    _local.stack = []
+    _forwarding = True
+    set_profiling(True, memory)
+
+
+@contextmanager
+def forward_stages():
+    """Collect the stages of a worker's task, to send them to the parent.
+
+    Yields
+    ------
+    list of StageRecord or None
+        None unless :func:`start_forwarding` was called.
+    """
+    if not _forwarding:
+        yield None
+        return
+    records = []
+    with _lock:
+        _collectors.append(records)
+    try:
+        yield records
+    finally:
+        with _lock:
+            _collectors.remove(records)
+
+
+def replay_stages(records):
+    """Record the stages of a worker's task in this process.
+
+    They are nested in the stage running in this thread, if any.
+    """
+    if not records:
+        return
+    depth = len(_stack())
+    for record in records:
+        _emit(record._replace(depth=record.depth + depth))
+
+
+def _counts(vertices, faces):
+    if vertices is None and faces is None:
+        return None
+    vertices, faces = ("?" if n is None else n for n in (vertices, faces))
+    return f"{vertices}v/{faces}f"
+
+
+def format_record(record):
+    """One line summary of a :class:`StageRecord`."""
+    line = f"{record.name}: {1000 * record.seconds:.1f} ms"
+    if record.peak_bytes is not None:
+        line += f", peak {record.peak_bytes / 2**20:.1f} MiB"
+    counts_in = _counts(record.vertices_in, record.faces_in)
+    counts_out = _counts(record.vertices_out, record.faces_out)
+    if counts_in or counts_out:
+        line += f", {counts_in or '-'} -> {counts_out or '-'}"
+    return line
+
+
+def format_records(records):
+    """Summary of stages, one per line, indented by nesting and in order."""
+    # records arrive as stages finish, after the stages inside them; gather
+    # each stage and the subtrees finished just before it that are deeper
+    subtrees = []
+    for record in records:
+        inner = []
+        while subtrees and subtrees[-1][0].depth > record.depth:
+            inner = subtrees.pop() + inner
+        subtrees.append([record] + inner)
+    return "\n".join(
+        "  " * r.depth + format_record(r) for subtree in subtrees for r in subtree
+    )
@@ -0,0 +1,277 @@
+"""
+Surfaces of the objects in a label image.
+
+Turning segmented objects into surfaces by hand means, for every label,
+cutting out its mask, running marching cubes on it and then the surface
+filters, which does not scale to the thousands of labels of a typical
+segmentation. Here the bounding boxes of all labels come from a single pass
+over the image (``scipy.ndimage.find_objects``), and the labels are meshed,
+smoothed and decimated in a process pool. Labels are sent to the workers in
+groups of similar total volume, each group as a handful of arrays in shared
+memory, so that many small labels do not each pay for a round trip to a
+worker.
+"""
+import heapq
+from functools import partial
+
+import numpy as np
+
+from ._background import run_steps
+from ._convert import FACE_DTYPE, VERTEX_DTYPE, as_vertices
+from ._instrument import stage
+from ._parallel import default_workers, imap_shared
+from ._pipeline import MeshPipeline
+from ._smooth import sparse_taubin_smooth
+
+# groups per worker, so a group of large labels does not keep one worker
+# busy while the others are idle
+GROUPS_PER_WORKER = 4
+
+
+def label_boxes(labels, label_ids=None, min_voxels=1):
+    """Bounding boxes of the labels in a label image.
+
+    Parameters
+    ----------
+    labels: np.ndarray
+        Integer label image, 0 being background.
+    label_ids: sequence of int, optional
+        Labels to find. Defaults to all labels in the image.
+    min_voxels: int, optional
+        Labels with fewer voxels are left out.
+
+    Returns
+    -------
+    dict
+        Tuple of slices of the bounding box of every label, by label.
+    """
+    from scipy import ndimage
+
+    labels = np.asarray(labels)
+    if not np.issubdtype(labels.dtype, np.integer):
+        raise TypeError(f"labels must be an integer image, got {labels.dtype}")
+    if labels.size and labels.min() < 0:
+        raise ValueError("labels must not be negative")
+
+    wanted = None if label_ids is None else set(int(i) for i in label_ids)
+    boxes = {}
+    for index, box in enumerate(ndimage.find_objects(labels)):
+        label_id = index + 1
+        if box is None or (wanted is not None and label_id not in wanted):
+            continue
+        boxes[label_id] = box
+
+    if min_voxels > 1 and boxes:
+        ids = np.fromiter(boxes, dtype=np.int64)
+        sizes = ndimage.sum_labels(np.ones(labels.shape, dtype=np.uint8), labels, ids)
+        boxes = {
+            i: boxes[i] for i, size in zip(ids.tolist(), sizes) if size >= min_voxels
+        }
+    return boxes
+
+
+def _groups(boxes, n_groups):
+    """Split labels into groups of similar total bounding box volume."""
+    by_volume = sorted(
+        boxes, key=lambda i: -np.prod([s.stop - s.start for s in boxes[i]])
+    )
+    heap = [(0, g) for g in range(n_groups)]
+    groups = [[] for _ in range(n_groups)]
+    for label_id in by_volume:
+        load, g = heapq.heappop(heap)
+        groups[g].append(label_id)
+        volume = np.prod([s.stop - s.start for s in boxes[label_id]])
+        heapq.heappush(heap, (load + volume, g))
+    return [sorted(group) for group in groups if group]
+
+
+def _pack(labels, boxes, group):
+    """Masks of the labels in ``group``, as arrays for one worker."""
+    masks = [labels[boxes[i]] == i for i in group]
+    return (
+        np.asarray(group, dtype=np.int64),
+        np.array([[s.start for s in boxes[i]] for i in group], dtype=np.int64),
+        np.array([m.shape for m in masks], dtype=np.int64),
+        np.concatenate([m.ravel() for m in masks]),
+    )
+
+
+def _mesh_mask(mask, origin, spacing):
+    """Surface of one label's mask, in the coordinates of the image."""
+    from skimage.measure import marching_cubes
+
+    # a background border closes the surface where the label touches the
+    # edge of its bounding box
+    padded = np.pad(mask, 1).astype(np.float32)
+    vertices, faces, _, _ = marching_cubes(padded, 0.5, spacing=spacing)
+    vertices += (origin - 1) * spacing
+    return vertices.astype(VERTEX_DTYPE), faces.astype(FACE_DTYPE)
+
+
+def _concatenate(vertices, faces):
+    offsets = np.cumsum([0] + [len(v) for v in vertices[:-1]])
+    return (
+        np.concatenate(vertices),
+        np.concatenate([f + o for f, o in zip(faces, offsets)]).astype(FACE_DTYPE),
+    )
+
+
+def _mesh_group(spacing, params, item):
+    """Mesh every label of a group; labels' arrays are concatenated."""
+    ids, origins, shapes, masks = item
+    vertices, faces = [], []
+    offset = 0
+    for origin, shape in zip(origins, shapes):
+        size = int(np.prod(shape))
+        mask = masks[offset : offset + size].reshape(shape)
+        offset += size
+        v, f = _mesh_mask(mask, origin, spacing)
+        vertices.append(v)
+        faces.append(f)
+    n_vertices = np.array([len(v) for v in vertices], dtype=np.int64)
+
+    if params["smooth_iterations"] > 0:
+        # the surfaces of the labels do not share vertices, so smoothing them
+        # as one mesh gives the same result, for one call per group rather
+        # than per label
+        smoothed = sparse_taubin_smooth(
+            *_concatenate(vertices, faces),
+            step_smooth_num=params["smooth_iterations"],
+            use_cache=False,
+        )
+        vertices = np.split(smoothed, np.cumsum(n_vertices)[:-1])
+
+    if params["decimation_percentage"] > 0:
+        # the cell size is relative to each label's own size
+        for i, (v, f) in enumerate(zip(vertices, faces)):
+            vertices[i], faces[i], _ = (
+                MeshPipeline((v, f))
+                .simplification_clustering_decimation(params["decimation_percentage"])
+                .to_surface()
+            )
+        n_vertices = np.array([len(v) for v in vertices], dtype=np.int64)
+
+    return (
+        ids,
+        n_vertices,
+        np.array([len(f) for f in faces], dtype=np.int64),
+        # cast here, so single precision also halves what workers send back
+        as_vertices(np.concatenate(vertices)),
+        np.concatenate(faces),
+    )
+
+
+def _split(group_result):
+    """``(label_id, vertices, faces)`` of every label of a group result."""
+    ids, n_vertices, n_faces, vertices, faces = group_result
+    vertex_ends, face_ends = np.cumsum(n_vertices), np.cumsum(n_faces)
+    for label_id, v_end, nv, f_end, nf in zip(
+        ids, vertex_ends, n_vertices, face_ends, n_faces
+    ):
+        yield int(label_id), vertices[v_end - nv : v_end], faces[f_end - nf : f_end]
+
+
+def labels_to_surfaces_steps(
+    labels,
+    spacing=(1, 1, 1),
+    label_ids=None,
+    min_voxels=1,
+    smooth_iterations=10,
+    decimation_percentage=0,
+    combine=True,
+    n_workers=None,
+):
+    """Surfaces of the labels of a 3D label image, meshed in parallel.
+
+    Every label is meshed with marching cubes on its own mask, then smoothed
+    with :func:`sparse_taubin_smooth` and decimated with
+    :func:`simplification_clustering_decimation`.
+
+    Parameters
+    ----------
+    labels: np.ndarray
+        3D integer label image, 0 being background.
+    spacing: sequence of float, optional
+        Voxel size along each axis; vertices are in these units.
+    label_ids: sequence of int, optional
+        Labels to mesh. Defaults to all labels in the image.
+    min_voxels: int, optional
+        Labels with fewer voxels are skipped.
+    smooth_iterations: int, optional
+        Iterations of Taubin smoothing; 0 to skip smoothing.
+    decimation_percentage: float, optional
+        Cell size of clustering decimation, as a percentage of the bounding
+        box diagonal of each label's surface; 0 to skip decimation.
+    combine: bool, optional
+        Return one surface for all labels, rather than one per label.
+    n_workers: int, optional
+        Number of processes. Defaults to one per group of labels, up to the
+        CPU count.
+
+    Returns
+    -------
+    napari.types.SurfaceData or dict
+        As the return value of the generator, with ``combine``, one surface
+        whose values are the label of every vertex; otherwise the surface of
+        every label, by label, with the label as values. Labels are in
+        increasing order. Once the labels are grouped, the generator yields
+        the number of times it yields, and then once per group.
+    """
+    labels = np.asarray(labels)
+    if labels.ndim != 3:
+        raise ValueError(f"labels must be a 3D image, got {labels.ndim} dimensions")
+    spacing = np.asarray(spacing, dtype=VERTEX_DTYPE)
+    params = dict(
+        smooth_iterations=smooth_iterations,
+        decimation_percentage=decimation_percentage,
+    )
+
+    with stage("label boxes"):
+        boxes = label_boxes(labels, label_ids, min_voxels)
+    if not boxes:
+        raise ValueError("No labels to mesh")
+    if n_workers is None:
+        n_workers = default_workers(len(boxes))
+    groups = _groups(boxes, min(len(boxes), GROUPS_PER_WORKER * n_workers))
+    yield 1 + len(groups)
+
+    pieces = []
+    results = imap_shared(
+        partial(_mesh_group, spacing, params),
+        (_pack(labels, boxes, group) for group in groups),
+        n_workers,
+        share_inputs=True,
+    )
+    try:
+        for result in results:
+            pieces.extend(_split(result))
+            yield
+    finally:
+        # when cancelled, the groups already running are finished and dropped
+        results.close()
+
+    pieces = sorted((p for p in pieces if len(p[2])), key=lambda p: p[0])
+    if not pieces:
+        raise ValueError("No label has a surface")
+    if not combine:
+        return {
+            label_id: (as_vertices(vertices), faces, np.full(len(vertices), label_id))
+            for label_id, vertices, faces in pieces
+        }
+
+    offsets = np.cumsum([0] + [len(v) for _, v, _ in pieces[:-1]])
+    return (
+        as_vertices(np.concatenate([v for _, v, _ in pieces])),
+        np.concatenate([f + o for (_, _, f), o in zip(pieces, offsets)]).astype(
+            FACE_DTYPE
+        ),
+        np.concatenate([np.full(len(v), label_id) for label_id, v, _ in pieces]),
+    )
+
+
+def labels_to_surfaces(labels, **kwargs):
+    """Surfaces of the labels of a 3D label image.
+
+    See :func:`labels_to_surfaces_steps` for the parameters and result.
+    """
+    return run_steps(labels_to_surfaces_steps(labels, **kwargs))
@@ -0,0 +1,250 @@
+"""
+Level-of-detail pyramids for large surfaces.
+
+A pyramid is a list of increasingly coarse copies of a surface, made with
+clustering decimation at increasing thresholds. Each level is decimated from
+the previous one, and stored in the on-disk mesh cache, so a surface opened
+again does not need its pyramid rebuilt.
+
+:class:`LodSwitcher` swaps a coarse level into a surface layer while the camera
+moves, and the full surface back in once it has been still for a moment, so
+navigating around a surface of tens of millions of faces stays fluid.
+"""
+import hashlib
+
+import numpy as np
+
+from ._background import run_steps
+from ._cache import mesh_cache
+from ._convert import surface_layer_data
+from ._memo import fingerprint
+from ._pipeline import MeshPipeline
+
+# clustering thresholds of the levels, in percent of the bounding box diagonal
+DEFAULT_THRESHOLDS = (0.25, 0.5, 1.0, 2.0)
+
+# switchers attached with attach_lod, by layer
+_SWITCHERS = {}
+
+
+def _transfer_values(surface, vertices):
+    """Values of the vertices of ``surface`` nearest to ``vertices``."""
+    from scipy.spatial import cKDTree
+
+    if len(surface) < 3:
+        return np.ones(len(vertices))
+    _, nearest = cKDTree(surface[0]).query(vertices)
+    values = np.asarray(surface[2])
+    # values run along the last axis, colors along the first
+    axis = -1 if values.shape[-1] == len(surface[0]) else 0
+    return np.ascontiguousarray(np.take(values, nearest, axis=axis))
+
+
+def _decimate(surface, threshold):
+    vertices, faces, _ = (
+        MeshPipeline(surface)
+        .simplification_clustering_decimation(threshold)
+        .to_surface()
+    )
+    # clustering decimation does not keep per-vertex values
+    return vertices, faces, _transfer_values(surface, vertices)
+
+
+def _area(vertices, faces, chunk_rows=1 << 20):
+    area = 0.0
+    for start in range(0, len(faces), chunk_rows):
+        a, b, c = (vertices[i] for i in faces[start : start + chunk_rows].T)
+        cross = np.cross(b - a, c - a)
+        area += np.sqrt(np.einsum("ij,ij->i", cross, cross)).sum() / 2
+    return area
+
+
+def decimate_to(surface, max_faces):
+    """``surface`` decimated to about ``max_faces`` faces, if it has more.
+
+    The clustering threshold comes from the area of the surface: cells of
+    size ``c`` leave a little less than ``3 * area / c**2`` faces of a smooth
+    surface.
+    Values, or vertex colors, are taken from the nearest input vertices.
+    """
+    vertices = np.asarray(surface[0], dtype=np.float64)
+    faces = np.asarray(surface[1])
+    if len(faces) <= max_faces:
+        return surface
+    diagonal = np.linalg.norm(np.ptp(vertices, axis=0))
+    cell = np.sqrt(3 * _area(vertices, faces) / max_faces)
+    return _decimate(surface, 100 * cell / diagonal)
+
+
+def _level_key(surface_key, thresholds):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"lod:{surface_key}:{[float(t) for t in thresholds]}".encode())
+    return h.hexdigest()
+
+
+def lod_steps(surface, thresholds=DEFAULT_THRESHOLDS, use_cache=None, cache=None):
+    """Build the level-of-detail pyramid of ``surface``, yielding per level.
+
+    Parameters
+    ----------
+    surface: napari.types.SurfaceData
+        Its third array may be ``(N, 4)`` RGBA bytes instead of values, which
+        the levels then carry, taken from the nearest vertices.
+    thresholds: sequence of float, optional
+        Clustering thresholds of the levels, in percent of the bounding box
+        diagonal.
+    use_cache: bool, optional
+        Look levels up in, and add them to, the on-disk mesh cache. Defaults
+        to whether the cache is enabled.
+    cache: MeshCache, optional
+        Defaults to the cache ``mesh_reader`` uses.
+
+    Returns
+    -------
+    list of napari.types.SurfaceData
+        As the return value of the generator, from finest to coarsest. It
+        yields once per level.
+    """
+    if cache is None:
+        cache = mesh_cache
+    if use_cache is None:
+        use_cache = cache.enabled
+    thresholds = sorted(thresholds)
+    surface_key = fingerprint(*surface[:3]) if use_cache else None
+
+    levels = []
+    source = surface
+    for i, threshold in enumerate(thresholds):
+        key = _level_key(surface_key, thresholds[: i + 1]) if use_cache else None
+        level = cache.load(key) if use_cache else None
+        if level is None:
+            level = _decimate(source, threshold)
+            if use_cache:
+                cache.store(key, level)
+        levels.append(level)
+        source = level
+        yield
+    return levels
+
+
+def build_lod_pyramid(surface, thresholds=DEFAULT_THRESHOLDS, use_cache=None):
+    """Level-of-detail pyramid of ``surface``, see :func:`lod_steps`."""
+    return run_steps(lod_steps(surface, thresholds, use_cache))
+
+
+def _camera(viewer):
+    # napari >= 0.9 moved the camera to the scene
+    scene = getattr(viewer, "scene", None)
+    return scene.camera if scene is not None else viewer.camera
+
+
+class LodSwitcher:
+    """Show a coarse level of a surface layer while the camera moves.
+
+    Parameters
+    ----------
+    viewer: napari.components.ViewerModel
+    layer: napari.layers.Surface
+    levels: list of napari.types.SurfaceData
+        Levels of the layer's surface, as from :func:`build_lod_pyramid`.
+        Their third arrays may be RGBA bytes, for a layer with
+        ``vertex_colors``; otherwise the colors of the nearest vertices of
+        the layer are taken.
+    interactive_faces: int, optional
+        While the camera moves, the finest level with at most this many faces
+        is shown, or the coarsest if none is that small.
+    idle_ms: int, optional
+        The full surface is shown again once the camera has not moved for
+        this many milliseconds.
+    """
+
+    def __init__(self, viewer, layer, levels, interactive_faces=1_000_000, idle_ms=300):
+        from qtpy.QtCore import QTimer
+
+        self.viewer = viewer
+        self.layer = layer
+        self.full = layer.data
+        self.full_colors = layer.vertex_colors
+        level = self._pick_level(levels, interactive_faces)
+        self.coarse, self.coarse_colors = self._layer_data(level)
+        self.coarse_shown = False
+
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(idle_ms)
+        self._timer.timeout.connect(self.restore)
+
+        events = _camera(viewer).events
+        self._events = [events.zoom, events.angles, events.center]
+        for event in self._events:
+            event.connect(self._on_camera)
+
+    @staticmethod
+    def _pick_level(levels, interactive_faces):
+        for level in levels:
+            if len(level[1]) <= interactive_faces:
+                return level
+        return levels[-1]
+
+    def _layer_data(self, level):
+        """Layer data and vertex colors of ``level``."""
+        data, kwargs, _ = surface_layer_data(level)
+        colors = kwargs.get("vertex_colors")
+        if colors is None and self.full_colors is not None:
+            full = (self.full[0], self.full[1], self.full_colors)
+            colors = _transfer_values(full, data[0])
+        return data, colors
+
+    def _show(self, data, colors):
+        if colors is not None or self.layer.vertex_colors is not None:
+            # the colors must not be drawn on the vertices of the other level,
+            # so they are only drawn once the data is swapped too
+            events = self.layer.events
+            with events.data.blocker(), events.set_data.blocker():
+                self.layer.vertex_colors = colors
+        self.layer.data = data
+
+    def _on_camera(self, event=None):
+        if not self.layer.visible:
+            return
+        if not self.coarse_shown:
+            self.coarse_shown = True
+            self._show(self.coarse, self.coarse_colors)
+        self._timer.start()
+
+    def restore(self):
+        """Show the full surface again."""
+        self._timer.stop()
+        if self.coarse_shown:
+            self.coarse_shown = False
+            self._show(self.full, self.full_colors)
+
+    def disconnect(self):
+        """Stop switching levels and show the full surface."""
+        for event in self._events:
+            event.disconnect(self._on_camera)
+        self.restore()
+
+
+def attach_lod(viewer, layer, levels, interactive_faces=1_000_000, idle_ms=300):
+    """Attach a :class:`LodSwitcher` to ``layer``, replacing any previous one.
+
+    The switcher is detached when the layer is removed from the viewer.
+    """
+    detach_lod(layer)
+    _SWITCHERS[layer] = LodSwitcher(viewer, layer, levels, interactive_faces, idle_ms)
+
+    def _on_removed(event):
+        if event.value is layer:
+            viewer.layers.events.removed.disconnect(_on_removed)
+            detach_lod(layer)
+
+    viewer.layers.events.removed.connect(_on_removed)
+    return _SWITCHERS[layer]
+
+
+def detach_lod(layer):
+    """Detach the :class:`LodSwitcher` of ``layer``, if any."""
+    switcher = _SWITCHERS.pop(layer, None)
+    if switcher is not None:
+        switcher.disconnect()
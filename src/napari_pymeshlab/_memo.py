@@ -0,0 +1,111 @@
+"""
+In-memory LRU cache of filter results.
+
+Tuning a filter in the GUI tends to revisit parameter sets that were already
+tried. The filter widgets look their result up here first, keyed on a
+fingerprint of the input buffers and the filter steps, so flipping back to a
+recent parameter set does not run the filter again. The cache is bounded by
+the total size of the arrays it holds.
+"""
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "currsize", "nbytes", "max_bytes"]
+)
+
+
+def fingerprint(*arrays):
+    """Hash of the shape, dtype and content of ``arrays``."""
+    h = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        h.update(memoryview(array).cast("B"))
+    return h.hexdigest()
+
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+def _freeze(value):
+    # results are shared between calls, so they must not be modified in place
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+class FilterCache:
+    """Memory-bounded LRU cache of filter results.
+
+    Parameters
+    ----------
+    max_bytes: int, optional
+        Entries are evicted, least recently used first, once the arrays held
+        by the cache add up to more than this. Defaults to 512 MiB.
+    """
+
+    def __init__(self, max_bytes=512 * 1024**2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached result for ``key``, or None."""
+        with self._lock:
+            if key is None or key not in self._entries:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """Store ``value`` under ``key``. Its arrays are made read-only."""
+        nbytes = _nbytes(value)
+        if key is None or nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (_freeze(value), nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+                self._evictions += 1
+
+    def cache_info(self):
+        """Hit/miss statistics, in the spirit of ``functools.lru_cache``."""
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._nbytes,
+                self.max_bytes,
+            )
+
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+
+filter_cache = FilterCache()
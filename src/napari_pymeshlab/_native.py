@@ -0,0 +1,439 @@
+"""
+Vectorized readers for binary PLY and STL, and streaming writers for binary
+PLY, binary STL and OBJ.
+
+Both binary formats have fixed-size records, so they can be memory-mapped and
+turned into arrays without going through pymeshlab. Only the plain layouts are
+handled here: triangle-only binary PLY with ``vertex`` and ``face`` elements,
+and binary STL. Anything else raises ``ValueError`` and is left to pymeshlab.
+
+The arrays follow the same contract as ``_convert.py``, and match what
+pymeshlab returns for the same file.
+
+The writers go the other way without building a ``MeshSet``: they convert the
+arrays a chunk of rows at a time and write each chunk out directly, so the
+memory they need on top of the surface itself is bounded by the chunk size.
+"""
+import os
+
+import numpy as np
+
+from ._convert import COLOR_DTYPE, FACE_DTYPE, compact_colors, vertex_dtype
+from ._instrument import stage
+
+_PLY_TYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+
+_PLY_FORMATS = {"binary_little_endian": "<", "binary_big_endian": ">"}
+
+_STL_TRIANGLE = np.dtype(
+    [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")]
+)
+
+# rows converted at a time by the writers
+CHUNK_ROWS = 1 << 18
+
+
+def _default_colors(n):
+    # pymeshlab reports the same opaque white for meshes without vertex colors
+    return np.ones(n)
+
+
+def _read_ply_header(f, ascii=False):
+    """Byte order, elements and data offset of a PLY file.
+
+    The byte order of ASCII files, which are only accepted with ``ascii``, is
+    None.
+    """
+    if f.readline().strip() != b"ply":
+        raise ValueError("Not a PLY file")
+
+    byte_order, elements, has_format = None, [], False
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("PLY header is not terminated")
+        words = line.decode("ascii", errors="replace").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "end_header":
+            break
+        # the number of words each line has: a list property has two types
+        n_words = {"format": 3, "element": 3, "property": 3}.get(words[0])
+        if words[0] == "property" and words[1:2] == ["list"]:
+            n_words = 5
+        if n_words is None or len(words) != n_words:
+            raise ValueError(f"Unexpected PLY header line {line!r}")
+        if words[0] == "format":
+            has_format = True
+            if ascii and words[1] == "ascii":
+                continue
+            if words[1] not in _PLY_FORMATS:
+                raise ValueError(f"PLY format {words[1]} is not handled natively")
+            byte_order = _PLY_FORMATS[words[1]]
+        elif words[0] == "element":
+            if not words[2].isdigit():
+                raise ValueError(f"PLY element count {words[2]} is not a count")
+            elements.append((words[1], int(words[2]), []))
+        else:
+            if not elements:
+                raise ValueError("PLY property before any element")
+            elements[-1][2].append(words[1:])
+
+    if not has_format:
+        raise ValueError("PLY header has no format")
+    return byte_order, elements, f.tell()
+
+
+def _ply_type(name, byte_order):
+    try:
+        return np.dtype(byte_order + _PLY_TYPES[name])
+    except KeyError:
+        raise ValueError(f"Unknown PLY type {name}") from None
+
+
+def read_ply(path):
+    """Read a triangle-only binary PLY file.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    vertices, faces, colors : np.ndarray
+        Colors are ``(N, 4)`` RGBA bytes, or ones if the file has none or they
+        are all the same, as from ``mesh_reader``.
+    """
+    with open(path, "rb") as f:
+        byte_order, elements, offset = _read_ply_header(f)
+
+    names = [name for name, _, _ in elements]
+    if names != ["vertex", "face"]:
+        raise ValueError(f"PLY elements {names} are not handled natively")
+    (_, n_vertices, vertex_props), (_, n_faces, face_props) = elements
+
+    record_dtype = []
+    for prop in vertex_props:
+        if prop[0] == "list":
+            raise ValueError("List properties on vertices are not supported")
+        record_dtype.append((prop[1], _ply_type(prop[0], byte_order)))
+    record_dtype = np.dtype(record_dtype)
+    if not {"x", "y", "z"} <= set(record_dtype.names):
+        raise ValueError("PLY vertices have no coordinates")
+
+    if len(face_props) != 1 or face_props[0][0] != "list":
+        raise ValueError("Only a single list property is supported on faces")
+    _, count_type, index_type, _ = face_props[0]
+    face_dtype = np.dtype(
+        [
+            ("count", _ply_type(count_type, byte_order)),
+            ("indices", _ply_type(index_type, byte_order), (3,)),
+        ]
+    )
+
+    # a triangle-only file has exactly this size, anything else is either
+    # polygonal or malformed
+    expected = offset + n_vertices * record_dtype.itemsize
+    expected += n_faces * face_dtype.itemsize
+    if os.path.getsize(path) != expected:
+        raise ValueError("PLY file is not a triangle mesh of the expected size")
+
+    vertex_data = np.memmap(
+        path, record_dtype, mode="r", offset=offset, shape=(n_vertices,)
+    )
+    face_data = np.memmap(
+        path,
+        face_dtype,
+        mode="r",
+        offset=offset + n_vertices * record_dtype.itemsize,
+        shape=(n_faces,),
+    )
+    if not np.all(face_data["count"] == 3):
+        raise ValueError("PLY faces are not all triangles")
+
+    vertices = np.empty((n_vertices, 3), dtype=vertex_dtype())
+    for i, axis in enumerate("xyz"):
+        vertices[:, i] = vertex_data[axis]
+    faces = np.ascontiguousarray(face_data["indices"], dtype=FACE_DTYPE)
+    if n_faces and (faces.min() < 0 or faces.max() >= n_vertices):
+        raise ValueError("PLY face indices out of range")
+
+    colors = _default_colors(n_vertices)
+    channels = [c for c in ("red", "green", "blue", "alpha") if c in record_dtype.names]
+    if channels[:3] == ["red", "green", "blue"]:
+        rgba = np.full((n_vertices, 4), 255, dtype=COLOR_DTYPE)
+        for i, channel in enumerate(channels):
+            values = vertex_data[channel]
+            if values.dtype.kind not in "ui":
+                values = np.rint(np.clip(values, 0, 1) * 255)
+            rgba[:, i] = values
+        colors = compact_colors(rgba)
+
+    return vertices, faces, colors
+
+
+def read_stl(path):
+    """Read a binary STL file, merging vertices shared between triangles.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    vertices, faces, colors : np.ndarray
+        Colors are ones, as from ``mesh_reader``; STL has no vertex colors.
+    """
+    with open(path, "rb") as f:
+        header = f.read(84)
+    if len(header) < 84:
+        raise ValueError("STL file is too short")
+    (n_triangles,) = np.frombuffer(header, "<u4", count=1, offset=80)
+
+    # ASCII STL (which also starts with "solid") fails this check
+    if os.path.getsize(path) != 84 + int(n_triangles) * _STL_TRIANGLE.itemsize:
+        raise ValueError("Not a binary STL file")
+
+    triangles = np.memmap(
+        path, _STL_TRIANGLE, mode="r", offset=84, shape=(int(n_triangles),)
+    )
+    # adding 0 turns -0.0 into 0.0, so both merge like they do in MeshLab
+    corners = triangles["vertices"].reshape(-1, 3) + np.float32(0)
+    if not np.all(np.isfinite(corners)):
+        raise ValueError("STL file has non-finite coordinates")
+
+    # merge identical corners, keeping vertices in order of first appearance
+    keys = np.ascontiguousarray(corners).view(np.dtype((np.void, 12))).ravel()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+
+    vertices = np.ascontiguousarray(corners[first[order]], dtype=vertex_dtype())
+    faces = np.ascontiguousarray(rank[inverse.ravel()].reshape(-1, 3), dtype=FACE_DTYPE)
+    return vertices, faces, _default_colors(len(vertices))
+
+
+_READERS = {".ply": read_ply, ".stl": read_stl}
+
+
+def _chunks(n, chunk_rows):
+    for start in range(0, n, chunk_rows):
+        yield start, min(start + chunk_rows, n)
+
+
+def write_ply(path, vertices, faces, colors=None, chunk_rows=CHUNK_ROWS):
+    """Write a binary little-endian PLY file, like MeshLab does.
+
+    Parameters
+    ----------
+    path : str
+    vertices, faces : np.ndarray
+        Single precision vertices are written as ``float``, others as
+        ``double``.
+    colors : np.ndarray, optional
+        ``(N, 4)`` RGBA bytes.
+    chunk_rows : int, optional
+        Number of vertices or faces converted at a time.
+    """
+    single = np.asarray(vertices).dtype == np.float32
+    record_dtype = [("xyz", "<f4" if single else "<f8", (3,))]
+    if colors is not None:
+        record_dtype.append(("rgba", "u1", (4,)))
+    record_dtype = np.dtype(record_dtype)
+    face_dtype = np.dtype([("count", "u1"), ("indices", "<i4", (3,))])
+
+    header = [
+        "ply",
+        "format binary_little_endian 1.0",
+        f"element vertex {len(vertices)}",
+    ]
+    header += [f"property {'float' if single else 'double'} {c}" for c in "xyz"]
+    if colors is not None:
+        header += [f"property uchar {c}" for c in ("red", "green", "blue", "alpha")]
+    header += [
+        f"element face {len(faces)}",
+        "property list uchar int vertex_indices",
+        "end_header",
+    ]
+
+    with open(path, "wb") as f:
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+
+        records = np.empty(min(chunk_rows, len(vertices)), record_dtype)
+        for start, stop in _chunks(len(vertices), chunk_rows):
+            chunk = records[: stop - start]
+            chunk["xyz"] = vertices[start:stop]
+            if colors is not None:
+                chunk["rgba"] = colors[start:stop]
+            f.write(chunk)
+
+        records = np.empty(min(chunk_rows, len(faces)), face_dtype)
+        records["count"] = 3
+        for start, stop in _chunks(len(faces), chunk_rows):
+            chunk = records[: stop - start]
+            chunk["indices"] = faces[start:stop]
+            f.write(chunk)
+    return path
+
+
+def write_stl(path, vertices, faces, chunk_rows=CHUNK_ROWS // 4):
+    """Write a binary STL file, with the face normals MeshLab would compute.
+
+    Parameters
+    ----------
+    path : str
+    vertices, faces : np.ndarray
+    chunk_rows : int, optional
+        Number of faces converted at a time.
+    """
+    header = np.zeros(84, np.uint8)
+    header[:80] = np.frombuffer(b"napari-pymeshlab".ljust(80), np.uint8)
+    header[80:].view("<u4")[0] = len(faces)
+
+    with open(path, "wb") as f:
+        f.write(header)
+        records = np.zeros(min(chunk_rows, len(faces)), _STL_TRIANGLE)
+        for start, stop in _chunks(len(faces), chunk_rows):
+            chunk = records[: stop - start]
+            corners = vertices[faces[start:stop]]
+            normals = np.cross(
+                corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]
+            )
+            norms = np.linalg.norm(normals, axis=1, keepdims=True)
+            np.divide(normals, norms, out=normals, where=norms > 0)
+            chunk["normal"] = normals
+            chunk["vertices"] = corners
+            f.write(chunk)
+    return path
+
+
+def _write_obj_mesh(f, vertices, faces, colors, offset, chunk_rows):
+    # as many digits as it takes to read the coordinates back exactly
+    digits = 9 if np.asarray(vertices).dtype == np.float32 else 17
+    vertex_line = f"v %.{digits}g %.{digits}g %.{digits}g"
+    if colors is not None:
+        vertex_line += " %.6g %.6g %.6g"
+    vertex_line += "\n"
+
+    for start, stop in _chunks(len(vertices), chunk_rows):
+        chunk = vertices[start:stop]
+        if colors is not None:
+            chunk = np.hstack([chunk, colors[start:stop, :3] / 255])
+        f.write(vertex_line * len(chunk) % tuple(chunk.ravel()))
+    for start, stop in _chunks(len(faces), chunk_rows):
+        chunk = faces[start:stop] + offset
+        f.write("f %d %d %d\n" * len(chunk) % tuple(chunk.ravel()))
+
+
+def write_obj(path, vertices, faces, colors=None, chunk_rows=CHUNK_ROWS // 4):
+    """Write a Wavefront OBJ file.
+
+    OBJ is a text format; coordinates are written with enough digits to read
+    back exactly.
+
+    Parameters
+    ----------
+    path : str
+    vertices, faces : np.ndarray
+    colors : np.ndarray, optional
+        ``(N, 4)`` RGBA bytes, written as RGB floats after the coordinates, the
+        way MeshLab does.
+    chunk_rows : int, optional
+        Number of vertices or faces formatted at a time.
+    """
+    with open(path, "w", encoding="ascii", newline="\n") as f:
+        f.write(f"# Vertices: {len(vertices)}\n# Faces: {len(faces)}\n")
+        # OBJ indices start at 1
+        _write_obj_mesh(f, vertices, faces, colors, 1, chunk_rows)
+    return path
+
+
+def write_obj_scene(path, meshes, chunk_rows=CHUNK_ROWS // 4):
+    """Write several surfaces to one OBJ file, as separate named objects.
+
+    Parameters
+    ----------
+    path : str
+    meshes : iterable of tuple
+        ``(name, vertices, faces, colors)``, with ``colors`` as in
+        :func:`write_obj` or None.
+    chunk_rows : int, optional
+        Number of vertices or faces formatted at a time.
+    """
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        offset = 1
+        for name, vertices, faces, colors in meshes:
+            # object names end at the end of the line
+            f.write("o " + " ".join(str(name).split()) + "\n")
+            _write_obj_mesh(f, vertices, faces, colors, offset, chunk_rows)
+            offset += len(vertices)
+    return path
+
+
+_WRITERS = {".ply": write_ply, ".stl": write_stl, ".obj": write_obj}
+
+
+def read_native(path):
+    """Read ``path`` natively if possible.
+
+    Returns
+    -------
+    tuple of np.ndarray or None
+        ``(vertices, faces, colors)``, or None if the file has to be read by
+        pymeshlab.
+    """
+    reader = _READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        return None
+    with stage("read native") as s:
+        try:
+            surface = reader(path)
+        except (ValueError, OSError):
+            return None
+        s.output(len(surface[0]), len(surface[1]))
+    return surface
+
+
+def write_native(path, vertices, faces, colors=None):
+    """Write ``path`` natively if possible.
+
+    Parameters
+    ----------
+    path : str
+    vertices, faces : np.ndarray
+    colors : np.ndarray, optional
+        ``(N, 4)`` RGBA bytes. STL files have no vertex colors.
+
+    Returns
+    -------
+    bool
+        False if the file has to be written by pymeshlab.
+    """
+    writer = _WRITERS.get(os.path.splitext(path)[1].lower())
+    faces = np.asarray(faces)
+    if writer is None or faces.ndim != 2 or faces.shape[1] != 3:
+        return False
+    with stage("write native", len(vertices), len(faces)):
+        if writer is write_stl:
+            writer(path, vertices, faces)
+        else:
+            writer(path, vertices, faces, colors)
+    return True
@@ -0,0 +1,273 @@
+"""
+Helpers for running mesh work in a process pool.
+
+Arrays are handed between processes through ``multiprocessing.shared_memory``
+rather than pickled through the pool's pipe, which for large meshes would mean
+several extra copies of every buffer.
+"""
+import os
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from ._convert import get_precision, set_precision
+from ._instrument import (
+    forward_stages,
+    replay_stages,
+    start_forwarding,
+    worker_profiling,
+)
+
+# On Windows a block is destroyed as soon as its last handle is closed, so the
+# process that created it keeps it open until it is freed or the pool shuts
+# down.
+_KEEPALIVE = {}
+
+# items submitted to the pool at a time, per worker; one more than the worker
+# is running keeps it busy while the parent collects the previous result
+ITEMS_PER_WORKER = 2
+
+
+class SharedArray:
+    """Picklable handle to an array stored in a shared memory block."""
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    @classmethod
+    def create(cls, array):
+        """Copy ``array`` into a new shared memory block.
+
+        The block is owned by whoever calls :meth:`take` or :meth:`unlink`,
+        not by the creating process.
+        """
+        array = np.asarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+        if os.name == "nt":
+            _KEEPALIVE[shm.name] = shm
+        else:
+            # otherwise the creator's resource tracker frees it when it exits
+            resource_tracker.unregister(shm._name, "shared_memory")
+            shm.close()
+        return cls(shm.name, array.shape, array.dtype.str)
+
+    def open(self, track=True):
+        """Attach to the block. Returns the block and a view of the array.
+
+        With ``track=False`` this process will not free the block when it
+        exits, which is what a worker reading someone else's block wants.
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        if not track and os.name != "nt":
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm, np.ndarray(self.shape, np.dtype(self.dtype), buffer=shm.buf)
+
+    def take(self):
+        """Copy the array out of shared memory and free the block."""
+        shm, view = self.open()
+        array = view.copy()
+        del view
+        shm.close()
+        self._free(shm)
+        return array
+
+    def unlink(self):
+        """Free the block without reading it."""
+        shm, view = self.open()
+        del view
+        shm.close()
+        self._free(shm)
+
+    def _free(self, shm):
+        shm.unlink()
+        kept = _KEEPALIVE.pop(self.name, None)
+        if kept is not None:
+            kept.close()
+
+
+class ItemError(Exception):
+    """An item of :func:`map_shared` failed in its worker."""
+
+    def __init__(self, index, message):
+        super().__init__(index, message)
+        self.index = index
+        self.message = message
+
+    def __str__(self):
+        return f"item {self.index} failed: {self.message}"
+
+
+def share(obj):
+    """Move every array in a (nested) tuple or list into shared memory."""
+    if isinstance(obj, np.ndarray):
+        return SharedArray.create(obj)
+    if isinstance(obj, (tuple, list)):
+        return type(obj)(share(o) for o in obj)
+    return obj
+
+
+def take(obj):
+    """Inverse of :func:`share`; frees the shared memory blocks."""
+    if isinstance(obj, SharedArray):
+        return obj.take()
+    if isinstance(obj, (tuple, list)):
+        return type(obj)(take(o) for o in obj)
+    return obj
+
+
+def unlink(obj):
+    """Free the shared memory blocks of :func:`share` without reading them."""
+    if isinstance(obj, SharedArray):
+        obj.unlink()
+    elif isinstance(obj, (tuple, list)):
+        for o in obj:
+            unlink(o)
+
+
+def _attach(obj, blocks):
+    """Views of the shared arrays in ``obj``; opened blocks go to ``blocks``."""
+    if isinstance(obj, SharedArray):
+        shm, view = obj.open(track=False)
+        blocks.append(shm)
+        view.flags.writeable = False
+        return view
+    if isinstance(obj, (tuple, list)):
+        return type(obj)(_attach(o, blocks) for o in obj)
+    return obj
+
+
+def _call_and_share(func, index, item, shared_input):
+    blocks = []
+    with forward_stages() as records:
+        try:
+            if shared_input:
+                item = _attach(item, blocks)
+            result = share(func(item))
+        except Exception as e:  # noqa: BLE001
+            # exceptions from compiled extensions do not always pickle, so only
+            # the message travels back to the parent
+            message = "".join(traceback.format_exception_only(type(e), e)).strip()
+            result = ItemError(index, message)
+        finally:
+            del item
+            for shm in blocks:
+                try:
+                    shm.close()
+                except BufferError:  # func kept a view; the block closes with it
+                    pass
+    # the stages func ran, for the parent to record while it profiles
+    return result, records
+
+
+def default_workers(n_items):
+    """Number of worker processes to use for ``n_items`` independent jobs."""
+    return max(1, min(n_items, os.cpu_count() or 1))
+
+
+def _collect(index, future):
+    try:
+        result, records = future.result()
+        replay_stages(records)
+        return take(result)
+    except Exception as e:  # noqa: BLE001
+        return ItemError(index, repr(e))
+
+
+def _init_worker(precision, profiling):
+    # settings are module globals, which workers started with spawn or
+    # forkserver import afresh rather than inherit
+    set_precision(precision)
+    start_forwarding(profiling)
+
+
+def imap_shared(func, items, n_workers=None, share_inputs=False, return_errors=False):
+    """Generator version of :func:`map_shared`.
+
+    Results are yielded in the order of ``items`` as soon as they are ready.
+    ``items`` is consumed lazily: only ``ITEMS_PER_WORKER`` items per worker
+    are submitted, and with ``share_inputs`` held in shared memory, at any
+    time. If the generator is closed early, queued items are cancelled and
+    the results of running ones are discarded.
+    """
+    if n_workers is None:
+        n_items = len(items) if hasattr(items, "__len__") else os.cpu_count() or 1
+        n_workers = default_workers(n_items)
+    indexed = enumerate(items)
+    # (index, item as sent, future) of the items submitted and not collected
+    in_flight = deque()
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(get_precision(), worker_profiling()),
+    ) as pool:
+        try:
+            while True:
+                for i, item in islice(
+                    indexed, ITEMS_PER_WORKER * n_workers - len(in_flight)
+                ):
+                    sent = share(item) if share_inputs else item
+                    try:
+                        future = pool.submit(
+                            _call_and_share, func, i, sent, share_inputs
+                        )
+                    except BaseException:
+                        if share_inputs:
+                            unlink(sent)
+                        raise
+                    in_flight.append((i, sent, future))
+                if not in_flight:
+                    return
+                i, sent, future = in_flight[0]
+                result = _collect(i, future)
+                in_flight.popleft()
+                if share_inputs:
+                    unlink(sent)
+                if isinstance(result, ItemError) and not return_errors:
+                    raise result
+                yield result
+        finally:
+            # free the blocks of results nobody is going to collect
+            for i, sent, future in in_flight:
+                if not future.cancel():
+                    _collect(i, future)
+                if share_inputs:
+                    unlink(sent)
+
+
+def map_shared(func, items, n_workers=None, share_inputs=False, return_errors=False):
+    """Like ``map(func, items)``, but spread over a process pool.
+
+    ``func`` must be picklable (i.e. defined at module level). Array results
+    come back through shared memory and are returned in the order of
+    ``items``.
+
+    Parameters
+    ----------
+    func: callable
+    items: iterable
+    n_workers: int, optional
+        Number of processes. Defaults to one per item, up to the CPU count.
+    share_inputs: bool, optional
+        Also send the arrays in each item through shared memory. ``func``
+        then receives read-only views of them. Items are shared as they are
+        submitted and freed as their results come back, so only a few are in
+        shared memory at once.
+    return_errors: bool, optional
+        If True, an item that fails yields an :class:`ItemError` in its place
+        in the results. Otherwise the first failure is raised, after all
+        items have finished.
+    """
+    results = list(imap_shared(func, items, n_workers, share_inputs, True))
+    if not return_errors:
+        for result in results:
+            if isinstance(result, ItemError):
+                raise result
+    return results
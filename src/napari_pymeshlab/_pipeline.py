@@ -0,0 +1,255 @@
+"""
+Chain pymeshlab filters on a single MeshSet.
+
+Every filter in ``_widget.py`` used to build its own ``MeshSet`` from NumPy
+arrays and copy the result straight back out. ``MeshPipeline`` keeps one
+``MeshSet`` alive across steps so a chain of filters pays for the conversion
+once on the way in and once on the way out.
+"""
+from enum import Enum
+
+import numpy as np
+
+from ._clean import clean_mesh
+from ._convert import get_precision, mesh_to_surface
+from ._instrument import stage
+from ._memo import fingerprint
+
+
+class CurvatureType(Enum):
+    mean = "Mean"
+    gauss = "Gauss"
+    k1 = "K1"
+    k2 = "K2"
+    approxmean = "ApproxMean"
+
+
+def _convex_hull(ms):
+    try:
+        ms.convex_hull()
+    except AttributeError:
+        ms.generate_convex_hull()
+
+
+def _laplacian_smooth(ms, step_smooth_num):
+    try:
+        ms.laplacian_smooth(stepsmoothnum=step_smooth_num)
+    except AttributeError:
+        ms.apply_coord_laplacian_smoothing(stepsmoothnum=step_smooth_num)
+
+
+def _taubin_smooth(ms, lambda_, mu, step_smooth_num):
+    try:
+        ms.taubin_smooth(lambda_=lambda_, mu=mu, stepsmoothnum=step_smooth_num)
+    except AttributeError:
+        ms.apply_coord_taubin_smoothing(
+            lambda_=lambda_, mu=mu, stepsmoothnum=step_smooth_num
+        )
+
+
+def _simplification_clustering_decimation(ms, threshold_percentage):
+    import pymeshlab as ml
+
+    try:
+        ms.simplification_clustering_decimation(
+            threshold=ml.Percentage(threshold_percentage)
+        )
+    except AttributeError:
+        ms.meshing_decimation_clustering(
+            threshold=ml.PercentageValue(threshold_percentage)
+        )
+
+
+def _colorize_curvature_apss(
+    ms,
+    filter_scale,
+    projection_accuracy,
+    max_projection_iterations,
+    spherical_parameter,
+    curvature_type,
+):
+    kwargs = dict(
+        filterscale=filter_scale,
+        projectionaccuracy=projection_accuracy,
+        maxprojectioniters=max_projection_iterations,
+        sphericalparameter=spherical_parameter,
+        curvaturetype=CurvatureType(curvature_type).value,
+    )
+    try:
+        ms.compute_curvature_and_color_apss_per_vertex(**kwargs)
+    except AttributeError:
+        ms.colorize_curvature_apss(**kwargs)
+
+
+class MeshPipeline:
+    """Lazily apply a chain of pymeshlab filters to one surface.
+
+    Filter methods only record a step and return the pipeline, so calls can be
+    chained. Nothing runs until :meth:`run` or :meth:`to_surface` is called,
+    and the surface stays inside a single ``MeshSet`` between steps.
+
+    Parameters
+    ----------
+    surface: napari.types.SurfaceData
+    clean: bool, optional
+        Merge duplicate vertices and drop degenerate and duplicate faces, see
+        :func:`clean_mesh`, before the first step.
+
+    Examples
+    --------
+    >>> smoothed = (
+    ...     MeshPipeline(surface)
+    ...     .taubin_smooth()
+    ...     .simplification_clustering_decimation(2)
+    ...     .to_surface()
+    ... )
+    """
+
+    def __init__(self, surface, clean=False):
+        self._surface = surface
+        self._clean = clean
+        self._ms = None
+        self._steps = []
+        self._pending = []
+        # the last step decides what goes into the values slot of the output
+        self._values_from_color = False
+
+    @property
+    def mesh_set(self):
+        """The underlying ``pymeshlab.MeshSet``, with all pending steps run."""
+        return self.run()
+
+    def add_step(self, func, *args, values_from_color=False, **kwargs):
+        """Record ``func(mesh_set, *args, **kwargs)`` as the next step.
+
+        Parameters
+        ----------
+        func: callable
+            Called with the ``MeshSet`` as first argument. It should leave its
+            result as the current mesh.
+        values_from_color: bool, optional
+            If True, the output values are taken from the vertex colors, as for
+            filters which encode their result in color.
+
+        Returns
+        -------
+        MeshPipeline
+        """
+        self._steps.append((func, args, kwargs, values_from_color))
+        self._pending.append((func, args, kwargs, values_from_color))
+        return self
+
+    def convex_hull(self):
+        return self.add_step(_convex_hull, values_from_color=True)
+
+    def laplacian_smooth(self, step_smooth_num: int = 10):
+        return self.add_step(_laplacian_smooth, step_smooth_num)
+
+    def taubin_smooth(
+        self, lambda_: float = 0.5, mu: float = -0.53, step_smooth_num: int = 10
+    ):
+        return self.add_step(_taubin_smooth, lambda_, mu, step_smooth_num)
+
+    def simplification_clustering_decimation(self, threshold_percentage: float = 1):
+        return self.add_step(
+            _simplification_clustering_decimation, threshold_percentage
+        )
+
+    def colorize_curvature_apss(
+        self,
+        filter_scale: float = 2,
+        projection_accuracy: float = 0.0001,
+        max_projection_iterations: int = 15,
+        spherical_parameter: float = 1,
+        curvature_type: CurvatureType = CurvatureType.mean,
+    ):
+        return self.add_step(
+            _colorize_curvature_apss,
+            filter_scale,
+            projection_accuracy,
+            max_projection_iterations,
+            spherical_parameter,
+            curvature_type,
+            values_from_color=True,
+        )
+
+    def cache_key(self):
+        """Key identifying the input surface and every step, for caching.
+
+        Returns None if a step is a lambda or a nested function, since those
+        cannot be told apart by name.
+        """
+        steps = []
+        for func, args, kwargs, values_from_color in self._steps:
+            name = f"{func.__module__}.{func.__qualname__}"
+            if "<" in name:
+                return None
+            steps.append((name, args, sorted(kwargs.items()), values_from_color))
+        return (
+            fingerprint(self._surface[0], self._surface[1]),
+            repr(steps),
+            get_precision(),
+            self._clean,
+        )
+
+    @property
+    def pending(self):
+        """Number of steps which have not run yet."""
+        return len(self._pending)
+
+    def iter_run(self):
+        """Run pending steps one at a time, yielding after each.
+
+        The first yield comes once the surface has been copied into the
+        ``MeshSet``, so a full run yields ``pending + 1`` times.
+
+        Yields
+        ------
+        int
+            Number of steps still pending.
+        """
+        if self._ms is None:
+            import pymeshlab as ml
+
+            vertices, faces = self._surface[0], self._surface[1]
+            if self._clean:
+                vertices, faces, _ = clean_mesh(vertices, faces)
+            with stage("to mesh", len(vertices), len(faces)) as s:
+                self._ms = ml.MeshSet()
+                # pymeshlab takes double precision vertices only
+                vertices = np.asarray(vertices, dtype=np.float64)
+                self._ms.add_mesh(ml.Mesh(vertices, faces))
+                self._ms.set_current_mesh(0)
+                s.output(mesh=self._ms.current_mesh())
+            yield len(self._pending)
+
+        while self._pending:
+            func, args, kwargs, values_from_color = self._pending.pop(0)
+            name = func.__name__.lstrip("_")
+            with stage(name, mesh=self._ms.current_mesh()) as s:
+                func(self._ms, *args, **kwargs)
+                s.output(mesh=self._ms.current_mesh())
+            self._values_from_color = values_from_color
+            yield len(self._pending)
+
+    def run(self):
+        """Run all pending steps and return the ``MeshSet``."""
+        for _ in self.iter_run():
+            pass
+        return self._ms
+
+    def to_surface(self):
+        """Run all pending steps and copy the current mesh out to NumPy.
+
+        Returns
+        -------
+        napari.types.SurfaceData
+        """
+        mesh = self.run().current_mesh()
+
+        values = None
+        if self._values_from_color:
+            with stage("color values", mesh=mesh):
+                values = np.asarray(mesh.vertex_color_array())
+
+        return mesh_to_surface(mesh, values)
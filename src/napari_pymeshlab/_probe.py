@@ -0,0 +1,191 @@
+"""
+Mesh statistics from file headers, without loading the geometry.
+
+Whether a file should be decimated or tiled is best decided before it is
+loaded, which for a mesh of tens of millions of faces takes a while and
+gigabytes of memory. Most formats say how large the mesh is up front, or make
+it cheap to find out:
+
+* PLY and OFF headers give the vertex and face counts and, in PLY, which
+  properties the vertices have,
+* binary STL files give their triangle count in the first 84 bytes,
+* OBJ and ASCII STL files are counted line by line in one pass over the
+  bytes, without parsing any numbers.
+
+The bounding box takes a pass over the vertices, which is only cheap for the
+fixed-size records of binary PLY and STL files, and is left out otherwise.
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from ._native import _STL_TRIANGLE, _ply_type, _read_ply_header
+
+# counts are None where the file does not tell without loading it, as the
+# number of distinct vertices of an STL file; ``bounds`` is the ``(2, 3)``
+# minimum and maximum of the vertices, or None
+MeshInfo = namedtuple(
+    "MeshInfo", ["n_vertices", "n_faces", "bounds", "has_colors", "has_normals"]
+)
+
+# bytes read at a time when counting lines
+_CHUNK_BYTES = 1 << 24
+
+
+def _ply_bounds(path, byte_order, elements, offset):
+    name, n_vertices, properties = elements[0]
+    if byte_order is None or name != "vertex" or not n_vertices:
+        return None
+    if any(prop[0] == "list" for prop in properties):
+        return None
+    record = np.dtype(
+        [(prop[1], _ply_type(prop[0], byte_order)) for prop in properties]
+    )
+    vertices = np.memmap(path, record, mode="r", offset=offset, shape=(n_vertices,))
+    return np.array(
+        [[vertices[c].min() for c in "xyz"], [vertices[c].max() for c in "xyz"]],
+        dtype=np.float64,
+    )
+
+
+def _probe_ply(path, bounds=False, header_only=False):
+    with open(path, "rb") as f:
+        byte_order, elements, offset = _read_ply_header(f, ascii=True)
+    counts = {name: n for name, n, _ in elements}
+    names = {
+        prop[-1] for name, _, props in elements if name == "vertex" for prop in props
+    }
+    box = _ply_bounds(path, byte_order, elements, offset) if bounds else None
+    return MeshInfo(
+        counts.get("vertex", 0),
+        counts.get("face", 0),
+        box,
+        "red" in names or "diffuse_red" in names,
+        "nx" in names,
+    )
+
+
+def _probe_stl(path, bounds=False, header_only=False):
+    with open(path, "rb") as f:
+        header = f.read(84)
+    if len(header) < 84:
+        raise ValueError("STL file is too short")
+    (n_triangles,) = np.frombuffer(header, "<u4", count=1, offset=80)
+    n_triangles = int(n_triangles)
+
+    if os.path.getsize(path) != 84 + n_triangles * _STL_TRIANGLE.itemsize:
+        if not header.lstrip().startswith(b"solid"):
+            raise ValueError("Not an STL file")
+        if header_only:
+            return None
+        (n_faces,), _ = _count_lines(path, [b"endfacet"], line_start=False)
+        return MeshInfo(None, n_faces, None, False, False)
+
+    box = None
+    if bounds and n_triangles:
+        triangles = np.memmap(
+            path, _STL_TRIANGLE, mode="r", offset=84, shape=(n_triangles,)
+        )
+        corners = triangles["vertices"].reshape(-1, 3)
+        box = np.array([corners.min(axis=0), corners.max(axis=0)], dtype=np.float64)
+    # vertices are shared between triangles, which only merging them tells
+    return MeshInfo(None, n_triangles, box, False, False)
+
+
+def _count_lines(path, starts, line_start=True):
+    """Number of lines of ``path`` starting with each of ``starts``.
+
+    Also returns the first line starting with the first of ``starts``, or
+    None. Without ``line_start``, occurrences anywhere in a line are counted.
+    """
+    patterns = [b"\n" + start if line_start else start for start in starts]
+    counts = [0] * len(patterns)
+    first = None
+    with open(path, "rb") as f:
+        # every line is counted from the newline before it, so the text
+        # counted always ends right before a newline
+        tail = b"\n"
+        while True:
+            chunk = f.read(_CHUNK_BYTES)
+            text = tail + chunk
+            cut = len(text) if not chunk else text.rfind(b"\n")
+            if cut <= 0:
+                tail = text
+                continue
+            counted, tail = text[:cut], text[cut:]
+            for i, pattern in enumerate(patterns):
+                counts[i] += counted.count(pattern)
+            if first is None and line_start:
+                start = counted.find(patterns[0])
+                if start >= 0:
+                    end = counted.find(b"\n", start + 1)
+                    first = counted[start + 1 : None if end < 0 else end]
+            if not chunk:
+                return counts, first
+
+
+def _probe_obj(path, bounds=False, header_only=False):
+    if header_only:
+        return None
+    (n_vertices, n_faces, n_normals), first = _count_lines(path, [b"v ", b"f ", b"vn "])
+    # vertex colors follow the coordinates on the same line
+    has_colors = first is not None and len(first.split()) >= 7
+    return MeshInfo(n_vertices, n_faces, None, has_colors, n_normals > 0)
+
+
+def _probe_off(path, bounds=False, header_only=False):
+    with open(path, "rb") as f:
+        lines = (line.split(b"#")[0].strip() for line in f)
+        keyword = next(lines)
+        if not keyword.endswith(b"OFF"):
+            raise ValueError("Not an OFF file")
+        # the counts may follow the keyword on the same line
+        words = keyword[len(keyword.split()[0]) :].split()
+        while not words:
+            words = next(lines).split()
+    prefix = keyword.split()[0][:-3]
+    return MeshInfo(int(words[0]), int(words[1]), None, b"C" in prefix, b"N" in prefix)
+
+
+_PROBES = {
+    ".ply": _probe_ply,
+    ".stl": _probe_stl,
+    ".obj": _probe_obj,
+    ".off": _probe_off,
+}
+
+
+def probe_mesh(path, bounds=False, header_only=False):
+    """Vertex and face counts of a mesh file, reading little more than its header.
+
+    Parameters
+    ----------
+    path: str
+    bounds: bool, optional
+        Also find the bounding box, with a pass over the vertices of binary
+        PLY and STL files.
+    header_only: bool, optional
+        Only read headers: OBJ and ASCII STL files, which are counted in a
+        pass over the whole file, are not probed.
+
+    Returns
+    -------
+    MeshInfo or None
+        None for formats that cannot be probed without loading them, or
+        without a pass over the file with ``header_only``. Face
+        counts are the number of polygons in the file, which pymeshlab splits
+        into triangles.
+
+    Raises
+    ------
+    ValueError
+        If the file does not have the format its extension says.
+    """
+    probe = _PROBES.get(os.path.splitext(path)[1].lower())
+    if probe is None:
+        return None
+    try:
+        return probe(path, bounds, header_only)
+    except StopIteration:
+        raise ValueError(f"{path} is truncated") from None
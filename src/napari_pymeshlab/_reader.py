@@ -1,4 +1,37 @@
-import pymeshlab as ml
+import os
+import warnings
+
+from ._cache import mesh_cache
+from ._convert import (colors_to_numpy, faces_to_numpy, surface_layer_data,
+                       vertices_to_numpy)
+from ._instrument import stage
+from ._native import read_native
+from ._parallel import default_workers, map_shared
+from ._probe import probe_mesh
+
+# below this many files, starting a process pool costs more than it saves
+PARALLEL_MIN_PATHS = 4
+
+# files with more faces than this are warned about before they are read
+LARGE_MESH_FACES = int(os.environ.get("NAPARI_PYMESHLAB_LARGE_FACES",
+                                      10_000_000))
+
+# files with more faces than this are decimated once read; 0 for no limit
+MAX_FACES = int(os.environ.get("NAPARI_PYMESHLAB_MAX_FACES", 0))
+
+MESH_EXTENSIONS = ('.3ds', '.apts', '.asc', '.bre', '.ctm',
+                   '.dae', '.e57', '.es', '.fbx', '.glb',
+                   '.gltf', '.obj', '.off', '.pdb', '.ply',
+                   '.ptx', '.qobj', '.stl', '.vmi', '.wrl',
+                   '.x3d', '.x3dv')
+
+
+def _mesh_files(directory):
+    """Paths of the mesh files in ``directory``, sorted by name."""
+    return sorted(os.path.join(directory, name)
+                  for name in os.listdir(directory)
+                  if name.lower().endswith(MESH_EXTENSIONS))
+
 
 def get_mesh_reader(path):
     """Check if we can use the mesh reader here.
@@ -6,7 +39,7 @@ def get_mesh_reader(path):
     Parameters
     ----------
     path : str or list of str
-        Path to file, or list of paths.
+        Path to file, or list of paths, or a directory of mesh files.
 
     Returns
     -------
@@ -14,6 +47,9 @@ def get_mesh_reader(path):
         If the path is a recognized format, return a function that accepts the
         same path or list of paths, and returns a list of layer data tuples.
     """
+    if isinstance(path, str) and os.path.isdir(path):
+        return mesh_reader if _mesh_files(path) else None
+
     if isinstance(path, list):
         # reader plugins may be handed single path, or a list of paths.
         # if it is a list, it is assumed to be an image stack...
@@ -21,49 +57,186 @@ def get_mesh_reader(path):
         path = path[0]
 
     # if we know we cannot read the file, we immediately return None.
-    exts = tuple(['.3ds', '.apts', '.asc', '.bre', '.ctm', 
-                  '.dae', '.e57', '.es', '.fbx', '.glb', 
-                  '.gltf', '.obj', '.off', '.pdb', '.ply',
-                  '.ptx', '.qobj', '.stl', '.vmi', '.wrl',
-                  '.x3d', '.x3dv'])
-    if not path.endswith(exts):
+    if not path.endswith(MESH_EXTENSIONS):
         return None
 
     # otherwise we return the *function* that can read ``path``.
     return mesh_reader
 
 
-def mesh_reader(path):
+def _load_mesh(path):
+    """Load a single file and return its vertices, faces and colors.
+
+    Colors are ``(N, 4)`` RGBA bytes, or ones if they are all the same.
+
+    Binary PLY and STL files are parsed with NumPy directly, everything else
+    (or anything the native readers do not understand) goes to pymeshlab.
+    """
+    surface = read_native(path)
+    if surface is not None:
+        return surface
+
+    import pymeshlab as ml
+
+    with stage("load mesh") as s:
+        ms = ml.MeshSet()
+        ms.load_new_mesh(path)
+        mesh = ms.current_mesh()
+        s.output(mesh=mesh)
+    with stage("to surface", mesh=mesh) as s:
+        surface = (vertices_to_numpy(mesh),
+                   faces_to_numpy(mesh),
+                   colors_to_numpy(mesh))
+        s.output(len(surface[0]), len(surface[1]))
+    return surface
+
+
+def _read_surfaces(paths, n_workers=None, use_cache=None, warn_large=False,
+                   max_faces=None):
+    """Surfaces of ``paths``, in order, through the cache and in parallel.
+
+    With ``warn_large``, files that are not in the cache are checked for
+    their size before they are loaded, see ``_warn_if_large``.
+    """
+    if use_cache is None:
+        use_cache = mesh_cache.enabled
+
+    surfaces = [None] * len(paths)
+    if use_cache:
+        with stage("cache lookup"):
+            surfaces = [mesh_cache.get(_path) for _path in paths]
+    missing = [i for i, surface in enumerate(surfaces) if surface is None]
+    missing_paths = [paths[i] for i in missing]
+    if warn_large:
+        for _path in missing_paths:
+            _warn_if_large(_path, max_faces)
+
+    if n_workers is None:
+        n_workers = default_workers(len(missing_paths))
+
+    if n_workers > 1 and len(missing_paths) >= PARALLEL_MIN_PATHS:
+        loaded = map_shared(_load_mesh, missing_paths, n_workers)
+    else:
+        loaded = [_load_mesh(_path) for _path in missing_paths]
+
+    for i, surface in zip(missing, loaded):
+        surfaces[i] = surface
+        if use_cache:
+            with stage("cache store", len(surface[0]), len(surface[1])):
+                mesh_cache.put(paths[i], surface)
+    return surfaces
+
+
+def _warn_if_large(path, max_faces):
+    """Warn about a file too large to open comfortably, from its header.
+
+    Files whose size is not in their header, OBJ and ASCII STL files, are
+    not checked: counting their faces takes a pass over the whole file.
+    """
+    try:
+        info = probe_mesh(path, header_only=True)
+    except Exception:  # noqa: BLE001
+        # the warning must never keep a file from being read: the reader
+        # tells what is wrong with it, or reads what the probe could not
+        return
+    if info is None or info.n_faces is None:
+        return
+    if info.n_faces <= LARGE_MESH_FACES:
+        return
+    if max_faces and info.n_faces > max_faces:
+        warnings.warn(f"{path} has {info.n_faces:,} faces, it is decimated "
+                      f"to about {max_faces:,}")
+    else:
+        warnings.warn(f"{path} has {info.n_faces:,} faces; pass max_faces to "
+                      "mesh_reader, or set NAPARI_PYMESHLAB_MAX_FACES, to "
+                      "decimate it as it is read")
+
+
+def _read_decimated(paths, n_workers, use_cache, max_faces):
+    """``_read_surfaces``, decimating surfaces of more than ``max_faces``."""
+    surfaces = _read_surfaces(paths, n_workers, use_cache, True, max_faces)
+    if not max_faces:
+        return surfaces
+
+    from ._lod import decimate_to
+
+    return [decimate_to(surface, max_faces) for surface in surfaces]
+
+
+def mesh_reader(path, n_workers=None, use_cache=None, as_sequence=None,
+                max_faces=None):
     """Read a mesh in using pymeshlab.
 
+    Several paths are loaded in parallel, one process per file, unless there
+    are fewer than ``PARALLEL_MIN_PATHS`` of them. With the mesh cache on,
+    files parsed before are memory-mapped from the cache instead.
+
+    Files numbered by time point, such as ``cell_t000.ply``,
+    ``cell_t001.ply``, ..., can be read as one time series instead, see
+    :func:`find_sequences` and :class:`MeshSequence`: a single surface layer
+    with a time dimension, whose timepoints are loaded when the time slider
+    reaches them. Files numbered otherwise, such as ``cell_001.ply``, are
+    read as separate surfaces.
+
     Parameters
     ----------
     path : str or list of str
-        Path to file, or list of paths.
+        Path to file, or list of paths, or a directory of mesh files.
+    n_workers : int, optional
+        Number of processes used to load a list of paths. Defaults to one per
+        path, up to the number of CPUs. Pass 1 to load serially.
+    use_cache : bool, optional
+        Read through the on-disk mesh cache. Defaults to
+        ``mesh_cache.enabled``.
+    as_sequence : bool, optional
+        Read files numbered by time point as time series. Defaults to True
+        for a directory and False for a list of paths.
+    max_faces : int, optional
+        Surfaces with more faces are decimated to about this many, see
+        :func:`decimate_to`; timepoints of time series are not. Defaults to
+        ``$NAPARI_PYMESHLAB_MAX_FACES``, or no limit. PLY, OFF and binary
+        STL files with more than ``LARGE_MESH_FACES`` faces are warned about,
+        from their header, before they are read, unless they are in the
+        cache.
 
     Returns
     -------
     layer_data : list of tuples
-        List of surfaces, one per file path.
+        List of surfaces, one per file path or time series, in the order of
+        ``path``. Vertex colors, unless they are all the same, are passed as
+        the ``vertex_colors`` of the layer.
     """
     # handle both a string and a list of strings
     paths = [path] if isinstance(path, str) else path
+    if isinstance(path, str) and os.path.isdir(path):
+        paths = _mesh_files(path)
+        if as_sequence is None:
+            as_sequence = True
 
-    ms = ml.MeshSet()  # create a mesh set
-    
-    # load all files into the mesh set
-    for _path in paths:
-        ms.load_new_mesh(_path)
-
-    # loop through the mesh set and parse the surfaces
-    surfaces = []
-    for i in range(ms.number_meshes()):
-        ms.set_current_mesh(i)
-        surfaces.append((ms.current_mesh().vertex_matrix(), 
-                         ms.current_mesh().face_matrix(), 
-                         ms.current_mesh().vertex_color_matrix().T))
+    if max_faces is None:
+        max_faces = MAX_FACES
 
     # optional kwargs for the corresponding viewer.add_* method
     add_kwargs = {}
 
-    return [(surface, add_kwargs, "surface") for surface in surfaces]
+    if not as_sequence:
+        surfaces = _read_decimated(paths, n_workers, use_cache, max_faces)
+        return [surface_layer_data(surface, add_kwargs) for surface in surfaces]
+
+    from ._sequence import MeshSequence, find_sequences, watch_viewer
+
+    groups = find_sequences(paths)
+    singles = iter(_read_decimated([group[0] for group in groups
+                                    if len(group) == 1],
+                                   n_workers, use_cache, max_faces))
+    layer_data = []
+    for group in groups:
+        if len(group) == 1:
+            layer_data.append(surface_layer_data(next(singles), add_kwargs))
+        else:
+            sequence = MeshSequence(group, use_cache=use_cache)
+            layer_data.append(sequence.layer_data())
+    if len(groups) < len(paths):
+        # play the time series in the viewer they are opened in
+        watch_viewer()
+    return layer_data
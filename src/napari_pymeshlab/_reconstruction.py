@@ -0,0 +1,312 @@
+"""
+Screened Poisson surface reconstruction of point clouds.
+
+Reconstructing a cloud of tens of millions of points in a single ``MeshSet``
+needs memory in proportion to the whole cloud. In tiled mode the cloud is cut
+into a grid of cubic tiles instead. Each tile is reconstructed on its own,
+together with a margin of the neighbouring points, in a process pool. Only the
+faces whose centroid lies inside the tile itself are kept, so every face
+belongs to exactly one tile, and the pieces are concatenated. The tiles are
+cut from the cloud and submitted a few at a time, so besides the cloud and the
+surface, peak memory depends on the tile size and the number of workers.
+
+Neighbouring tiles are reconstructed on different octrees, so their vertices
+along a tile boundary do not coincide. Boundary vertices of the pieces about
+an edge apart are merged on a grid, which closes most of the seam, but pairs
+on either side of a cell boundary are missed, and small cracks can remain
+where the two surfaces take different paths.
+
+MeshLab's screened Poisson is not thread safe: two runs in threads of one
+process can livelock or crash. Every reconstruction, tiled or not, therefore
+runs in a worker process, so several can run at the same time.
+"""
+from functools import partial
+
+import numpy as np
+
+from ._clean import _first_ids, _grid_keys, clean_mesh, take_vertices
+from ._convert import FACE_DTYPE, colors_to_numpy, compact_colors, mesh_to_surface
+from ._instrument import stage
+from ._parallel import imap_shared, map_shared
+
+# tiles with fewer points than this are skipped, there is nothing to
+# reconstruct in them
+MIN_TILE_POINTS = 100
+
+
+def _reconstruct(ms, params):
+    """Estimate normals and run screened Poisson on the current mesh of ``ms``."""
+    normals_kwargs = dict(
+        k=params["n_neighbors"],  # number of neighbors
+        smoothiter=params["smooth_iter"],
+        flipflag=params["flip"],
+        viewpos=np.asarray(params["viewpos"], dtype=float),
+    )
+    with stage("normals", mesh=ms.current_mesh()):
+        try:
+            ms.compute_normals_for_point_sets(**normals_kwargs)
+        except AttributeError:
+            ms.compute_normal_for_point_clouds(**normals_kwargs)
+    yield
+
+    spr_kwargs = dict(
+        visiblelayer=False,
+        depth=params["depth"],
+        fulldepth=params["full_depth"],
+        cgdepth=params["cg_depth"],
+        scale=params["scale"],
+        samplespernode=params["samples_per_node"],
+        pointweight=params["point_weight"],
+        iters=params["iters"],
+        confidence=params["confidence"],
+        preclean=params["preclean"],
+    )
+    with stage("screened poisson", mesh=ms.current_mesh()) as s:
+        try:
+            ms.surface_reconstruction_screened_poisson(**spr_kwargs)
+        except AttributeError:
+            ms.generate_surface_reconstruction_screened_poisson(**spr_kwargs)
+        s.output(mesh=ms.current_mesh())
+    yield
+
+
+def _params(
+    n_neighbors=10,
+    smooth_iter=0,
+    flip=False,
+    viewpos=(0, 0, 0),
+    depth=8,
+    full_depth=5,
+    cg_depth=0,
+    scale=1.1,
+    samples_per_node=1.5,
+    point_weight=4,
+    iters=8,
+    confidence=False,
+    preclean=False,
+):
+    return dict(locals())
+
+
+def _mesh_set(points):
+    import pymeshlab as ml
+
+    with stage("to mesh", len(points)):
+        ms = ml.MeshSet()
+        ms.add_mesh(ml.Mesh(np.asarray(points, dtype=np.float64)))
+    return ms
+
+
+def _surface(mesh, compact=True):
+    # the vertex colors MeshLab interpolates from the points are the values
+    return mesh_to_surface(mesh, colors_to_numpy(mesh, compact))
+
+
+def _reconstruct_points(params, points):
+    ms = _mesh_set(points)
+    for _ in _reconstruct(ms, params):
+        pass
+    return _surface(ms.current_mesh())
+
+
+def screened_poisson_steps(points, **params):
+    """Screened Poisson reconstruction in a worker process.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        ``(N, 3)`` point coordinates.
+    **params
+        Parameters of ``screened_poisson_reconstruction``.
+
+    Returns
+    -------
+    napari.types.SurfaceData
+        As the return value of the generator; it yields twice, before and
+        after the reconstruction.
+    """
+    params = _params(**params)
+    points = np.asarray(points, dtype=np.float64)
+    yield
+    (surface,) = map_shared(
+        partial(_reconstruct_points, params), [points], 1, share_inputs=True
+    )
+    yield
+    return surface
+
+
+def tile_grid(points, tile_size):
+    """Origin and shape of the grid of ``tile_size`` tiles covering ``points``."""
+    lower = points.min(axis=0)
+    extent = points.max(axis=0) - lower
+    shape = np.maximum(np.ceil(extent / tile_size), 1).astype(int)
+    return lower, tuple(shape)
+
+
+def _tile_index(coords, origin, tile_size, shape):
+    index = np.floor((coords - origin) / tile_size).astype(int)
+    return np.clip(index, 0, np.subtract(shape, 1))
+
+
+def _split(points, origin, tile_size, shape, overlap):
+    """Indices of the points of every tile that has any, including its margin.
+
+    Returns a list of ``(indices, tile)``.
+    """
+    margin = overlap * tile_size
+    lower = _tile_index(points - margin, origin, tile_size, shape)
+    upper = _tile_index(points + margin, origin, tile_size, shape)
+
+    # with a margin smaller than a tile, a point falls in at most two tiles
+    # along each axis: pair it with each of them
+    point_ids, tile_ids = [], []
+    for corner in np.ndindex(2, 2, 2):
+        corner = np.array(corner, dtype=bool)
+        selected = np.all(~corner | (upper != lower), axis=1)
+        tiles = np.where(corner, upper[selected], lower[selected])
+        point_ids.append(np.flatnonzero(selected))
+        tile_ids.append(np.ravel_multi_index(tiles.T, shape))
+    point_ids = np.concatenate(point_ids)
+    tile_ids = np.concatenate(tile_ids)
+
+    order = np.argsort(tile_ids, kind="stable")
+    tile_ids, starts = np.unique(tile_ids[order], return_index=True)
+    groups = np.split(point_ids[order], starts[1:])
+    return [
+        (ids, np.unravel_index(tile_id, shape))
+        for tile_id, ids in zip(tile_ids, groups)
+    ]
+
+
+def _reconstruct_tile(params, origin, tile_size, shape, item):
+    """Reconstruct one tile and keep the faces that belong to it."""
+    points, tile = item
+    ms = _mesh_set(points)
+    for _ in _reconstruct(ms, params):
+        pass
+    # tiles may differ in whether their colors are all the same
+    vertices, faces, colors = _surface(ms.current_mesh(), compact=False)
+    del ms
+
+    centroids = vertices[faces].mean(axis=1)
+    owner = _tile_index(centroids, origin, tile_size, shape)
+    faces = faces[np.all(owner == tile, axis=1)]
+
+    # drop the vertices no kept face refers to
+    used = np.zeros(len(vertices), dtype=bool)
+    used[faces] = True
+    remap = np.cumsum(used) - 1
+    return (
+        vertices[used],
+        remap[faces].astype(faces.dtype),
+        colors[used],
+    )
+
+
+def tiled_screened_poisson_steps(
+    points,
+    tile_size,
+    overlap=0.1,
+    n_workers=None,
+    min_tile_points=MIN_TILE_POINTS,
+    **params,
+):
+    """Screened Poisson reconstruction of ``points`` in tiles.
+
+    Parameters
+    ----------
+    points: np.ndarray
+        ``(N, 3)`` point coordinates.
+    tile_size: float
+        Edge length of the cubic tiles, in the units of ``points``. Note that
+        ``depth`` then sets the octree depth of each tile, so smaller tiles
+        give finer surfaces at the same depth.
+    overlap: float, optional
+        Margin of neighbouring points reconstructed with each tile, as a
+        fraction of ``tile_size``.
+    n_workers: int, optional
+        Number of tiles reconstructed at the same time. Defaults to one per
+        tile, up to the CPU count.
+    min_tile_points: int, optional
+        Tiles with fewer points, including the margin, are skipped. Only
+        tiles with points in them or in their margin are reconstructed.
+    **params
+        Parameters of ``screened_poisson_reconstruction``.
+
+    Returns
+    -------
+    napari.types.SurfaceData
+        As the return value of the generator. Once it has split the cloud,
+        it yields the number of times it yields, and then yields once per
+        reconstructed tile.
+    """
+    if tile_size <= 0:
+        raise ValueError(f"tile_size must be positive, got {tile_size}")
+    if not 0 <= overlap < 1:
+        raise ValueError(f"overlap must be in [0, 1), got {overlap}")
+    params = _params(**params)
+    points = np.asarray(points, dtype=np.float64)
+    origin, shape = tile_grid(points, tile_size)
+    work = [
+        (ids, tile)
+        for ids, tile in _split(points, origin, tile_size, shape, overlap)
+        if len(ids) >= min_tile_points
+    ]
+    yield 1 + len(work)
+
+    parts = []
+    results = imap_shared(
+        partial(_reconstruct_tile, params, origin, tile_size, shape),
+        ((points[ids], tile) for ids, tile in work),
+        n_workers,
+        share_inputs=True,
+    )
+    try:
+        for part in results:
+            parts.append(part)
+            yield
+    finally:
+        # when cancelled, the tiles already running are finished and dropped
+        results.close()
+
+    if not parts:
+        raise ValueError("No tile has enough points to reconstruct a surface")
+    return _stitch(parts)
+
+
+def _boundary_edges(faces):
+    """Edges of only one face, as ``(K, 2)`` vertex indices."""
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    edges, counts = np.unique(edges, axis=0, return_counts=True)
+    return edges[counts == 1]
+
+
+def _stitch(parts):
+    """Concatenate the tiles, merging their boundary vertices on a grid.
+
+    The cells are as large as the median boundary edge: the boundaries of
+    neighbouring tiles are about one edge apart.
+    """
+    with stage("stitch tiles") as s:
+        offsets = np.cumsum([0] + [len(v) for v, _, _ in parts[:-1]])
+        vertices = np.concatenate([v for v, _, _ in parts])
+        faces = np.concatenate([f + o for (_, f, _), o in zip(parts, offsets)])
+        colors = np.concatenate([c for _, _, c in parts])
+        edges = _boundary_edges(faces)
+
+        # every boundary vertex becomes the first boundary vertex in its cell
+        remap = np.arange(len(vertices))
+        if len(edges):
+            lengths = np.linalg.norm(
+                vertices[edges[:, 0]] - vertices[edges[:, 1]], axis=1
+            )
+            ids = np.unique(edges)
+            merged, first = _first_ids(_grid_keys(vertices[ids], np.median(lengths)))
+            remap[ids] = ids[first[merged]]
+        vertices, faces, vertex_map = clean_mesh(vertices, remap[faces])
+        s.output(len(vertices), len(faces))
+    return (
+        vertices,
+        faces.astype(FACE_DTYPE),
+        compact_colors(take_vertices(colors, vertex_map)),
+    )
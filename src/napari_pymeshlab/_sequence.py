@@ -0,0 +1,341 @@
+"""
+Time series of meshes, loaded lazily.
+
+Time-lapse segmentations are often saved as one numbered mesh file per
+timepoint (``cell_t000.ply``, ``cell_t001.ply``, ...). Loading all of them up
+front takes as long as reading every file and holds every timepoint in
+memory. A :class:`MeshSequence` reads a timepoint when it is asked for, keeps
+recently used timepoints in a memory-bounded LRU cache, and reads the
+timepoints next to the current one in a background thread, so stepping
+through time rarely waits for the disk.
+
+napari surfaces cannot change their geometry over time, only their vertex
+values. A sequence is shown as a surface layer whose values have a time
+dimension with one step per timepoint, so napari shows a time slider, and
+:class:`SequencePlayer` swaps in the vertices and faces of the timepoint the
+slider is on.
+"""
+import os
+import re
+import threading
+import weakref
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Any, Dict
+
+import numpy as np
+
+from ._memo import FilterCache
+from ._reader import _read_surfaces
+
+# the last time point in a file name: a number after ``t``, ``tp``, ``time`` or
+# ``frame``, which does not follow another letter; other numbers, as in
+# ``cell_001.ply``, number objects rather than time points
+_TIMEPOINT = re.compile(
+    r"^(.*(?:^|[^a-z])(?:t|tp|time|frame)_?)(\d+)(.*)$", re.IGNORECASE
+)
+
+# players attached with attach_sequence, by layer
+_PLAYERS: Dict[Any, "SequencePlayer"] = {}
+
+# viewers in which sequence layers are attached when they are added
+_WATCHED: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def find_sequences(paths, min_length=2):
+    """Group files numbered by time point into time series.
+
+    Files are in the same series if their names only differ by the number of
+    their last time point token, e.g. ``cell_t000.ply``, ``cell_t001.ply``,
+    ... The token is ``t``, ``tp``, ``time`` or ``frame``, in any case,
+    followed by digits. Files numbered otherwise, such as ``cell_001.ply``,
+    stay separate.
+
+    Parameters
+    ----------
+    paths: list of str
+    min_length: int, optional
+        Fewer files with the same name pattern are not a series.
+
+    Returns
+    -------
+    list of list of str
+        Every series, ordered by number, and every other file on its own, in
+        the order of the first file of each in ``paths``.
+    """
+    groups = {}
+    for path in paths:
+        directory, name = os.path.split(path)
+        stem, ext = os.path.splitext(name)
+        match = _TIMEPOINT.match(stem)
+        if match is None:
+            key = (path,)
+        else:
+            prefix, _, suffix = match.groups()
+            key = (directory, prefix, suffix, ext.lower())
+        groups.setdefault(key, []).append(path)
+
+    result = []
+    for key, group in groups.items():
+        if len(key) == 1 or len(group) < min_length:
+            result.extend([path] for path in group)
+        else:
+            result.append(sorted(group, key=_number))
+    return result
+
+
+def _stem(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _number(path):
+    return int(_TIMEPOINT.match(_stem(path)).group(2))
+
+
+class MeshSequence:
+    """Timepoints of a time series of mesh files, loaded on demand.
+
+    Parameters
+    ----------
+    paths: list of str
+        One file per timepoint, in order.
+    max_bytes: int, optional
+        Decoded timepoints are dropped, least recently used first, once they
+        add up to more than this.
+    prefetch: int, optional
+        Number of timepoints read ahead in the background on each side of
+        the current one.
+    use_cache: bool, optional
+        Read through the on-disk mesh cache, see :func:`mesh_reader`.
+
+    Notes
+    -----
+    Timepoints are ``(vertices, faces)`` tuples of read-only arrays. Vertex
+    colors of the files are not kept.
+    """
+
+    def __init__(self, paths, max_bytes=512 * 1024**2, prefetch=2, use_cache=None):
+        self.paths = list(paths)
+        self.prefetch_count = prefetch
+        self.use_cache = use_cache
+        self.frames = FilterCache(max_bytes)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="mesh-prefetch")
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _load(self, t):
+        vertices, faces = _read_surfaces([self.paths[t]], 1, self.use_cache)[0][:2]
+        frame = (np.asarray(vertices), np.asarray(faces))
+        self.frames.put(t, frame)
+        return frame
+
+    def __getitem__(self, t):
+        """Vertices and faces of timepoint ``t``, waiting for it if needed."""
+        t = range(len(self))[t]
+        frame = self.frames.get(t)
+        if frame is not None:
+            return frame
+        with self._lock:
+            future = self._pending.get(t)
+        if future is not None:
+            try:
+                return future.result()
+            except CancelledError:
+                pass
+        return self._load(t)
+
+    def cached(self, t):
+        """Timepoint ``t`` if it is loaded already, or None."""
+        return self.frames.get(t)
+
+    def prefetch(self, t):
+        """Read the timepoints around ``t`` in the background.
+
+        Reads still waiting for the thread that are not around ``t`` anymore
+        are cancelled, so jumping in time does not queue up stale reads.
+        """
+        wanted = []
+        for offset in range(1, self.prefetch_count + 1):
+            for neighbour in (t + offset, t - offset):
+                if 0 <= neighbour < len(self):
+                    wanted.append(neighbour)
+
+        submitted = []
+        with self._lock:
+            for other, future in list(self._pending.items()):
+                if other not in wanted and future.cancel():
+                    del self._pending[other]
+            for neighbour in wanted:
+                if neighbour in self._pending or self.cached(neighbour) is not None:
+                    continue
+                future = self._executor.submit(self._load, neighbour)
+                self._pending[neighbour] = future
+                submitted.append((neighbour, future))
+        # outside the lock: a read that is done already calls back right away
+        for neighbour, future in submitted:
+            future.add_done_callback(self._done(neighbour))
+
+    def _done(self, t):
+        def _forget(future):
+            with self._lock:
+                if self._pending.get(t) is future:
+                    del self._pending[t]
+
+        return _forget
+
+    def layer_data(self, t=0):
+        """Layer data tuple of a surface layer showing timepoint ``t``.
+
+        The values of the surface have one row per timepoint, which gives the
+        layer its time dimension; they are a broadcast view, not a copy.
+        """
+        vertices, faces = self[t]
+        values = np.broadcast_to(np.ones(len(vertices)), (len(self), len(vertices)))
+        name = os.path.commonprefix([_stem(p) for p in self.paths]) or None
+        return (
+            (vertices, faces, values),
+            {"name": name, "metadata": {"mesh_sequence": self}},
+            "surface",
+        )
+
+    def close(self):
+        """Cancel pending reads and drop the loaded timepoints."""
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+        self._executor.shutdown(wait=False)
+        self.frames.clear()
+
+
+class SequencePlayer:
+    """Show the timepoint of a :class:`MeshSequence` the time slider is on.
+
+    A timepoint that is loaded already is shown straight away; otherwise it
+    is read in a worker thread, and shown if the slider is still on it once
+    it is read. Either way, the timepoints around it are prefetched.
+
+    Parameters
+    ----------
+    viewer: napari.components.ViewerModel
+    layer: napari.layers.Surface
+        Layer made from :meth:`MeshSequence.layer_data`.
+    sequence: MeshSequence
+    """
+
+    def __init__(self, viewer, layer, sequence):
+        self.viewer = viewer
+        self.layer = layer
+        self.sequence = sequence
+        self.wanted = None
+        self._worker = None
+        self._connected = True
+        viewer.dims.events.current_step.connect(self._on_step)
+        self._on_step()
+
+    def timepoint(self):
+        """Timepoint of the layer at the viewer's current position."""
+        t = self.layer.world_to_data(self.viewer.dims.point)[0]
+        return int(np.clip(round(t), 0, len(self.sequence) - 1))
+
+    def _on_step(self, event=None):
+        self.wanted = self.timepoint()
+        frame = self.sequence.cached(self.wanted)
+        if frame is not None:
+            self.show(frame)
+        elif self._worker is None:
+            self._load(self.wanted)
+        self.sequence.prefetch(self.wanted)
+
+    def _load(self, t):
+        from napari.qt.threading import create_worker
+
+        self._worker = create_worker(self.sequence.__getitem__, t)
+        self._worker.returned.connect(lambda frame: self._on_loaded(t, frame))
+        self._worker.finished.connect(self._on_finished)
+        self._worker.start()
+
+    def _on_loaded(self, t, frame):
+        if t == self.wanted:
+            self.show(frame)
+
+    def _on_finished(self):
+        self._worker = None
+        if not self._connected:
+            return
+        # the slider may have moved on while the worker was reading
+        frame = self.sequence.cached(self.wanted)
+        if frame is None:
+            self._load(self.wanted)
+        else:
+            self.show(frame)
+
+    def show(self, frame):
+        """Put the vertices and faces of ``frame`` into the layer."""
+        vertices, faces = frame
+        if self.layer.data[0] is vertices:
+            return
+        values = np.broadcast_to(
+            np.ones(len(vertices)), (len(self.sequence), len(vertices))
+        )
+        self.layer.data = (vertices, faces, values)
+
+    def disconnect(self):
+        """Stop following the time slider."""
+        self._connected = False
+        self.viewer.dims.events.current_step.disconnect(self._on_step)
+        if self._worker is not None:
+            self._worker.quit()
+
+
+def attach_sequence(viewer, layer, sequence=None):
+    """Attach a :class:`SequencePlayer` to ``layer``, replacing any previous one.
+
+    ``sequence`` defaults to the one in the layer's metadata. The player is
+    detached, and the sequence closed, when the layer is removed from the
+    viewer.
+    """
+    if sequence is None:
+        sequence = layer.metadata["mesh_sequence"]
+    detach_sequence(layer)
+    _PLAYERS[layer] = SequencePlayer(viewer, layer, sequence)
+
+    def _on_removed(event):
+        if event.value is layer:
+            viewer.layers.events.removed.disconnect(_on_removed)
+            detach_sequence(layer)
+            sequence.close()
+
+    viewer.layers.events.removed.connect(_on_removed)
+    return _PLAYERS[layer]
+
+
+def detach_sequence(layer):
+    """Detach the :class:`SequencePlayer` of ``layer``, if any."""
+    player = _PLAYERS.pop(layer, None)
+    if player is not None:
+        player.disconnect()
+
+
+def watch_viewer(viewer=None):
+    """Attach a player to every sequence layer added to ``viewer``.
+
+    ``viewer`` defaults to the current napari viewer; without one, this does
+    nothing.
+    """
+    if viewer is None:
+        from napari import current_viewer
+
+        viewer = current_viewer()
+    if viewer is None or viewer in _WATCHED:
+        return
+    _WATCHED.add(viewer)
+
+    def _on_inserted(event):
+        layer = event.value
+        if isinstance(layer.metadata.get("mesh_sequence"), MeshSequence):
+            attach_sequence(viewer, layer)
+
+    viewer.layers.events.inserted.connect(_on_inserted)
@@ -0,0 +1,290 @@
+"""
+Laplacian and Taubin smoothing with sparse matrices.
+
+The pymeshlab filters rebuild the mesh and its face adjacency on every call,
+although smoothing only ever moves vertices. Here the connectivity of a face
+array is turned into a sparse adjacency matrix once, and cached by a
+fingerprint of the faces, so smoothing the same topology again, with other
+parameters or another frame of a time series, goes straight to the sparse
+matrix-vector products of the iterations.
+
+The operators follow MeshLab's (``vcg::tri::Smooth``), so results match the
+pymeshlab filters to rounding error:
+
+* every vertex moves towards the average of its neighbours, weighted by
+  ``cot(alpha) + cot(beta)`` of the angles opposite the edge for Laplacian
+  smoothing with cotangent weights, and uniformly otherwise,
+* vertices on a boundary are averaged with their neighbours along the
+  boundary only, and vertices in no face do not move.
+
+Cotangent weights change with the vertex positions, so they are recomputed
+every iteration; only the sparsity structure comes from the cache.
+"""
+from collections import namedtuple
+from enum import Enum
+
+import numpy as np
+
+from ._background import run_steps
+from ._convert import FACE_DTYPE, VERTEX_DTYPE, as_vertices
+from ._instrument import stage
+from ._memo import FilterCache, fingerprint
+
+
+class SmoothingBackend(Enum):
+    pymeshlab = "pymeshlab"
+    sparse = "Sparse"
+
+
+# CSR structure of the adjacency matrix of one face array. ``edges`` numbers
+# the undirected edges of the faces, in face order, and ``entry_edges`` gives
+# the edge of every entry of the matrix, or ``n_edges`` for entries whose
+# weight does not come from an edge: boundary vertices are averaged along the
+# boundary only, whatever the weights, with the entries in ``boundary``.
+Topology = namedtuple(
+    "Topology",
+    ["n_vertices", "n_edges", "indptr", "indices", "edges", "entry_edges", "boundary"],
+)
+
+# operators take a few dozen bytes per face
+topology_cache = FilterCache(max_bytes=256 * 1024**2)
+
+
+def _build_topology(faces, n_vertices):
+    # edge j of a face runs from corner j to corner j + 1
+    start = faces.ravel()
+    end = np.roll(faces, -1, axis=1).ravel()
+    keys = np.minimum(start, end) * n_vertices + np.maximum(start, end)
+    unique, edges, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    n_edges = len(unique)
+
+    boundary_edges = unique[counts == 1]
+    boundary_start = boundary_edges // n_vertices
+    boundary_end = boundary_edges % n_vertices
+    on_boundary = np.zeros(n_vertices, dtype=bool)
+    on_boundary[boundary_start] = True
+    on_boundary[boundary_end] = True
+    boundary_vertices = np.flatnonzero(on_boundary)
+
+    # entries (row, column): both directions of every edge, and for boundary
+    # vertices themselves and both directions of boundary edges
+    rows = np.concatenate([start, end, boundary_vertices, boundary_start, boundary_end])
+    columns = np.concatenate(
+        [end, start, boundary_vertices, boundary_end, boundary_start]
+    )
+    entries, slots = np.unique(rows * n_vertices + columns, return_inverse=True)
+    nnz = len(entries)
+    index_dtype = np.int32 if max(nnz, n_vertices) < 2**31 else np.int64
+    indptr = np.zeros(n_vertices + 1, dtype=index_dtype)
+    np.cumsum(np.bincount(entries // n_vertices, minlength=n_vertices), out=indptr[1:])
+    indices = (entries % n_vertices).astype(index_dtype)
+
+    n_face_edges = 2 * len(start)
+    entry_edges = np.full(nnz, n_edges, dtype=index_dtype)
+    entry_edges[slots[:n_face_edges]] = np.tile(edges, 2)
+    entry_edges[on_boundary[entries // n_vertices]] = n_edges
+    boundary = np.bincount(slots[n_face_edges:], minlength=nnz).astype(VERTEX_DTYPE)
+    return Topology(
+        n_vertices,
+        n_edges,
+        indptr,
+        indices,
+        edges.astype(index_dtype),
+        entry_edges,
+        boundary,
+    )
+
+
+def _entries(topo, weights=None):
+    """Entries of the adjacency matrix, from the weights of the face edges.
+
+    The weight of an edge is the sum of its weights in the faces it is part
+    of; without weights, that is the number of those faces.
+    """
+    sums = np.bincount(topo.edges, weights, minlength=topo.n_edges + 1)
+    sums[topo.n_edges] = 0
+    return topo.boundary + sums[topo.entry_edges]
+
+
+def _cotangents(vertices, corners):
+    """Cotangent of the angle opposite every edge of the faces, in face order."""
+    p0, p1, p2 = (vertices[c] for c in corners)
+    e0, e1, e2 = p1 - p0, p2 - p1, p0 - p2
+    cross = np.cross(e0, e1)
+    double_area = np.sqrt(np.einsum("ij,ij->i", cross, cross))
+    # the angle opposite edge j is at corner j + 2, between the other edges
+    cotangents = np.empty((len(double_area), 3))
+    cotangents[:, 0] = np.einsum("ij,ij->i", e1, e2)
+    cotangents[:, 1] = np.einsum("ij,ij->i", e2, e0)
+    cotangents[:, 2] = np.einsum("ij,ij->i", e0, e1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cotangents /= -double_area[:, None]
+    cotangents[~np.isfinite(cotangents)] = 0
+    return cotangents.ravel()
+
+
+def topology(faces, n_vertices, use_cache=True):
+    """Cached sparse adjacency structure of ``faces``.
+
+    Parameters
+    ----------
+    faces: np.ndarray
+        ``(M, 3)`` vertex indices of the triangles.
+    n_vertices: int
+    use_cache: bool, optional
+        Look the structure up in, and add it to, the cache. Faces that will
+        not be smoothed again are better left out of it.
+
+    Returns
+    -------
+    Topology
+    """
+    faces = np.asarray(faces)
+    if not use_cache:
+        return _build_topology(faces.astype(np.int64), n_vertices)
+    key = (fingerprint(faces), n_vertices)
+    cached = topology_cache.get(key)
+    if cached is not None:
+        return cached
+    with stage("topology", n_vertices, len(faces)):
+        cached = _build_topology(faces.astype(np.int64), n_vertices)
+    topology_cache.put(key, cached)
+    return cached
+
+
+def _matrix(topo, data):
+    from scipy import sparse
+
+    n = topo.n_vertices
+    return sparse.csr_matrix((data, topo.indices, topo.indptr), shape=(n, n))
+
+
+def _row_sums(topo, data):
+    sums = np.add.reduceat(np.append(data, 0), topo.indptr[:-1])
+    sums[np.diff(topo.indptr) == 0] = 0
+    return sums
+
+
+def _laplacian_step(vertices, topo, data):
+    # average of the vertex and its weighted neighbours; vertices with no
+    # weight on their neighbours stay put
+    counts = _row_sums(topo, data)
+    moving = counts > 0
+    smoothed = _matrix(topo, data) @ vertices
+    smoothed += vertices
+    smoothed /= np.where(moving, counts + 1, 1)[:, None]
+    if not moving.all():
+        smoothed[~moving] = vertices[~moving]
+    return smoothed
+
+
+def _taubin_operator(topo):
+    """Average of the neighbours, and which vertices have neighbours."""
+    uniform = _entries(topo)
+    counts = _row_sums(topo, uniform)
+    moving = counts > 0
+    rows = np.repeat(np.arange(topo.n_vertices), np.diff(topo.indptr))
+    scale = np.divide(1, counts, out=np.zeros_like(counts), where=moving)
+    return _matrix(topo, uniform * scale[rows]), moving
+
+
+def _taubin_step(vertices, average, moving, factor):
+    # move by ``factor`` towards the average of the neighbours
+    keep = np.where(moving, 1 - factor, 1)[:, None]
+    return keep * vertices + factor * (average @ vertices)
+
+
+def laplacian_smooth_steps(
+    vertices, faces, step_smooth_num=10, cotangent=True, use_cache=True
+):
+    """Laplacian smoothing, yielding after every iteration.
+
+    Parameters
+    ----------
+    vertices: np.ndarray
+        ``(N, 3)`` vertex coordinates.
+    faces: np.ndarray
+        ``(M, 3)`` vertex indices of the triangles.
+    step_smooth_num: int, optional
+    cotangent: bool, optional
+        Weight neighbours by cotangents, as MeshLab does by default.
+    use_cache: bool, optional
+        Keep the connectivity of ``faces`` in the cache, see :func:`topology`.
+
+    Returns
+    -------
+    np.ndarray
+        Smoothed ``(N, 3)`` vertices, as the return value of the generator.
+    """
+    vertices = np.array(vertices, dtype=VERTEX_DTYPE)
+    faces = np.asarray(faces)
+    topo = topology(faces, len(vertices), use_cache)
+    corners = np.ascontiguousarray(faces.T)
+    data = None if cotangent else _entries(topo)
+    for _ in range(step_smooth_num):
+        with stage("laplacian step", len(vertices), len(faces)):
+            if cotangent:
+                data = _entries(topo, _cotangents(vertices, corners))
+            vertices = _laplacian_step(vertices, topo, data)
+        yield
+    return vertices
+
+
+def taubin_smooth_steps(
+    vertices, faces, lambda_=0.5, mu=-0.53, step_smooth_num=10, use_cache=True
+):
+    """Taubin smoothing, yielding after every iteration.
+
+    Parameters
+    ----------
+    vertices: np.ndarray
+        ``(N, 3)`` vertex coordinates.
+    faces: np.ndarray
+        ``(M, 3)`` vertex indices of the triangles.
+    lambda_, mu: float, optional
+        Factors of the shrinking and inflating half of each iteration.
+    step_smooth_num: int, optional
+    use_cache: bool, optional
+        Keep the connectivity of ``faces`` in the cache, see :func:`topology`.
+
+    Returns
+    -------
+    np.ndarray
+        Smoothed ``(N, 3)`` vertices, as the return value of the generator.
+    """
+    vertices = np.array(vertices, dtype=VERTEX_DTYPE)
+    faces = np.asarray(faces)
+    average, moving = _taubin_operator(topology(faces, len(vertices), use_cache))
+    for _ in range(step_smooth_num):
+        with stage("taubin step", len(vertices), len(faces)):
+            vertices = _taubin_step(vertices, average, moving, lambda_)
+            vertices = _taubin_step(vertices, average, moving, mu)
+        yield
+    return vertices
+
+
+def sparse_laplacian_smooth(
+    vertices, faces, step_smooth_num=10, cotangent=True, use_cache=True
+):
+    """Laplacian smoothing of a surface, see :func:`laplacian_smooth_steps`."""
+    return run_steps(
+        laplacian_smooth_steps(vertices, faces, step_smooth_num, cotangent, use_cache)
+    )
+
+
+def sparse_taubin_smooth(
+    vertices, faces, lambda_=0.5, mu=-0.53, step_smooth_num=10, use_cache=True
+):
+    """Taubin smoothing of a surface, see :func:`taubin_smooth_steps`."""
+    return run_steps(
+        taubin_smooth_steps(vertices, faces, lambda_, mu, step_smooth_num, use_cache)
+    )
+
+
+def smoothed_surface(vertices, faces):
+    """Surface data of smoothed vertices, like the pymeshlab filters return."""
+    return (
+        as_vertices(vertices),
+        np.ascontiguousarray(faces, dtype=FACE_DTYPE),
+        np.ones(len(vertices)),
+    )
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from napari_pymeshlab import (
+    batch_convex_hull,
+    batch_laplacian_smooth,
+    batch_simplification_clustering_decimation,
+    laplacian_smooth,
+    make_sphere,
+)
+from napari_pymeshlab._parallel import ItemError
+
+
+def _spheres(n):
+    vertices, faces, values = make_sphere()[0][0]
+    return [((i + 1) * vertices, faces, values) for i in range(n)]
+
+
+def _total(surface):
+    return sum(float(np.sum(a)) for a in surface)
+
+
+def test_batch_matches_single_calls():
+    surfaces = _spheres(3)
+
+    results = batch_laplacian_smooth(surfaces, 3, n_workers=2)
+
+    assert len(results) == len(surfaces)
+    for surface, result in zip(surfaces, results):
+        expected = laplacian_smooth(surface, 3)
+        np.testing.assert_allclose(result[0], expected[0])
+        np.testing.assert_array_equal(result[1], expected[1])
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_batch_reports_errors_per_item(n_workers):
+    surfaces = _spheres(3)
+    surfaces[1] = (surfaces[1][0], np.full((4, 3), 10**6), surfaces[1][2])
+
+    with pytest.warns(UserWarning, match="1 of 3 surfaces failed"):
+        results = batch_simplification_clustering_decimation(
+            surfaces, 5, n_workers=n_workers
+        )
+
+    assert isinstance(results[1], ItemError) and results[1].index == 1
+    assert not isinstance(results[0], ItemError)
+    assert not isinstance(results[2], ItemError)
+
+
+def test_batch_consumes_lazily():
+    from napari_pymeshlab._parallel import ITEMS_PER_WORKER, imap_shared
+
+    surfaces = _spheres(6)
+    pulled = []
+
+    def generate():
+        for i, surface in enumerate(surfaces):
+            pulled.append(i)
+            yield surface
+
+    results = imap_shared(_total, generate(), 1, share_inputs=True)
+    for i, result in enumerate(results):
+        # the item collected and those queued behind it
+        assert len(pulled) <= i + ITEMS_PER_WORKER
+        assert result == pytest.approx(_total(surfaces[i]))
+    assert len(batch_convex_hull(iter(surfaces), n_workers=2)) == len(surfaces)
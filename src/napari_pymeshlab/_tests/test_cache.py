@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+from napari_pymeshlab import make_sphere, mesh_reader, write_single_surface
+from napari_pymeshlab._cache import MeshCache
+
+
+def _write_sphere(path, scale=1):
+    vertices, faces, values = make_sphere()[0][0]
+    write_single_surface(str(path), (scale * vertices, faces, values), {})
+    return str(path)
+
+
+def test_read_through(tmp_path, monkeypatch):
+    import napari_pymeshlab._reader
+
+    cache = MeshCache(tmp_path / "cache", enabled=True)
+    monkeypatch.setattr(napari_pymeshlab._reader, "mesh_cache", cache)
+    path = _write_sphere(tmp_path / "sphere.ply")
+
+    assert cache.get(path) is None
+    first = mesh_reader(path)[0][0]
+    second = mesh_reader(path)[0][0]
+
+    assert isinstance(second[0], np.memmap)
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+
+    # modifying the file invalidates the entry
+    _write_sphere(path, scale=2)
+    os.utime(path, ns=(0, 0))
+    assert cache.get(path) is None
+
+
+def test_eviction_and_clear(tmp_path):
+    cache = MeshCache(tmp_path / "cache", max_bytes=0)
+    paths = [_write_sphere(tmp_path / f"sphere_{i}.ply", i + 1) for i in range(2)]
+    arrays = mesh_reader(paths[0])[0][0]
+
+    cache.put(paths[0], arrays)
+    assert cache.size() == 0  # evicted straight away
+
+    cache.max_bytes = 10 * 1024**2
+    cache.put(paths[0], arrays)
+    cache.put(paths[1], arrays)
+    assert cache.get(paths[0]) is not None
+
+    cache.clear()
+    assert cache.size() == 0 and cache.get(paths[1]) is None
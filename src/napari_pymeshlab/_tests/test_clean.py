@@ -0,0 +1,95 @@
+import numpy as np
+from napari_pymeshlab import (
+    MeshPipeline,
+    clean_mesh,
+    clean_surface,
+    make_sphere,
+    taubin_smooth,
+)
+from napari_pymeshlab._clean import take_vertices
+
+
+def _sphere():
+    vertices, faces, _ = make_sphere(subdiv=2)[0][0]
+    return vertices, faces
+
+
+def _soup(vertices, faces):
+    """Every face with its own vertices, as in an STL file."""
+    return vertices[faces].reshape(-1, 3), np.arange(3 * len(faces)).reshape(-1, 3)
+
+
+def test_clean_mesh_unchanged():
+    vertices, faces = _sphere()
+    cleaned = clean_mesh(vertices, faces)
+    np.testing.assert_array_equal(cleaned.vertices, vertices)
+    np.testing.assert_array_equal(cleaned.faces, faces)
+    np.testing.assert_array_equal(cleaned.vertex_map, np.arange(len(vertices)))
+
+
+def test_clean_mesh():
+    vertices, faces = _sphere()
+    soup_vertices, soup_faces = _soup(vertices, faces)
+    n = len(soup_vertices)
+    # a stray vertex, a face listed again the other way round, a face with a
+    # repeated corner and a face of zero area
+    soup_vertices = np.concatenate([soup_vertices, [[1e3, 0, 0]]])
+    soup_vertices = np.concatenate([soup_vertices, [[0, 0, 0], [1, 1, 1], [2, 2, 2]]])
+    extra = [soup_faces[0, ::-1], [0, 0, 1], [n + 1, n + 2, n + 3]]
+    soup_faces = np.concatenate([soup_faces, extra])
+
+    cleaned = clean_mesh(soup_vertices, soup_faces)
+    assert len(cleaned.vertices) == len(vertices)
+    assert len(cleaned.faces) == len(faces)
+    assert cleaned.faces.dtype == np.int32
+    # the same triangles, in the same order
+    np.testing.assert_array_equal(
+        cleaned.vertices[cleaned.faces], soup_vertices[soup_faces[: len(faces)]]
+    )
+    kept = cleaned.vertex_map >= 0
+    assert not kept[n:].any() and kept[:n].all()
+    np.testing.assert_array_equal(
+        cleaned.vertices[cleaned.vertex_map[kept]], soup_vertices[kept]
+    )
+
+
+def test_tolerance():
+    vertices, faces = _sphere()
+    soup_vertices, soup_faces = _soup(vertices, faces)
+    soup_vertices += np.random.default_rng(0).normal(0, 1e-9, soup_vertices.shape)
+    assert len(clean_mesh(soup_vertices, soup_faces).vertices) == len(soup_vertices)
+    # an edge of the sphere is about 30 long, so the cells hold one vertex each
+    cleaned = clean_mesh(soup_vertices, soup_faces, tolerance=1e-3)
+    assert len(cleaned.vertices) <= len(vertices) + 10
+
+
+def test_values():
+    vertices, faces = _sphere()
+    soup_vertices, soup_faces = _soup(vertices, faces)
+    values = np.linalg.norm(soup_vertices, axis=1) + soup_vertices[:, 0]
+    cleaned = clean_surface((soup_vertices, soup_faces, values))
+    expected = np.linalg.norm(cleaned[0], axis=1) + cleaned[0][:, 0]
+    np.testing.assert_allclose(cleaned[2], expected)
+
+    vertex_map = clean_mesh(soup_vertices, soup_faces).vertex_map
+    series = np.stack([values, 2 * values])
+    np.testing.assert_allclose(
+        take_vertices(series, vertex_map), np.stack([expected, 2 * expected])
+    )
+    colors = np.zeros((len(soup_vertices), 4), dtype=np.uint8)
+    colors[:, 0] = np.arange(len(soup_vertices)) % 256
+    carried = take_vertices(colors, vertex_map)
+    assert carried.shape == (len(cleaned[0]), 4)
+
+
+def test_filters_clean():
+    vertices, faces = _sphere()
+    soup = _soup(vertices, faces)
+    smoothed = taubin_smooth(soup, clean=True)
+    # the vertex of the sphere every vertex of the clean surface comes from
+    vertex_map = clean_mesh(*soup).vertex_map
+    source = np.empty(len(vertices), dtype=int)
+    source[vertex_map] = faces.ravel()
+    expected = taubin_smooth((vertices, faces))[0][source]
+    np.testing.assert_allclose(smoothed[0], expected, atol=1e-9)
+    assert MeshPipeline(soup).cache_key() != MeshPipeline(soup, True).cache_key()
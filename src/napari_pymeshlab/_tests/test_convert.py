@@ -0,0 +1,61 @@
+import numpy as np
+import pymeshlab as ml
+from napari_pymeshlab._convert import (
+    color_bytes,
+    colors_to_float,
+    colors_to_numpy,
+    faces_to_numpy,
+    mesh_to_surface,
+    surface_layer_data,
+)
+
+
+def test_dtype_contract():
+    ms = ml.MeshSet()
+    ms.create_sphere(radius=1, subdiv=2)
+    vertices, faces, values = mesh_to_surface(ms.current_mesh())
+
+    assert vertices.dtype == np.float64 and vertices.flags["C_CONTIGUOUS"]
+    assert faces.dtype == np.int32 and faces.flags["C_CONTIGUOUS"]
+    assert vertices.shape[1] == 3 and faces.shape[1] == 3
+    assert values.shape == (len(vertices),)
+
+
+def test_polygonal_matches_face_matrix_for_triangles():
+    ms = ml.MeshSet()
+    ms.create_sphere(radius=1, subdiv=2)
+    mesh = ms.current_mesh()
+
+    np.testing.assert_array_equal(
+        faces_to_numpy(mesh), faces_to_numpy(mesh, polygonal=True)
+    )
+
+
+def test_colors():
+    ms = ml.MeshSet()
+    ms.create_sphere(radius=1, subdiv=2)
+    mesh = ms.current_mesh()
+    # uniform colors are values
+    np.testing.assert_array_equal(colors_to_numpy(mesh), np.ones(mesh.vertex_number()))
+
+    ms.compute_color_by_function_per_vertex(x="x*255", y="y*255", z="z*255", a="128")
+    mesh = ms.current_mesh()
+    colors = colors_to_numpy(mesh)
+    assert colors.dtype == np.uint8 and colors.flags["C_CONTIGUOUS"]
+    assert colors.shape == (mesh.vertex_number(), 4)
+    expected = mesh.vertex_color_matrix()
+    np.testing.assert_allclose(colors_to_float(colors, np.float64), expected)
+
+    # other layouts and float colors come back as the same bytes
+    n = len(colors)
+    np.testing.assert_array_equal(color_bytes(expected, n), colors)
+    np.testing.assert_array_equal(
+        color_bytes(np.ascontiguousarray(expected.T), n), colors
+    )
+    np.testing.assert_array_equal(color_bytes(colors[:, :3], n)[:, 3], 255)
+    assert color_bytes(np.ones(n), n) is None
+
+    vertices, faces = mesh_to_surface(mesh)[:2]
+    (_, _, values), kwargs, _ = surface_layer_data((vertices, faces, colors))
+    assert values.shape == (n,)
+    assert kwargs["vertex_colors"].dtype == np.float32
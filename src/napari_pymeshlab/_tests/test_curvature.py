@@ -0,0 +1,82 @@
+import numpy as np
+import pymeshlab as ml
+import pytest
+
+from napari_pymeshlab import (
+    CurvatureBackend,
+    CurvatureType,
+    colorize_curvature_apss,
+    discrete_curvature,
+)
+
+MESHLAB_TYPES = {
+    CurvatureType.mean: "Mean Curvature",
+    CurvatureType.gauss: "Gaussian Curvature",
+}
+
+
+def _arrays(ms):
+    mesh = ms.current_mesh()
+    return mesh.vertex_matrix(), mesh.face_matrix()
+
+
+def _sphere(radius=5, subdiv=4):
+    ms = ml.MeshSet()
+    ms.create_sphere(radius=radius, subdiv=subdiv)
+    return ms
+
+
+def _torus():
+    ms = ml.MeshSet()
+    ms.create_torus(hradius=3, vradius=1, hsubdiv=48, vsubdiv=24)
+    return ms
+
+
+def _perturbed_sphere():
+    # about a third of the faces are obtuse
+    vertices, faces = _arrays(_sphere())
+    rng = np.random.default_rng(0)
+    vertices = vertices + rng.normal(scale=0.1, size=vertices.shape)
+    ms = ml.MeshSet()
+    ms.add_mesh(ml.Mesh(vertices, faces))
+    return ms
+
+
+@pytest.mark.parametrize("make_meshset", [_sphere, _torus, _perturbed_sphere])
+@pytest.mark.parametrize("curvature_type", list(MESHLAB_TYPES))
+def test_discrete_curvature_matches_meshlab(make_meshset, curvature_type):
+    ms = make_meshset()
+    vertices, faces = _arrays(ms)
+
+    values = discrete_curvature(vertices, faces, curvature_type)
+    ms.compute_scalar_by_discrete_curvature_per_vertex(
+        curvaturetype=MESHLAB_TYPES[curvature_type]
+    )
+    expected = ms.current_mesh().vertex_scalar_array()
+    assert values.shape == (len(vertices),)
+    np.testing.assert_allclose(values, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_principal_curvatures():
+    vertices, faces = _arrays(_sphere(radius=5))
+    k1 = discrete_curvature(vertices, faces, CurvatureType.k1)
+    k2 = discrete_curvature(vertices, faces, CurvatureType.k2)
+    assert np.all(k1 >= k2)
+    np.testing.assert_allclose(k1, 1 / 5, rtol=0.02)
+    np.testing.assert_allclose(k2, 1 / 5, rtol=0.02)
+
+    vertices, faces = _arrays(_torus())
+    k1 = discrete_curvature(vertices, faces, CurvatureType.k1)
+    k2 = discrete_curvature(vertices, faces, CurvatureType.k2)
+    # the tube of radius 1 bends the same way everywhere
+    np.testing.assert_allclose(k1, 1, rtol=0.05)
+    assert k2.min() < 0 < k2.max()
+
+
+def test_colorize_curvature_discrete_backend():
+    surface = _arrays(_sphere(radius=5))
+    vertices, faces, values = colorize_curvature_apss(
+        surface, curvature_type=CurvatureType.mean, backend=CurvatureBackend.discrete
+    )
+    assert vertices is surface[0] and faces is surface[1]
+    np.testing.assert_allclose(values, 1 / 5, rtol=0.02)
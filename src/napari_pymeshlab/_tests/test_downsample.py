@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from napari_pymeshlab import voxel_downsample
+
+
+def test_voxel_downsample_means():
+    # two points in each of the unit voxels at the corners of a 2x2x2 cube
+    corners = np.array(np.meshgrid([0, 1], [0, 1], [0, 1])).reshape(3, -1).T
+    points = np.concatenate([corners + 0.25, corners + 0.75])
+
+    downsampled = voxel_downsample(points, voxel_size=1)
+    assert downsampled.shape == (8, 3)
+    np.testing.assert_allclose(
+        np.sort(downsampled, axis=0), np.sort(corners + 0.5, axis=0)
+    )
+
+
+def test_voxel_downsample_budget():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 100, size=(20_000, 3))
+
+    downsampled = voxel_downsample(points, max_points=1000)
+    assert 0.5 * 1000 < len(downsampled) <= 1000
+
+    # the budget also caps an explicit voxel size that is too small
+    assert len(voxel_downsample(points, voxel_size=0.1, max_points=1000)) <= 1000
+    # and is a no-op when it is already met
+    assert len(voxel_downsample(points, max_points=10**6)) == len(points)
+
+
+def test_voxel_downsample_arguments():
+    points = np.zeros((3, 3))
+    assert len(voxel_downsample(points, voxel_size=1)) == 1
+    with pytest.raises(ValueError):
+        voxel_downsample(points)
+    with pytest.raises(ValueError):
+        voxel_downsample(points, voxel_size=0)
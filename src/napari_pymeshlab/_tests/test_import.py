@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+# budget for importing the reader module and probing a path, on top of numpy
+IMPORT_BUDGET_US = 500_000
+
+HEAVY_MODULES = {"pymeshlab", "napari", "magicgui", "qtpy", "vispy"}
+
+
+def _importtime(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_reader_probe_is_cheap():
+    times = _importtime(
+        "import numpy\n"
+        "from napari_pymeshlab._reader import get_mesh_reader\n"
+        "assert get_mesh_reader('mesh.ply') is not None\n"
+    )
+
+    heavy = {name for name in times if name.split(".")[0] in HEAVY_MODULES}
+    assert not heavy
+    assert times["napari_pymeshlab._reader"] < IMPORT_BUDGET_US
+
+
+def test_package_import_is_lazy():
+    times = _importtime("import napari_pymeshlab")
+    assert (
+        set(times) & {"napari_pymeshlab._reader", "napari_pymeshlab._widget"} == set()
+    )
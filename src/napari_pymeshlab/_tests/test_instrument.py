@@ -0,0 +1,98 @@
+import logging
+import multiprocessing
+
+import numpy as np
+import pytest
+from napari_pymeshlab import (
+    format_records,
+    make_sphere,
+    mesh_reader,
+    profiling,
+    taubin_smooth,
+    write_single_surface,
+)
+from napari_pymeshlab._instrument import profiling_enabled, stage
+
+
+def test_filter_stages():
+    surface = make_sphere()[0][0]
+    with profiling() as records:
+        taubin_smooth(surface)
+
+    assert [r.name for r in records] == ["to mesh", "taubin_smooth", "to surface"]
+    n_vertices, n_faces = len(surface[0]), len(surface[1])
+    for record in records:
+        assert record.seconds >= 0 and record.peak_bytes >= 0
+        assert (record.vertices_in, record.faces_in) == (n_vertices, n_faces)
+        assert (record.vertices_out, record.faces_out) == (n_vertices, n_faces)
+
+
+def test_reader_writer_stages(tmp_path):
+    path = str(tmp_path / "sphere.off")
+    with profiling() as records:
+        write_single_surface(path, make_sphere()[0][0], {})
+        mesh_reader(path, use_cache=False)
+    assert [r.name for r in records] == [
+        "to mesh",
+        "save mesh",
+        "load mesh",
+        "to surface",
+    ]
+
+
+def test_nesting_and_memory():
+    with profiling() as records:
+        with stage("outer", 1, 2) as outer:
+            with stage("inner"):
+                np.ones(2**20)  # 8 MiB, freed right away
+            with stage("second"):
+                pass
+            outer.output(3, 4)
+
+    inner, second, outer = records
+    assert [r.depth for r in records] == [1, 1, 0]
+    assert inner.peak_bytes >= 8 * 2**20 and second.peak_bytes < 2**20
+    assert outer.peak_bytes >= inner.peak_bytes
+    assert (outer.vertices_in, outer.faces_out) == (1, 4)
+
+    lines = format_records(records).splitlines()
+    assert [line.split(":")[0] for line in lines] == ["outer", "  inner", "  second"]
+    assert lines[0].endswith("1v/2f -> 3v/4f")
+
+
+def test_off_by_default(caplog):
+    assert not profiling_enabled()
+    with stage("nothing") as s:
+        s.output(1, 1)
+
+    with caplog.at_level(logging.INFO, logger="napari_pymeshlab"):
+        with profiling(memory=False) as records:
+            with stage("something"):
+                pass
+    assert not profiling_enabled()
+    assert records[0].peak_bytes is None
+    (log,) = caplog.records
+    assert log.stage["name"] == "something"
+
+
+@pytest.mark.parametrize("start_method", ["fork", "spawn"])
+def test_worker_stages(tmp_path, start_method):
+    paths = [str(tmp_path / f"sphere_{i}.off") for i in range(4)]
+    for path in paths:
+        write_single_surface(path, make_sphere()[0][0], {})
+
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method(start_method, force=True)
+    try:
+        with profiling() as records:
+            with stage("outer"):
+                mesh_reader(paths, n_workers=2, use_cache=False)
+    finally:
+        multiprocessing.set_start_method(previous, force=True)
+
+    # each worker's load is recorded once, nested in the stage that read it
+    loads = [r for r in records if r.name == "load mesh"]
+    assert len(loads) == len(paths)
+    assert all(r.depth == 1 and r.peak_bytes is not None for r in loads)
+    assert records[-1].name == "outer" and records[-1].depth == 0
+    assert not profiling_enabled()
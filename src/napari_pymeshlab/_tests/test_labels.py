@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from napari_pymeshlab import labels_to_surfaces, taubin_smooth
+from napari_pymeshlab._background import run_steps
+from napari_pymeshlab._labels import _mesh_mask, label_boxes, labels_to_surfaces_steps
+
+
+def _labels():
+    labels = np.zeros((20, 30, 40), dtype=np.int32)
+    z, y, x = np.ogrid[:20, :30, :40]
+    labels[(z - 10) ** 2 + (y - 10) ** 2 + (x - 10) ** 2 < 36] = 1
+    labels[(z - 10) ** 2 + (y - 15) ** 2 + (x - 28) ** 2 < 25] = 5
+    # touches the edge of the image
+    labels[:4, 24:, :6] = 7
+    labels[0, 0, 39] = 9
+    return labels
+
+
+def _edge_counts(faces):
+    edges = np.sort(faces[:, [[0, 1], [1, 2], [2, 0]]].reshape(-1, 2), axis=1)
+    return np.unique(edges, axis=0, return_counts=True)[1]
+
+
+def test_label_boxes():
+    labels = _labels()
+    boxes = label_boxes(labels)
+    assert list(boxes) == [1, 5, 7, 9]
+    assert boxes[7] == (slice(0, 4), slice(24, 30), slice(0, 6))
+    assert list(label_boxes(labels, min_voxels=2)) == [1, 5, 7]
+    assert list(label_boxes(labels, label_ids=[5, 9])) == [5, 9]
+    with pytest.raises(TypeError):
+        label_boxes(labels.astype(float))
+
+
+def test_combined_surface():
+    labels = _labels()
+    steps = labels_to_surfaces_steps(labels, min_voxels=2, n_workers=2)
+    total = next(steps)
+    yields = []
+    vertices, faces, values = run_steps(steps, yields.append)
+    assert total == 1 + len(yields)
+
+    assert faces.dtype == np.int32 and faces.max() == len(vertices) - 1
+    assert set(np.unique(values)) == {1, 5, 7}
+    # every label's surface is closed, also where it meets the image edge
+    assert np.all(_edge_counts(faces) == 2)
+    # and faces do not mix labels
+    assert np.all(values[faces] == values[faces[:, :1]])
+
+    ball = vertices[values == 1]
+    np.testing.assert_allclose(ball.mean(axis=0), 10, atol=0.1)
+
+
+def test_separate_surfaces():
+    labels = _labels()
+    surfaces = labels_to_surfaces(
+        labels, label_ids=[1, 5], spacing=(2, 1, 1), combine=False, n_workers=1
+    )
+    assert list(surfaces) == [1, 5]
+    vertices, faces, values = surfaces[5]
+    assert np.all(values == 5)
+    # z is scaled by the spacing
+    np.testing.assert_allclose(vertices.mean(axis=0), [20, 15, 28], atol=0.2)
+
+
+def test_smoothing_matches_taubin_smooth():
+    labels = _labels()
+    box = label_boxes(labels)[1]
+    vertices, faces = _mesh_mask(
+        labels[box] == 1, np.array([s.start for s in box]), np.ones(3)
+    )
+    expected = taubin_smooth((vertices, faces), step_smooth_num=5)[0]
+    smoothed = labels_to_surfaces(
+        labels, label_ids=[1], smooth_iterations=5, combine=False, n_workers=1
+    )[1][0]
+    np.testing.assert_allclose(smoothed, expected, atol=1e-6)
+
+
+def test_decimation_reduces_faces():
+    labels = _labels()
+    full = labels_to_surfaces(labels, label_ids=[1], n_workers=1)
+    decimated = labels_to_surfaces(
+        labels, label_ids=[1], decimation_percentage=10, n_workers=1
+    )
+    assert 0 < len(decimated[1]) < len(full[1])
+
+
+def test_no_labels():
+    with pytest.raises(ValueError, match="No labels"):
+        labels_to_surfaces(np.zeros((4, 4, 4), dtype=np.uint8))
+    with pytest.raises(ValueError, match="3D"):
+        labels_to_surfaces(np.ones((4, 4), dtype=np.uint8))
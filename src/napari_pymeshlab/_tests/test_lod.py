@@ -0,0 +1,121 @@
+import os
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+from napari_pymeshlab import build_lod_pyramid
+from napari_pymeshlab._background import run_steps
+from napari_pymeshlab._cache import MeshCache
+from napari_pymeshlab._lod import LodSwitcher, _camera, lod_steps
+
+
+def _fine_sphere():
+    import pymeshlab as ml
+
+    ms = ml.MeshSet()
+    ms.create_sphere(radius=100, subdiv=5)
+    mesh = ms.current_mesh()
+    vertices = mesh.vertex_matrix()
+    return vertices, mesh.face_matrix().astype(np.int32), vertices[:, 2].copy()
+
+
+def test_levels():
+    surface = _fine_sphere()
+    levels = build_lod_pyramid(surface, thresholds=(2, 0.5, 1), use_cache=False)
+
+    n_faces = [len(faces) for _, faces, _ in levels]
+    assert len(levels) == 3
+    assert n_faces == sorted(n_faces, reverse=True)
+    assert n_faces[-1] < len(surface[1])
+    for vertices, faces, values in levels:
+        assert values.shape == (len(vertices),)
+        assert faces.max() < len(vertices)
+        # values follow the vertices they were transferred to
+        np.testing.assert_allclose(values, vertices[:, 2], atol=10)
+
+
+def test_cached_levels(tmp_path):
+    surface = _fine_sphere()
+    cache = MeshCache(tmp_path / "cache", enabled=True)
+
+    first = run_steps(lod_steps(surface, (0.5, 1), cache=cache))
+    assert len(os.listdir(cache.directory)) == 2
+
+    second = run_steps(lod_steps(surface, (0.5, 1), cache=cache))
+    for level, cached in zip(first, second):
+        assert isinstance(cached[0], np.memmap)
+        for a, b in zip(level, cached):
+            np.testing.assert_array_equal(a, b)
+
+
+def test_widget_caches_levels(tmp_path, monkeypatch):
+    from napari.layers import Surface
+    from napari_pymeshlab import _lod, _widget
+
+    # the cache is off by default, which the widget does not depend on
+    cache = MeshCache(tmp_path / "cache", enabled=False)
+    monkeypatch.setattr(_lod, "mesh_cache", cache)
+    runs = []
+
+    def run_in_background(steps, *args, **kwargs):
+        runs.append(steps(*args))
+        return Future()
+
+    monkeypatch.setattr(_widget, "run_in_background", run_in_background)
+    layer = Surface(_fine_sphere())
+    _widget.lod_pyramid()(None, layer, thresholds=[0.5, 1])
+    run_steps(runs[0])
+    assert len(os.listdir(cache.directory)) == 2
+
+
+def test_switcher(qtbot):
+    from napari.components import ViewerModel
+
+    surface = _fine_sphere()
+    levels = build_lod_pyramid(surface, thresholds=(1, 2), use_cache=False)
+    viewer = ViewerModel()
+    layer = viewer.add_surface(surface)
+    switcher = LodSwitcher(viewer, layer, levels, interactive_faces=0, idle_ms=50)
+
+    _camera(viewer).zoom *= 2
+    assert len(layer.data[1]) == len(levels[-1][1])
+    qtbot.waitUntil(lambda: len(layer.data[1]) == len(surface[1]))
+
+    switcher.disconnect()
+    _camera(viewer).zoom *= 2
+    assert len(layer.data[1]) == len(surface[1])
+
+
+@pytest.mark.parametrize("colored_levels", [True, False])
+def test_switcher_colors(make_napari_viewer, qtbot, colored_levels):
+    from napari_pymeshlab._convert import surface_layer_data
+
+    vertices, faces, _ = _fine_sphere()
+    # red on top, blue below
+    colors = np.full((len(vertices), 4), 255, dtype=np.uint8)
+    colors[:, 1] = 0
+    colors[vertices[:, 2] > 0, 2] = 0
+    colors[vertices[:, 2] <= 0, 0] = 0
+    data, kwargs, _ = surface_layer_data((vertices, faces, colors))
+    # levels built from the colors, as by the widget, or from the values
+    source = (vertices, faces, colors) if colored_levels else data
+    levels = build_lod_pyramid(source, thresholds=(2,), use_cache=False)
+
+    viewer = make_napari_viewer()
+    viewer.dims.ndisplay = 3
+    layer = viewer.add_surface(data, **kwargs)
+    switcher = LodSwitcher(viewer, layer, levels, interactive_faces=0, idle_ms=50)
+
+    # the vispy mesh rejects colors of another level
+    _camera(viewer).zoom *= 2
+    coarse = layer.data[0]
+    assert len(coarse) < len(vertices)
+    assert layer.vertex_colors.shape == (len(coarse), 4)
+    # away from the equator, the colors follow the vertices
+    red = layer.vertex_colors[:, 0] > 0.5
+    away = np.abs(coarse[:, 2]) > 10
+    np.testing.assert_array_equal(red[away], coarse[away, 2] > 0)
+
+    qtbot.waitUntil(lambda: len(layer.data[0]) == len(vertices))
+    np.testing.assert_array_equal(layer.vertex_colors, kwargs["vertex_colors"])
+    switcher.disconnect()
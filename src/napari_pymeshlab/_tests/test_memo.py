@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from napari_pymeshlab import MeshPipeline, make_sphere
+from napari_pymeshlab._memo import FilterCache, fingerprint
+
+
+def test_fingerprint():
+    a = np.arange(12.0).reshape(4, 3)
+
+    assert fingerprint(a) == fingerprint(a.copy())
+    assert fingerprint(a) == fingerprint(np.asfortranarray(a))
+    assert fingerprint(a) != fingerprint(a.astype(np.float32))
+    assert fingerprint(a) != fingerprint(a.reshape(3, 4))
+
+    b = a.copy()
+    b[2, 1] += 1
+    assert fingerprint(a) != fingerprint(b)
+
+
+def test_pipeline_cache_key():
+    surface = make_sphere()[0][0]
+
+    key = MeshPipeline(surface).taubin_smooth(0.5, -0.53).cache_key()
+    assert key == MeshPipeline(surface).taubin_smooth(0.5, -0.53).cache_key()
+    assert key != MeshPipeline(surface).taubin_smooth(0.4, -0.53).cache_key()
+    assert MeshPipeline(surface).add_step(lambda ms: None).cache_key() is None
+
+
+def test_lru_eviction_and_stats():
+    cache = FilterCache(max_bytes=2 * 800)
+    results = [(np.zeros(100), np.zeros(0)) for _ in range(3)]
+
+    cache.put("a", results[0])
+    cache.put("b", results[1])
+    assert cache.get("a") is results[0]  # "b" is now least recently used
+    cache.put("c", results[2])
+
+    assert cache.get("b") is None
+    assert cache.get("c") is results[2]
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (2, 1, 1, 2)
+    assert info.nbytes == 1600
+
+    # cached results are shared, so they are read-only
+    with pytest.raises(ValueError):
+        results[0][0][0] = 1
+
+    cache.clear()
+    assert cache.cache_info().currsize == 0
@@ -0,0 +1,177 @@
+import numpy as np
+import pymeshlab as ml
+import pytest
+from napari_pymeshlab._convert import colors_to_numpy
+from napari_pymeshlab._native import (
+    read_native,
+    read_ply,
+    read_stl,
+    write_native,
+    write_obj,
+    write_ply,
+    write_stl,
+)
+
+
+def _pymeshlab_read(path):
+    ms = ml.MeshSet()
+    ms.load_new_mesh(path)
+    mesh = ms.current_mesh()
+    return mesh.vertex_matrix(), mesh.face_matrix(), colors_to_numpy(mesh)
+
+
+def _save(tmp_path, name, colors=False, **kwargs):
+    ms = ml.MeshSet()
+    ms.create_sphere(radius=10, subdiv=3)
+    if colors:
+        ms.compute_color_by_function_per_vertex(x="x*12", y="y*12", z="z*12")
+    path = str(tmp_path / name)
+    ms.save_current_mesh(path, **kwargs)
+    return path
+
+
+@pytest.mark.parametrize(
+    "name, colors, reader",
+    [
+        ("sphere.ply", False, read_ply),
+        ("colored.ply", True, read_ply),
+        ("sphere.stl", False, read_stl),
+    ],
+)
+def test_parity_with_pymeshlab(tmp_path, name, colors, reader):
+    path = _save(tmp_path, name, colors)
+
+    native = reader(path)
+    expected = _pymeshlab_read(path)
+
+    assert native[0].dtype == np.float64 and native[1].dtype == np.int32
+    np.testing.assert_allclose(native[0], expected[0])
+    np.testing.assert_array_equal(native[1], expected[1])
+    assert native[2].dtype == expected[2].dtype
+    np.testing.assert_array_equal(native[2], expected[2])
+
+
+def test_big_endian_ply(tmp_path):
+    path = _save(tmp_path, "sphere.ply")
+    vertices, faces, _ = read_ply(path)
+
+    header = (
+        "ply\nformat binary_big_endian 1.0\n"
+        f"element vertex {len(vertices)}\n"
+        "property float x\nproperty float y\nproperty float z\n"
+        f"element face {len(faces)}\n"
+        "property list uchar int vertex_indices\nend_header\n"
+    )
+    records = np.empty(len(faces), [("n", "u1"), ("i", ">i4", (3,))])
+    records["n"], records["i"] = 3, faces
+    big_endian = str(tmp_path / "big_endian.ply")
+    with open(big_endian, "wb") as f:
+        f.write(header.encode())
+        f.write(vertices.astype(">f4").tobytes())
+        f.write(records.tobytes())
+
+    result = read_ply(big_endian)
+    np.testing.assert_allclose(result[0], vertices, rtol=1e-6)
+    np.testing.assert_array_equal(result[1], faces)
+
+
+def test_fallback(tmp_path):
+    # ascii files are left to pymeshlab
+    assert read_native(_save(tmp_path, "ascii.ply", binary=False)) is None
+    assert read_native(_save(tmp_path, "ascii.stl", binary=False)) is None
+    assert read_native(_save(tmp_path, "sphere.obj")) is None
+
+    # so are truncated files
+    path = _save(tmp_path, "truncated.ply")
+    with open(path, "r+b") as f:
+        f.truncate(1000)
+    assert read_native(path) is None
+
+
+@pytest.mark.parametrize(
+    "lines",
+    [
+        ["format binary_little_endian 1.0", "property float x"],
+        ["format", "element vertex 3"],
+        ["format binary_little_endian 1.0", "element vertex"],
+        ["format binary_little_endian 1.0", "element vertex -3"],
+        ["format binary_little_endian 1.0", "element vertex 3", "property float"],
+        [
+            "format binary_little_endian 1.0",
+            "element face 1",
+            "property list uchar vertex_indices",
+        ],
+    ],
+)
+def test_malformed_header(tmp_path, lines):
+    from napari_pymeshlab._native import _read_ply_header
+
+    path = tmp_path / "malformed.ply"
+    path.write_bytes("\n".join(["ply", *lines, "end_header", ""]).encode())
+    with open(path, "rb") as f, pytest.raises(ValueError):
+        _read_ply_header(f)
+    assert read_native(str(path)) is None
+
+
+@pytest.mark.parametrize("name", ["sphere.ply", "sphere.obj", "sphere.stl"])
+def test_write_round_trip(tmp_path, name):
+    vertices, faces, colors = _pymeshlab_read(_save(tmp_path, "colored.ply", True))
+    path = str(tmp_path / name)
+    assert write_native(path, vertices, faces, colors)
+
+    result = _pymeshlab_read(path)
+    if name.endswith(".stl"):
+        # STL has single precision coordinates and no colors
+        np.testing.assert_allclose(result[0], vertices, atol=1e-5)
+    else:
+        np.testing.assert_array_equal(result[0], vertices)
+        # OBJ colors are text floats, which MeshLab truncates back to bytes
+        atol = 1 if name.endswith(".obj") else 0
+        np.testing.assert_allclose(result[2], colors, atol=atol)
+    np.testing.assert_array_equal(result[1], faces)
+
+
+def test_write_without_meshset(tmp_path, monkeypatch):
+    from napari_pymeshlab import write_single_surface
+
+    vertices, faces, colors = _pymeshlab_read(_save(tmp_path, "colored.ply", True))
+    monkeypatch.setattr(ml, "MeshSet", None)
+    for name in ("sphere.ply", "sphere.obj", "sphere.stl"):
+        path = str(tmp_path / name)
+        assert write_single_surface(path, (vertices, faces, colors), {}) == [path]
+
+
+@pytest.mark.parametrize("writer", [write_ply, write_obj, write_stl])
+def test_write_memory(tmp_path, writer):
+    import tracemalloc
+
+    ms = ml.MeshSet()
+    ms.create_sphere(radius=10, subdiv=6)
+    mesh = ms.current_mesh()
+    vertices, faces = mesh.vertex_matrix(), mesh.face_matrix()
+    kwargs = {} if writer is write_stl else {"colors": colors_to_numpy(mesh, False)}
+
+    tracemalloc.start()
+    writer(str(tmp_path / "sphere"), vertices, faces, chunk_rows=1000, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # only a chunk of rows is converted at a time
+    assert peak < (vertices.nbytes + faces.nbytes) / 4
+
+
+def test_write_in_chunks(tmp_path):
+    vertices, faces, colors = _pymeshlab_read(_save(tmp_path, "colored.ply", True))
+    for writer, name in [(write_ply, "a.ply"), (write_obj, "a.obj")]:
+        writer(str(tmp_path / name), vertices, faces, colors, chunk_rows=7)
+        writer(str(tmp_path / ("b" + name[1:])), vertices, faces, colors)
+        assert (tmp_path / name).read_bytes() == (
+            tmp_path / ("b" + name[1:])
+        ).read_bytes()
+    write_stl(str(tmp_path / "a.stl"), vertices, faces, chunk_rows=7)
+    write_stl(str(tmp_path / "b.stl"), vertices, faces)
+    assert (tmp_path / "a.stl").read_bytes() == (tmp_path / "b.stl").read_bytes()
+
+
+def test_write_fallback(tmp_path):
+    vertices, faces, _ = _pymeshlab_read(_save(tmp_path, "sphere.ply"))
+    assert not write_native(str(tmp_path / "sphere.off"), vertices, faces)
@@ -0,0 +1,42 @@
+import numpy as np
+from napari_pymeshlab import (
+    MeshPipeline,
+    make_sphere,
+    laplacian_smooth,
+    simplification_clustering_decimation,
+)
+
+
+def test_pipeline_matches_single_steps():
+    surface = make_sphere()[0][0]
+
+    expected = simplification_clustering_decimation(laplacian_smooth(surface, 3), 5)
+
+    pipeline = (
+        MeshPipeline(surface)
+        .laplacian_smooth(3)
+        .simplification_clustering_decimation(5)
+    )
+    result = pipeline.to_surface()
+
+    # clustering may emit vertices in a different order, so compare as sets
+    assert result[1].shape == expected[1].shape
+    np.testing.assert_allclose(
+        np.sort(result[0], axis=0), np.sort(expected[0], axis=0), atol=1e-4
+    )
+    assert len(result[2]) == len(result[0])
+
+
+def test_pipeline_is_lazy():
+    surface = make_sphere()[0][0]
+    calls = []
+
+    pipeline = MeshPipeline(surface).add_step(lambda ms: calls.append(ms))
+    assert calls == []
+
+    pipeline.convex_hull().to_surface()
+    assert len(calls) == 1
+
+    # already-run steps are not repeated
+    pipeline.to_surface()
+    assert len(calls) == 1
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from napari_pymeshlab import (
+    get_precision,
+    make_sphere,
+    mesh_reader,
+    set_precision,
+    taubin_smooth,
+    write_single_surface,
+)
+from napari_pymeshlab._smooth import SmoothingBackend
+
+
+@pytest.fixture
+def single():
+    previous = get_precision()
+    set_precision("single")
+    try:
+        yield
+    finally:
+        set_precision(previous)
+
+
+def _sphere():
+    vertices, faces, _ = make_sphere(subdiv=4)[0][0]
+    return vertices, faces
+
+
+def test_reader(tmp_path, single):
+    path = str(tmp_path / "sphere.ply")
+    set_precision("double")
+    double = _sphere()
+    write_single_surface(path, double, {})
+    read_double = mesh_reader(path, use_cache=False)[0][0]
+
+    set_precision("single")
+    read_single = mesh_reader(path, use_cache=False)[0][0]
+    assert read_single[0].dtype == np.float32
+    assert read_single[0].nbytes * 2 == read_double[0].nbytes
+    np.testing.assert_allclose(read_single[0], read_double[0], rtol=1e-6)
+    np.testing.assert_array_equal(read_single[1], read_double[1])
+
+
+@pytest.mark.parametrize("backend", list(SmoothingBackend))
+def test_filters(single, backend):
+    vertices, faces = _sphere()
+    assert vertices.dtype == np.float32
+    smoothed = taubin_smooth((vertices, faces), backend=backend)[0]
+    assert smoothed.dtype == np.float32
+
+    set_precision("double")
+    expected = taubin_smooth((vertices.astype(np.float64), faces), backend=backend)
+    np.testing.assert_allclose(smoothed, expected[0], rtol=1e-5, atol=1e-4)
+
+
+def test_writer(tmp_path, single):
+    set_precision("double")
+    surface = _sphere()
+    write_single_surface(str(tmp_path / "double.ply"), surface, {})
+
+    set_precision("single")
+    write_single_surface(str(tmp_path / "single.ply"), surface, {})
+    # 12 bytes less for every vertex
+    saved = (tmp_path / "double.ply").stat().st_size
+    saved -= (tmp_path / "single.ply").stat().st_size
+    assert saved >= 12 * len(surface[0])
+
+    vertices = mesh_reader(str(tmp_path / "single.ply"), use_cache=False)[0][0][0]
+    assert vertices.dtype == np.float32
+    np.testing.assert_allclose(vertices, surface[0], rtol=1e-6)
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        set_precision("half")
+
+
+@pytest.fixture
+def spawn():
+    # workers started with spawn import the package afresh, without the
+    # settings of the parent
+    import multiprocessing
+
+    previous = multiprocessing.get_start_method(allow_none=True)
+    multiprocessing.set_start_method("spawn", force=True)
+    try:
+        yield
+    finally:
+        multiprocessing.set_start_method(previous, force=True)
+
+
+def test_workers(tmp_path, single, spawn):
+    from napari_pymeshlab import batch_taubin_smooth
+
+    surface = _sphere()
+    paths = [str(tmp_path / f"sphere_{i}.ply") for i in range(4)]
+    for path in paths:
+        write_single_surface(path, surface, {})
+    for data, _, _ in mesh_reader(paths, n_workers=2, use_cache=False):
+        assert data[0].dtype == np.float32
+
+    smoothed = batch_taubin_smooth([surface, surface], n_workers=2)
+    assert all(s[0].dtype == np.float32 for s in smoothed)
@@ -0,0 +1,160 @@
+import warnings
+
+import numpy as np
+import pymeshlab as ml
+import pytest
+from napari_pymeshlab import (
+    decimate_to,
+    make_sphere,
+    mesh_reader,
+    probe_mesh,
+    write_single_surface,
+)
+
+
+@pytest.fixture
+def mesh_set():
+    ms = ml.MeshSet()
+    ms.create_sphere(subdiv=3)
+    ms.compute_color_by_function_per_vertex(x="255", y="0", z="0")
+    return ms
+
+
+@pytest.mark.parametrize(
+    "name, binary",
+    [
+        ("sphere.ply", True),
+        ("sphere.ply", False),
+        ("sphere.stl", True),
+        ("sphere.stl", False),
+        ("sphere.obj", False),
+        ("sphere.off", False),
+    ],
+)
+def test_probe_mesh(tmp_path, mesh_set, name, binary):
+    path = str(tmp_path / name)
+    kwargs = {} if name.endswith((".obj", ".off")) else {"binary": binary}
+    mesh_set.save_current_mesh(path, **kwargs)
+    mesh = mesh_set.current_mesh()
+
+    info = probe_mesh(path, bounds=True)
+    assert info.n_faces == mesh.face_number()
+    if name.endswith(".stl"):
+        assert info.n_vertices is None and not info.has_colors
+    else:
+        assert info.n_vertices == mesh.vertex_number()
+        assert info.has_colors
+    if binary:
+        box = mesh.bounding_box()
+        np.testing.assert_allclose(info.bounds, [box.min(), box.max()], atol=1e-6)
+    else:
+        assert info.bounds is None
+
+
+def test_probe_mesh_unknown(tmp_path):
+    assert probe_mesh(str(tmp_path / "sphere.glb")) is None
+    path = tmp_path / "sphere.ply"
+    path.write_bytes(b"not a mesh")
+    with pytest.raises(ValueError):
+        probe_mesh(str(path))
+
+
+def test_obj_chunks(tmp_path, monkeypatch):
+    from napari_pymeshlab import _probe
+
+    path = str(tmp_path / "sphere.obj")
+    surface = make_sphere()[0][0]
+    write_single_surface(path, surface, {})
+    expected = probe_mesh(path)
+    # lines split across reads are counted once
+    monkeypatch.setattr(_probe, "_CHUNK_BYTES", 7)
+    assert probe_mesh(path) == expected
+    assert expected.n_vertices == len(surface[0])
+    assert expected.n_faces == len(surface[1])
+
+
+def test_decimate_to():
+    vertices, faces, _ = make_sphere(subdiv=5)[0][0]
+    colors = np.zeros((len(vertices), 4), dtype=np.uint8)
+    colors[:, 0] = 255
+    decimated = decimate_to((vertices, faces, colors), 2000)
+    assert 1000 < len(decimated[1]) <= 2000
+    assert decimated[2].shape == (len(decimated[0]), 4)
+    assert (decimated[2][:, 0] == 255).all()
+
+    surface = (vertices, faces, colors)
+    assert decimate_to(surface, len(faces)) is surface
+
+
+def test_reader_large(tmp_path, monkeypatch):
+    from napari_pymeshlab import _reader
+
+    path = str(tmp_path / "sphere.ply")
+    write_single_surface(path, make_sphere(subdiv=4)[0][0], {})
+    monkeypatch.setattr(_reader, "LARGE_MESH_FACES", 1000)
+
+    with pytest.warns(UserWarning, match="5,120 faces; pass max_faces"):
+        full = mesh_reader(path, use_cache=False)[0][0]
+    assert len(full[1]) == 5120
+
+    with pytest.warns(UserWarning, match="decimated to about 1,000"):
+        decimated = mesh_reader(path, use_cache=False, max_faces=1000)[0][0]
+    assert len(decimated[1]) <= 1000
+
+
+def test_reader_probes_headers_only(tmp_path, monkeypatch):
+    from napari_pymeshlab import _probe, _reader
+    from napari_pymeshlab._cache import MeshCache
+
+    surface = make_sphere(subdiv=4)[0][0]
+    for name in ("sphere.obj", "sphere.ply"):
+        write_single_surface(str(tmp_path / name), surface, {})
+    monkeypatch.setattr(_reader, "LARGE_MESH_FACES", 1000)
+    counted = []
+    count_lines = _probe._count_lines
+
+    def spy(path, *args, **kwargs):
+        counted.append(path)
+        return count_lines(path, *args, **kwargs)
+
+    monkeypatch.setattr(_probe, "_count_lines", spy)
+
+    # an OBJ file would be read twice to warn about it
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        mesh_reader(str(tmp_path / "sphere.obj"), use_cache=False)
+    assert not counted
+
+    cache = MeshCache(tmp_path / "cache", enabled=True)
+    monkeypatch.setattr(_reader, "mesh_cache", cache)
+    path = str(tmp_path / "sphere.ply")
+    with pytest.warns(UserWarning, match="5,120 faces"):
+        mesh_reader(path)
+    # files in the cache are not probed again
+    monkeypatch.setattr(_reader, "probe_mesh", None)
+    assert len(mesh_reader(path)[0][0][1]) == 5120
+
+
+def test_reader_malformed_header(tmp_path, monkeypatch):
+    from napari_pymeshlab import _reader
+
+    path = tmp_path / "sphere.ply"
+    surface = make_sphere()[0][0]
+    write_single_surface(str(path), surface, {})
+    monkeypatch.setattr(_reader, "LARGE_MESH_FACES", 10)
+
+    # a probe that fails leaves the file to the loaders
+    def fail(*args, **kwargs):
+        raise IndexError("probe failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(_reader, "probe_mesh", fail)
+        assert len(mesh_reader(str(path), use_cache=False)[0][0][1]) == len(surface[1])
+
+    # a malformed header is reported by pymeshlab, which is tried last
+    data = path.read_bytes()
+    start = data.index(b"element vertex")
+    path.write_bytes(data[:start] + b"property float w\n" + data[start:])
+    with pytest.raises(Exception) as error:
+        mesh_reader(str(path), use_cache=False)
+    assert type(error.value).__module__.startswith("pymeshlab")
@@ -29,3 +29,23 @@ def test_reader(tmp_path):
 def test_get_reader_pass():
     reader = get_mesh_reader("fake.file")
     assert reader is None
+
+
+def test_parallel_reader_keeps_order(tmp_path):
+    from napari_pymeshlab import mesh_reader
+
+    paths = []
+    for i in range(4):
+        path = str(tmp_path / f"sphere_{i}.ply")
+        vertices, faces, values = make_sphere()[0][0]
+        write_single_surface(path, (vertices * (i + 1), faces, values), {})
+        paths.append(path)
+
+    serial = mesh_reader(paths, n_workers=1)
+    parallel = mesh_reader(paths, n_workers=2)
+
+    assert len(parallel) == len(paths)
+    for (s, _, s_type), (p, _, p_type) in zip(serial, parallel):
+        assert s_type == p_type == "surface"
+        for s_array, p_array in zip(s, p):
+            np.testing.assert_array_equal(s_array, p_array)
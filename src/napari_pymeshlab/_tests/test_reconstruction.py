@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from napari_pymeshlab import make_shell
+from napari_pymeshlab._background import run_steps
+from napari_pymeshlab._reconstruction import (
+    screened_poisson_steps,
+    tile_grid,
+    tiled_screened_poisson_steps,
+)
+
+
+def test_tiled_reconstruction_matches_shell():
+    points = make_shell()[0][0]
+    extent = np.ptp(points, axis=0).max()
+    tile_size = extent / 2
+    assert tile_grid(points, tile_size)[1] == (2, 2, 2)
+
+    steps = tiled_screened_poisson_steps(points, tile_size, depth=5, n_workers=2)
+    total = next(steps)
+    yields = []
+    vertices, faces, colors = run_steps(steps, yields.append)
+    assert total == 1 + len(yields) == 1 + 8
+    assert faces.dtype == np.int32 and faces.shape[1] == 3
+    assert faces.min() == 0 and faces.max() == len(vertices) - 1
+    assert colors.shape == (len(vertices),)
+
+    # the pieces lie on the shell, like the untiled reconstruction
+    untiled, _, _ = run_steps(screened_poisson_steps(points, depth=5))
+    center = points.mean(axis=0)
+    radii = np.linalg.norm(vertices - center, axis=1)
+    untiled_radii = np.linalg.norm(untiled - center, axis=1)
+    assert abs(np.median(radii) - np.median(untiled_radii)) < 0.05 * extent
+
+
+def test_tiled_reconstruction_faces_belong_to_one_tile():
+    points = make_shell()[0][0]
+    tile_size = np.ptp(points, axis=0).max() / 2
+    vertices, faces, _ = run_steps(
+        tiled_screened_poisson_steps(points, tile_size, depth=5, n_workers=2)
+    )
+    # faces are partitioned between tiles, so none is duplicated
+    keys = np.sort(vertices[faces].round(6).reshape(len(faces), -1), axis=1)
+    assert len(np.unique(keys, axis=0)) == len(faces)
+
+
+def test_tiled_reconstruction_skips_sparse_tiles():
+    points = make_shell()[0][0]
+    with pytest.raises(ValueError):
+        run_steps(tiled_screened_poisson_steps(points, 20.0, min_tile_points=10**6))
+
+
+def test_tiled_reconstruction_stitches_tiles(monkeypatch):
+    from napari_pymeshlab import _reconstruction
+
+    points = make_shell()[0][0]
+    tile_size = np.ptp(points, axis=0).max() / 2
+    stitch = _reconstruction._stitch
+    stitched = {}
+
+    def spy(parts):
+        stitched["parts"] = parts
+        return stitch(parts)
+
+    monkeypatch.setattr(_reconstruction, "_stitch", spy)
+    vertices, faces, colors = run_steps(
+        tiled_screened_poisson_steps(points, tile_size, depth=5, n_workers=2)
+    )
+    parts = stitched["parts"]
+    # the shell is closed, so all open edges are along the tile boundaries
+    open_edges = sum(len(_reconstruction._boundary_edges(f)) for _, f, _ in parts)
+    assert len(_reconstruction._boundary_edges(faces)) < open_edges / 3
+    assert len(faces) > 0.95 * sum(len(f) for _, f, _ in parts)
+    assert len(colors) == len(vertices)
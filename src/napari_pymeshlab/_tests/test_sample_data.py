@@ -0,0 +1,32 @@
+import numpy as np
+from napari_pymeshlab import make_bunny, make_shell, make_sphere
+
+
+def test_sphere():
+    for subdiv in range(4):
+        (vertices, faces, values), kwargs, layer_type = make_sphere(subdiv, 2)[0]
+        assert layer_type == "surface"
+        assert vertices.shape == (10 * 4**subdiv + 2, 3)
+        assert faces.shape == (20 * 4**subdiv, 3) and faces.dtype == np.int32
+        assert values.shape == (len(vertices),)
+        np.testing.assert_allclose(np.linalg.norm(vertices, axis=1), 2)
+
+        # closed, and counterclockwise seen from outside
+        edges = np.stack([faces, np.roll(faces, -1, axis=1)], axis=2).reshape(-1, 2)
+        assert len(np.unique(edges, axis=0)) == len(edges)
+        assert len(np.unique(np.sort(edges, axis=1), axis=0)) == len(edges) // 2
+        a, b, c = (vertices[faces[:, i]] for i in range(3))
+        assert (np.einsum("ij,ij->i", a, np.cross(b, c)) > 0).all()
+
+
+def test_shell():
+    points = make_shell(5000, radius=3, seed=1)[0][0]
+    assert points.shape == (5000, 3)
+    np.testing.assert_allclose(np.linalg.norm(points, axis=1), 3)
+    np.testing.assert_array_equal(points, make_shell(5000, radius=3, seed=1)[0][0])
+
+
+def test_bunny():
+    points, kwargs, layer_type = make_bunny()[0]
+    assert layer_type == "points"
+    assert points.shape == (397, 3)
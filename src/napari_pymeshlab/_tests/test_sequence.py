@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+from napari_pymeshlab import (
+    MeshSequence,
+    find_sequences,
+    make_sphere,
+    mesh_reader,
+    write_single_surface,
+)
+from napari_pymeshlab._reader import get_mesh_reader
+from napari_pymeshlab._sequence import SequencePlayer
+
+
+def _write_sequence(directory, n_timepoints=5):
+    vertices, faces, values = make_sphere()[0][0]
+    paths = []
+    for t in range(n_timepoints):
+        path = str(directory / f"cell_t{t:03d}.ply")
+        write_single_surface(path, (vertices * (t + 1), faces, values), {})
+        paths.append(path)
+    return paths
+
+
+def test_find_sequences():
+    paths = [
+        "a/cell_t010.ply",
+        "a/cell_t002.ply",
+        "a/other.ply",
+        "a/cell_t001.ply",
+        "b/cell_t001.ply",
+        "a/mask_1_x.ply",
+        "a/cell_001.ply",
+        "a/cell_002.ply",
+        "a/cut001.ply",
+        "a/cut002.ply",
+        "a/Frame_2_ch1.ply",
+        "a/Frame_1_ch1.ply",
+    ]
+    assert find_sequences(paths) == [
+        ["a/cell_t001.ply", "a/cell_t002.ply", "a/cell_t010.ply"],
+        ["a/other.ply"],
+        ["b/cell_t001.ply"],
+        ["a/mask_1_x.ply"],
+        # numbered objects, not time points
+        ["a/cell_001.ply"],
+        ["a/cell_002.ply"],
+        ["a/cut001.ply"],
+        ["a/cut002.ply"],
+        ["a/Frame_1_ch1.ply", "a/Frame_2_ch1.ply"],
+    ]
+
+
+def test_sequence_loads_lazily(tmp_path):
+    paths = _write_sequence(tmp_path)
+    sequence = MeshSequence(paths, prefetch=1, use_cache=False)
+    assert sequence.frames.cache_info().currsize == 0
+
+    vertices, faces = sequence[2]
+    first, _ = sequence[0]
+    np.testing.assert_allclose(vertices, 3 * first)
+    assert faces.dtype == np.int32
+
+    sequence.prefetch(2)
+    for t in (1, 3):
+        sequence[t]
+    assert sequence.cached(4) is None
+    assert sequence.frames.cache_info().currsize == 4
+    sequence.close()
+
+
+def test_sequence_is_bounded(tmp_path):
+    paths = _write_sequence(tmp_path)
+    frame_bytes = sum(a.nbytes for a in MeshSequence(paths, use_cache=False)[0])
+    sequence = MeshSequence(paths, max_bytes=2 * frame_bytes, use_cache=False)
+    for t in range(len(sequence)):
+        sequence[t]
+    assert sequence.frames.cache_info().currsize == 2
+    assert sequence.cached(4) is not None and sequence.cached(0) is None
+
+
+def test_reader_directory(tmp_path):
+    _write_sequence(tmp_path)
+    write_single_surface(str(tmp_path / "other.ply"), make_sphere()[0][0], {})
+    assert get_mesh_reader(str(tmp_path)) is mesh_reader
+
+    layers = mesh_reader(str(tmp_path), use_cache=False)
+    assert len(layers) == 2
+    (vertices, faces, values), kwargs, layer_type = layers[0]
+    assert layer_type == "surface"
+    assert values.shape == (5, len(vertices))
+    assert isinstance(kwargs["metadata"]["mesh_sequence"], MeshSequence)
+    assert len(layers[1][0][0]) == len(vertices)
+
+    # lists of paths are separate layers unless asked otherwise
+    paths = sorted(str(tmp_path / name) for name in os.listdir(tmp_path))
+    assert len(mesh_reader(paths, use_cache=False)) == 6
+    assert len(mesh_reader(paths, use_cache=False, as_sequence=True)) == 2
+
+
+def test_player(qtbot, tmp_path):
+    from napari.components import ViewerModel
+
+    sequence = MeshSequence(_write_sequence(tmp_path), use_cache=False)
+    data, kwargs, _ = sequence.layer_data()
+    viewer = ViewerModel()
+    layer = viewer.add_surface(data, **kwargs)
+    player = SequencePlayer(viewer, layer, sequence)
+    first = layer.data[0]
+
+    viewer.dims.set_current_step(0, 3)
+    qtbot.waitUntil(lambda: layer.data[0] is not first)
+    np.testing.assert_allclose(layer.data[0], 4 * first)
+    assert layer.data[2].shape == (5, len(first))
+    assert viewer.dims.current_step[0] == 3
+
+    player.disconnect()
+    viewer.dims.set_current_step(0, 0)
+    np.testing.assert_allclose(layer.data[0], 4 * first)
+    sequence.close()
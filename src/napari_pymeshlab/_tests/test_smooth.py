@@ -0,0 +1,86 @@
+import numpy as np
+import pymeshlab as ml
+import pytest
+
+from napari_pymeshlab import (
+    SmoothingBackend,
+    laplacian_smooth,
+    make_sphere,
+    sparse_laplacian_smooth,
+    sparse_taubin_smooth,
+    taubin_smooth,
+)
+from napari_pymeshlab._smooth import topology_cache
+
+
+# the spheres have radius 100
+ATOL = 1e-4
+
+
+def _surfaces():
+    vertices, faces = make_sphere(subdiv=3)[0][0][:2]
+    rng = np.random.default_rng(0)
+    vertices = vertices + rng.normal(scale=1, size=vertices.shape)
+    # an open surface, with a vertex in no face left over
+    open_faces = faces[vertices[faces].mean(axis=1)[:, 2] > 0]
+    return {"closed": (vertices, faces), "open": (vertices, open_faces)}
+
+
+def _meshlab(vertices, faces, filter_name, **kwargs):
+    ms = ml.MeshSet()
+    ms.add_mesh(ml.Mesh(vertices, faces))
+    getattr(ms, filter_name)(**kwargs)
+    return ms.current_mesh().vertex_matrix()
+
+
+@pytest.mark.parametrize("name", ["closed", "open"])
+@pytest.mark.parametrize("cotangent", [True, False])
+def test_laplacian_matches_meshlab(name, cotangent):
+    vertices, faces = _surfaces()[name]
+    smoothed = sparse_laplacian_smooth(vertices, faces, 5, cotangent=cotangent)
+    expected = _meshlab(
+        vertices,
+        faces,
+        "apply_coord_laplacian_smoothing",
+        stepsmoothnum=5,
+        cotangentweight=cotangent,
+    )
+    assert np.abs(vertices - expected).max() > 0.1
+    np.testing.assert_allclose(smoothed, expected, atol=ATOL)
+
+
+@pytest.mark.parametrize("name", ["closed", "open"])
+def test_taubin_matches_meshlab(name):
+    vertices, faces = _surfaces()[name]
+    smoothed = sparse_taubin_smooth(vertices, faces, 0.6, -0.62, 5)
+    expected = _meshlab(
+        vertices,
+        faces,
+        "apply_coord_taubin_smoothing",
+        lambda_=0.6,
+        mu=-0.62,
+        stepsmoothnum=5,
+    )
+    np.testing.assert_allclose(smoothed, expected, atol=ATOL)
+
+
+def test_topology_is_cached():
+    vertices, faces = _surfaces()["closed"]
+    topology_cache.clear()
+    sparse_taubin_smooth(vertices, faces, step_smooth_num=1)
+    # other parameters, and another frame with the same connectivity
+    sparse_taubin_smooth(vertices, faces, 0.4, -0.45, 2)
+    sparse_laplacian_smooth(vertices * 2, faces.copy(), 1)
+    info = topology_cache.cache_info()
+    assert (info.misses, info.hits, info.currsize) == (1, 2, 1)
+
+
+def test_backends_agree():
+    surface = _surfaces()["closed"]
+    for smooth in (laplacian_smooth, taubin_smooth):
+        expected = smooth(surface)
+        vertices, faces, values = smooth(surface, backend=SmoothingBackend.sparse)
+        np.testing.assert_allclose(vertices, expected[0], atol=ATOL)
+        np.testing.assert_array_equal(faces, expected[1])
+        assert faces.dtype == expected[1].dtype
+        np.testing.assert_array_equal(values, expected[2])
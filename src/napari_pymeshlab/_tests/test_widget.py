@@ -0,0 +1,136 @@
+import time
+
+from napari_pymeshlab import MeshPipeline, make_shell, make_sphere
+from napari_pymeshlab._background import run_steps
+
+
+def test_reconstruction_steps():
+    from napari_pymeshlab._widget import _reconstruction_steps
+
+    points = make_shell()[0][0]
+    steps = _reconstruction_steps(points, "shell", depth=6)
+    yields = []
+    layer_data = run_steps(steps, yields.append)
+
+    assert len(yields) == 2
+    (vertices, faces, _), meta, layer_type = layer_data[0]
+    assert layer_type == "surface" and meta["name"] == "Reconstructed shell"
+    assert len(vertices) > 0 and faces.shape[1] == 3
+
+
+def test_pipeline_steps():
+    from napari_pymeshlab._widget import _pipeline_steps
+
+    pipeline = MeshPipeline(make_sphere()[0][0]).laplacian_smooth().convex_hull()
+    assert pipeline.pending == 2
+
+    steps = _pipeline_steps(pipeline)
+    assert next(steps) is None
+    yields = []
+    surface = run_steps(steps, yields.append)
+    assert len(yields) == 2 and pipeline.pending == 0
+    assert len(surface) == 3
+
+
+def test_reconstruction_steps_downsampled():
+    from napari_pymeshlab._widget import _downsampling_summary, _reconstruction_steps
+
+    points = make_shell()[0][0]
+    steps = _reconstruction_steps(points, "shell", max_points=500, depth=6)
+    yields = []
+    layer_data = run_steps(steps, yields.append)
+
+    assert len(yields) == 1 + 2
+    assert len(layer_data[0][0][0]) > 0
+    assert _downsampling_summary(1000, 250, 2.0).startswith(
+        "Downsampling removed 750 of 1,000 points (75%)"
+    )
+    assert "an estimated 6.0 s less" in _downsampling_summary(1000, 250, 2.0)
+
+
+def test_discrete_curvature_steps():
+    from napari_pymeshlab import CurvatureType
+    from napari_pymeshlab._widget import _discrete_curvature_steps
+
+    surface = make_sphere()[0][0]
+    steps = _discrete_curvature_steps(surface, CurvatureType.gauss)
+    yields = []
+    vertices, faces, values = run_steps(steps, yields.append)
+    assert len(yields) == 1
+    assert vertices is surface[0] and values.shape == (len(vertices),)
+
+
+def test_smoothing_steps():
+    from napari_pymeshlab._smooth import taubin_smooth_steps
+    from napari_pymeshlab._widget import _smoothing_steps
+
+    vertices, faces = make_sphere()[0][0][:2]
+    steps = _smoothing_steps(taubin_smooth_steps, vertices, faces, 0.5, -0.53, 4)
+    yields = []
+    smoothed, _, values = run_steps(steps, yields.append)
+    assert len(yields) == 4
+    assert smoothed.shape == vertices.shape and len(values) == len(vertices)
+
+
+def test_label_surface_steps():
+    import numpy as np
+
+    from napari_pymeshlab._widget import _label_surface_steps
+
+    labels = np.zeros((10, 10, 10), dtype=np.uint16)
+    labels[2:5, 2:5, 2:5] = 3
+    labels[6:9, 6:9, 6:9] = 4
+    steps = _label_surface_steps(
+        labels, "cells", (2, 1, 1), (0, 0, 0), False, n_workers=1
+    )
+    # one group per label, and the yield of the count itself
+    assert next(steps) == 3
+    layer_data = run_steps(steps)
+    assert [meta["name"] for _, meta, _ in layer_data] == ["cells 3", "cells 4"]
+    assert all(meta["scale"] == (2, 1, 1) for _, meta, _ in layer_data)
+
+
+def _counting_steps(n, log):
+    for i in range(n):
+        time.sleep(0.01)
+        log.append(i)
+        yield
+    return n
+
+
+def test_run_in_background(qtbot):
+    from napari_pymeshlab._background import run_in_background
+
+    log = []
+    future = run_in_background(_counting_steps, 5, log, desc="count", total=5)
+    qtbot.waitUntil(future.done, timeout=10_000)
+    assert future.result() == 5 and log == list(range(5))
+
+
+def test_cancel(qtbot):
+    from napari_pymeshlab._background import _RUNNING, cancel, run_in_background
+
+    log = []
+    future = run_in_background(
+        _counting_steps, 1000, log, desc="cancelled", total=1000, empty=[]
+    )
+    qtbot.waitUntil(lambda: len(log) > 2, timeout=10_000)
+    cancel("cancelled")
+    qtbot.waitUntil(future.done, timeout=10_000)
+    assert future.result() == [] and len(log) < 1000
+    qtbot.waitUntil(lambda: not _RUNNING["cancelled"], timeout=10_000)
+
+
+def test_reconstructions_at_once(qtbot):
+    from napari_pymeshlab._background import run_in_background
+    from napari_pymeshlab._reconstruction import screened_poisson_steps
+
+    points = make_shell()[0][0]
+    futures = [
+        run_in_background(screened_poisson_steps, points, depth=7, desc="spr")
+        for _ in range(2)
+    ]
+    qtbot.waitUntil(lambda: all(f.done() for f in futures), timeout=60_000)
+    for future in futures:
+        vertices, faces, _ = future.result()
+        assert len(vertices) > 0 and faces.shape[1] == 3
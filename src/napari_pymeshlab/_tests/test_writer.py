@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pytest
+from napari_pymeshlab import make_sphere, mesh_reader, write_multiple
+
+
+def _layers(n):
+    vertices, faces, colors = make_sphere()[0][0]
+    layers = [
+        ((vertices + 10 * i, faces, colors), {"name": f"cell {i}"}, "surface")
+        for i in range(n)
+    ]
+    return layers + [(vertices, {"name": "points"}, "points")]
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_write_directory(tmp_path, n_workers):
+    layers = _layers(4)
+    layers[2][1]["name"] = "cell 1"  # duplicate names get a suffix
+    paths = write_multiple(str(tmp_path / "cells"), layers, n_workers=n_workers)
+
+    assert [os.path.basename(p) for p in paths] == [
+        "cell 0.ply",
+        "cell 1.ply",
+        "cell 1_1.ply",
+        "cell 3.ply",
+    ]
+    for path, (surface, _, _) in zip(paths, layers):
+        vertices, faces, _ = mesh_reader(path)[0][0]
+        np.testing.assert_array_equal(vertices, surface[0])
+        np.testing.assert_array_equal(faces, surface[1])
+
+
+def test_write_directory_format(tmp_path):
+    paths = write_multiple(str(tmp_path / "cells.off"), _layers(2))
+    assert paths == [str(tmp_path / "cells" / f"cell {i}.off") for i in range(2)]
+    assert all(os.path.exists(p) for p in paths)
+
+
+def test_write_scene(tmp_path):
+    layers = _layers(3)
+    path = str(tmp_path / "scene.obj")
+    assert write_multiple(path, layers) == [path]
+
+    with open(path) as f:
+        objects = [line.strip() for line in f if line.startswith("o ")]
+    assert objects == ["o cell 0", "o cell 1", "o cell 2"]
+
+    vertices, faces, _ = mesh_reader(path)[0][0]
+    surfaces = [surface for surface, _, _ in layers[:3]]
+    np.testing.assert_array_equal(vertices, np.concatenate([s[0] for s in surfaces]))
+    offsets = np.cumsum([0] + [len(s[0]) for s in surfaces[:-1]])
+    np.testing.assert_array_equal(
+        faces, np.concatenate([s[1] + o for s, o in zip(surfaces, offsets)])
+    )
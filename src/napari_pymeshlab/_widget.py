@@ -1,12 +1,88 @@
+from concurrent.futures import Future
+import sys
+import time
+from typing import List
+
 from magicgui import magic_factory
-from napari.layers import Points
+from napari import Viewer
+from napari.layers import Labels, Points, Surface
 from napari.types import LayerDataTuple, SurfaceData
+from napari.utils.notifications import show_info
 import numpy as np
-import pymeshlab as ml
-from enum import Enum
 
+from ._background import add_cancel_button, run_in_background
+from ._clean import clean_mesh
+from ._convert import color_bytes, surface_layer_data
+from ._curvature import CurvatureBackend, discrete_curvature
+from ._downsample import voxel_downsample
+from ._labels import labels_to_surfaces_steps
+from ._lod import DEFAULT_THRESHOLDS, attach_lod, lod_steps
+from ._memo import filter_cache
+from ._pipeline import CurvatureType, MeshPipeline
+from ._reconstruction import (
+    screened_poisson_steps,
+    tiled_screened_poisson_steps,
+)
+from ._smooth import (
+    SmoothingBackend,
+    laplacian_smooth_steps,
+    smoothed_surface,
+    sparse_laplacian_smooth,
+    sparse_taubin_smooth,
+    taubin_smooth_steps,
+)
+
+# Future is generic, and napari adds the results of the futures widgets
+# return to the viewer, from Python 3.9; on 3.8 the widgets still import, and
+# run, but their results are not added
+if sys.version_info >= (3, 9):
+    _FutureLayerData = Future[LayerDataTuple]
+    _FutureLayerDataList = Future[List[LayerDataTuple]]
+    _FutureSurface = Future[SurfaceData]
+else:
+    _FutureLayerData = _FutureLayerDataList = _FutureSurface = Future
+
+
+def _downsampling_summary(n_points, n_kept, elapsed):
+    # normal estimation and reconstruction scale about linearly with the
+    # number of points, which gives an estimate of the time saved
+    saved = elapsed * (n_points / max(n_kept, 1) - 1)
+    return (
+        f"Downsampling removed {n_points - n_kept:,} of {n_points:,} points "
+        f"({1 - n_kept / n_points:.0%}). Reconstruction took {elapsed:.1f} s, "
+        f"an estimated {saved:.1f} s less than with all points."
+    )
+
+
+def _reconstruction_steps(
+    points, name, voxel_size=0, max_points=0, tile_size=0, tile_overlap=0.1, **params
+):
+    n_points = len(points)
+    if voxel_size > 0 or max_points > 0:
+        points = voxel_downsample(points, voxel_size or None, max_points or None)
+        yield
+
+    start = time.perf_counter()
+    if tile_size > 0:
+        surface = yield from tiled_screened_poisson_steps(
+            points, tile_size, tile_overlap, **params
+        )
+    else:
+        surface = yield from screened_poisson_steps(points, **params)
+    if len(points) < n_points:
+        show_info(
+            _downsampling_summary(n_points, len(points), time.perf_counter() - start)
+        )
+
+    return [surface_layer_data(surface, {"name": f"Reconstructed {name}"})]
 
-@magic_factory
+
+@magic_factory(
+    widget_init=add_cancel_button("Screened Poisson Reconstruction"),
+    voxel_size={"max": 1e9},
+    max_points={"max": 2**31 - 1},
+    tile_size={"max": 1e9},
+)
 def screened_poisson_reconstruction(
     points_layer: Points,
     n_neighbors: int = 10,
@@ -22,57 +98,214 @@ def screened_poisson_reconstruction(
     iters: int = 8,
     confidence: bool = False,
     preclean: bool = False,
-) -> LayerDataTuple:
+    voxel_size: float = 0,
+    max_points: int = 0,
+    tile_size: float = 0,
+    tile_overlap: float = 0.1,
+) -> _FutureLayerData:
     """
     Run screened poisson reconstruction on a set of points, using pymeshlab.
-    """
 
-    mesh = ml.Mesh(points_layer.data)
-
-    ms = ml.MeshSet()
-    ms.add_mesh(mesh)
-
-    # compute normals
-    ms.compute_normals_for_point_sets(
-        k=n_neighbors,  # number of neighbors
-        smoothiter=smooth_iter,
-        flipflag=flip,
+    The reconstruction runs in a worker process, started from a background
+    thread, and the surface is added to the viewer when it is done. Several
+    reconstructions can run at the same time.
+
+    With a ``voxel_size`` or ``max_points`` above 0, the points are first
+    replaced by the mean of the points in each cell of a voxel grid of that
+    size, or of the size that leaves at most ``max_points`` points. The
+    number of points removed and the time saved are shown as a notification.
+
+    With a ``tile_size`` above 0, the points are reconstructed in tiles of
+    that size, overlapping by ``tile_overlap`` of it, in parallel. This bounds
+    the memory needed for very large point clouds; ``depth`` then applies to
+    each tile. The tiles are reconstructed separately and their boundary
+    vertices merged afterwards, so small cracks can remain along the tile
+    boundaries.
+    """
+    total = 1 if tile_size > 0 else 2  # tiled runs update it once split
+    if voxel_size > 0 or max_points > 0:
+        total += 1
+
+    return run_in_background(
+        _reconstruction_steps,
+        np.asarray(points_layer.data),
+        points_layer.name,
+        voxel_size=voxel_size,
+        max_points=max_points,
+        tile_size=tile_size,
+        tile_overlap=tile_overlap,
+        n_neighbors=n_neighbors,
+        smooth_iter=smooth_iter,
+        flip=flip,
         viewpos=viewpos,
-    )
-    # run SPR
-    ms.surface_reconstruction_screened_poisson(
-        visiblelayer=False,
         depth=depth,
-        fulldepth=full_depth,
-        cgdepth=cg_depth,
+        full_depth=full_depth,
+        cg_depth=cg_depth,
         scale=scale,
-        samplespernode=samples_per_node,
-        pointweight=point_weight,
+        samples_per_node=samples_per_node,
+        point_weight=point_weight,
         iters=iters,
         confidence=confidence,
         preclean=preclean,
+        desc="Screened Poisson Reconstruction",
+        total=total,
+        empty=[],
     )
 
-    data = (
-        ms.current_mesh().vertex_matrix(),
-        ms.current_mesh().face_matrix(),
-        ms.current_mesh().vertex_color_matrix().T,
+
+@magic_factory(
+    widget_init=add_cancel_button("LOD pyramid"),
+    interactive_faces={"max": 2**31 - 1},
+)
+def lod_pyramid(
+    viewer: Viewer,
+    surface_layer: Surface,
+    thresholds: List[float] = list(DEFAULT_THRESHOLDS),
+    interactive_faces: int = 1_000_000,
+    idle_ms: int = 300,
+    use_cache: bool = True,
+) -> None:
+    """
+    Show a decimated copy of a large surface while navigating.
+
+    A level-of-detail pyramid of the surface is built in a background thread
+    with clustering decimation at each of the ``thresholds`` (in percent of
+    the bounding box diagonal). Once it is ready, the finest level with at
+    most ``interactive_faces`` faces is shown while the camera moves, and the
+    full surface once it has been still for ``idle_ms`` milliseconds.
+
+    With ``use_cache``, the pyramid is kept in the on-disk mesh cache, whether
+    or not the cache is enabled for reading files, so the surface opened
+    again does not need it rebuilt.
+    """
+
+    def _attach(future):
+        levels = future.result()
+        if levels:
+            attach_lod(viewer, surface_layer, levels, interactive_faces, idle_ms)
+
+    surface = surface_layer.data
+    colors = color_bytes(surface_layer.vertex_colors, len(surface[0]))
+    if colors is not None:
+        # the levels carry the colors in place of the values, see lod_steps
+        surface = (surface[0], surface[1], colors)
+    run_in_background(
+        lod_steps,
+        surface,
+        thresholds,
+        use_cache,
+        desc="LOD pyramid",
+        total=len(thresholds),
+    ).add_done_callback(_attach)
+
+
+def _label_surface_steps(labels, name, scale, translate, combine, **params):
+    surfaces = yield from labels_to_surfaces_steps(labels, combine=combine, **params)
+    meta = {"scale": scale, "translate": translate}
+    if combine:
+        return [
+            (
+                surfaces,
+                {"name": f"{name} surfaces", "colormap": "turbo", **meta},
+                "surface",
+            )
+        ]
+    return [
+        (surface, {"name": f"{name} {label_id}", **meta}, "surface")
+        for label_id, surface in surfaces.items()
+    ]
+
+
+@magic_factory(
+    widget_init=add_cancel_button("Mesh labels"),
+    min_voxels={"max": 2**31 - 1},
+)
+def mesh_labels(
+    labels_layer: Labels,
+    min_voxels: int = 1,
+    smooth_iterations: int = 10,
+    decimation_percentage: float = 0,
+    one_layer_per_label: bool = False,
+) -> _FutureLayerDataList:
+    """
+    Turn every label of a 3D labels layer into a surface.
+
+    Labels are meshed with marching cubes, smoothed with Taubin's method and,
+    with a ``decimation_percentage`` above 0, decimated, in parallel. The
+    result is one surface whose values are the label of each vertex, or with
+    ``one_layer_per_label`` one surface layer per label. Surfaces get the
+    scale and translation of the labels layer.
+    """
+    data = labels_layer.data[0] if labels_layer.multiscale else labels_layer.data
+    return run_in_background(
+        _label_surface_steps,
+        np.asarray(data),
+        labels_layer.name,
+        tuple(labels_layer.scale),
+        tuple(labels_layer.translate),
+        not one_layer_per_label,
+        min_voxels=min_voxels,
+        smooth_iterations=smooth_iterations,
+        decimation_percentage=decimation_percentage,
+        desc="Mesh labels",
+        total=1,  # updated once the labels are grouped
+        empty=[],
     )
 
-    return [(data, {"name": f"Reconstructed {points_layer.name}"}, "surface")]
 
+def _pipeline_steps(pipeline):
+    # iter_run yields the steps pending, which is not what run_in_background
+    # expects a yielded number to be
+    for _ in pipeline.iter_run():
+        yield
+    return pipeline.to_surface()
+
+
+def _filter_input(surface, clean):
+    """Vertices and faces of ``surface``, cleaned up if asked to."""
+    if clean:
+        return clean_mesh(surface[0], surface[1])[:2]
+    return surface[0], surface[1]
+
+
+def _discrete_curvature_steps(surface, curvature_type, clean=False):
+    vertices, faces = _filter_input(surface, clean)
+    values = discrete_curvature(vertices, faces, curvature_type)
+    yield
+    return vertices, faces, values
+
+
+def _run_pipeline(pipeline, desc):
+    # parameter sets tried before are served from the filter cache
+    key = pipeline.cache_key()
+    surface = filter_cache.get(key)
+    if surface is not None:
+        future = Future()
+        future.set_result(surface)
+        return future
+
+    future = run_in_background(
+        _pipeline_steps, pipeline, desc=desc, total=pipeline.pending + 1
+    )
+    future.add_done_callback(
+        lambda f: f.result() is not None and filter_cache.put(key, f.result())
+    )
+    return future
 
-@magic_factory
-def _convex_hull(surface: SurfaceData) -> SurfaceData:
-    return convex_hull(surface)
 
+@magic_factory(widget_init=add_cancel_button("Convex hull"))
+def _convex_hull(surface: SurfaceData, clean: bool = False) -> _FutureSurface:
+    return _run_pipeline(MeshPipeline(surface, clean).convex_hull(), "Convex hull")
 
-def convex_hull(surface: SurfaceData) -> SurfaceData:
+
+def convex_hull(surface: SurfaceData, clean: bool = False) -> SurfaceData:
     """Determine the convex hull of a surface
 
     Parameters
     ----------
     surface: napari.types.SurfaceData
+    clean: bool, optional
+        Clean the surface up first, see :func:`clean_mesh`.
 
     Returns
     -------
@@ -82,39 +315,56 @@ def convex_hull(surface: SurfaceData) -> SurfaceData:
     --------
     ..[0] https://pymeshlab.readthedocs.io/en/0.1.9/tutorials/apply_filter.html
     """
-    import pymeshlab
-
-    mesh = pymeshlab.Mesh(surface[0], surface[1])
-    ms = pymeshlab.MeshSet()
-    ms.add_mesh(mesh)
-    ms.set_current_mesh(0)
+    return MeshPipeline(surface, clean).convex_hull().to_surface()
 
-    try:
-        ms.convex_hull()
-    except AttributeError:
-        ms.generate_convex_hull()
 
-    mesh = ms.mesh(1)
+def _smoothing_steps(smooth_steps, vertices, faces, *args, clean=False):
+    vertices, faces = _filter_input((vertices, faces), clean)
+    smoothed = yield from smooth_steps(vertices, faces, *args)
+    return smoothed_surface(smoothed, faces)
 
-    faces = np.asarray(mesh.polygonal_face_list())
-    vertices = np.asarray(mesh.vertex_matrix())
-    values = np.asarray(mesh.vertex_color_array())
 
-    return (vertices, faces, values)
-
-
-@magic_factory
-def _laplacian_smooth(surface: SurfaceData, step_smooth_num: int = 10) -> SurfaceData:
-    return laplacian_smooth(surface, step_smooth_num)
+@magic_factory(widget_init=add_cancel_button("Laplacian smooth"))
+def _laplacian_smooth(
+    surface: SurfaceData,
+    step_smooth_num: int = 10,
+    backend: SmoothingBackend = SmoothingBackend.pymeshlab,
+    clean: bool = False,
+) -> _FutureSurface:
+    if SmoothingBackend(backend) is SmoothingBackend.sparse:
+        return run_in_background(
+            _smoothing_steps,
+            laplacian_smooth_steps,
+            surface[0],
+            surface[1],
+            step_smooth_num,
+            clean=clean,
+            desc="Laplacian smooth",
+            total=step_smooth_num,
+        )
+    return _run_pipeline(
+        MeshPipeline(surface, clean).laplacian_smooth(step_smooth_num),
+        "Laplacian smooth",
+    )
 
 
-def laplacian_smooth(surface: SurfaceData, step_smooth_num: int = 10) -> SurfaceData:
+def laplacian_smooth(
+    surface: SurfaceData,
+    step_smooth_num: int = 10,
+    backend: SmoothingBackend = SmoothingBackend.pymeshlab,
+    clean: bool = False,
+) -> SurfaceData:
     """
 
     Parameters
     ----------
     surface: napari.types.SurfaceData
     step_smooth_num: int, optional
+    backend: SmoothingBackend, optional
+        ``sparse`` smooths with :func:`sparse_laplacian_smooth`, which caches
+        the connectivity of the faces between calls.
+    clean: bool, optional
+        Clean the surface up first, see :func:`clean_mesh`.
 
     Returns
     -------
@@ -124,35 +374,40 @@ def laplacian_smooth(surface: SurfaceData, step_smooth_num: int = 10) -> Surface
     --------
     ..[0] https://pymeshlab.readthedocs.io/en/0.1.9/filter_list.html#laplacian_smooth
     """
-    import pymeshlab
-
-    mesh = pymeshlab.Mesh(surface[0], surface[1])
-    ms = pymeshlab.MeshSet()
-    ms.add_mesh(mesh)
-    ms.set_current_mesh(0)
-
-    try:
-        ms.laplacian_smooth(stepsmoothnum=step_smooth_num)
-    except AttributeError:
-        ms.apply_coord_laplacian_smoothing(stepsmoothnum=step_smooth_num)
-
-    mesh = ms.mesh(0)
-
-    faces = np.asarray(mesh.polygonal_face_list())
-    vertices = np.asarray(mesh.vertex_matrix())
-    values = np.ones((len(vertices)))
-
-    return (vertices, faces, values)
+    if SmoothingBackend(backend) is SmoothingBackend.sparse:
+        vertices, faces = _filter_input(surface, clean)
+        return smoothed_surface(
+            sparse_laplacian_smooth(vertices, faces, step_smooth_num), faces
+        )
+    return MeshPipeline(surface, clean).laplacian_smooth(step_smooth_num).to_surface()
 
 
-@magic_factory
+@magic_factory(widget_init=add_cancel_button("Taubin smooth"))
 def _taubin_smooth(
     surface: SurfaceData,
     lambda_: float = 0.5,
     mu: float = -0.53,
     step_smooth_num: int = 10,
-) -> SurfaceData:
-    return taubin_smooth(surface, lambda_, mu, step_smooth_num)
+    backend: SmoothingBackend = SmoothingBackend.pymeshlab,
+    clean: bool = False,
+) -> _FutureSurface:
+    if SmoothingBackend(backend) is SmoothingBackend.sparse:
+        return run_in_background(
+            _smoothing_steps,
+            taubin_smooth_steps,
+            surface[0],
+            surface[1],
+            lambda_,
+            mu,
+            step_smooth_num,
+            clean=clean,
+            desc="Taubin smooth",
+            total=step_smooth_num,
+        )
+    return _run_pipeline(
+        MeshPipeline(surface, clean).taubin_smooth(lambda_, mu, step_smooth_num),
+        "Taubin smooth",
+    )
 
 
 def taubin_smooth(
@@ -160,6 +415,8 @@ def taubin_smooth(
     lambda_: float = 0.5,
     mu: float = -0.53,
     step_smooth_num: int = 10,
+    backend: SmoothingBackend = SmoothingBackend.pymeshlab,
+    clean: bool = False,
 ) -> SurfaceData:
     """Smooth a surface using Taubin's method [1]
 
@@ -169,6 +426,11 @@ def taubin_smooth(
     lambda_: float, optional
     mu: float, optional
     step_smooth_num: int, optional
+    backend: SmoothingBackend, optional
+        ``sparse`` smooths with :func:`sparse_taubin_smooth`, which caches
+        the connectivity of the faces between calls.
+    clean: bool, optional
+        Clean the surface up first, see :func:`clean_mesh`.
 
     Returns
     -------
@@ -180,39 +442,32 @@ def taubin_smooth(
     ..[1] "Gabriel Taubin" A signal processing approach to fair surface design"
           SIGGRAPH 1995 doi:10.1145/218380.218473
     """
-    import pymeshlab
-
-    mesh = pymeshlab.Mesh(surface[0], surface[1])
-    ms = pymeshlab.MeshSet()
-    ms.add_mesh(mesh)
-    ms.set_current_mesh(0)
-
-    try:
-        ms.taubin_smooth(lambda_=lambda_, mu=mu, stepsmoothnum=step_smooth_num)
-
-    except AttributeError:
-        ms.apply_coord_taubin_smoothing(
-            lambda_=lambda_, mu=mu, stepsmoothnum=step_smooth_num
+    if SmoothingBackend(backend) is SmoothingBackend.sparse:
+        vertices, faces = _filter_input(surface, clean)
+        return smoothed_surface(
+            sparse_taubin_smooth(vertices, faces, lambda_, mu, step_smooth_num), faces
         )
-
-    mesh = ms.mesh(0)
-
-    faces = np.asarray(mesh.polygonal_face_list())
-    vertices = np.asarray(mesh.vertex_matrix())
-    values = np.ones((len(vertices)))
-
-    return (vertices, faces, values)
+    return (
+        MeshPipeline(surface, clean)
+        .taubin_smooth(lambda_, mu, step_smooth_num)
+        .to_surface()
+    )
 
 
-@magic_factory
+@magic_factory(widget_init=add_cancel_button("Clustering decimation"))
 def _simplification_clustering_decimation(
-    surface: SurfaceData, threshold_percentage: float = 1
-) -> SurfaceData:
-    return simplification_clustering_decimation(surface, threshold_percentage)
+    surface: SurfaceData, threshold_percentage: float = 1, clean: bool = False
+) -> _FutureSurface:
+    return _run_pipeline(
+        MeshPipeline(surface, clean).simplification_clustering_decimation(
+            threshold_percentage
+        ),
+        "Clustering decimation",
+    )
 
 
 def simplification_clustering_decimation(
-    surface: SurfaceData, threshold_percentage: float = 1
+    surface: SurfaceData, threshold_percentage: float = 1, clean: bool = False
 ) -> SurfaceData:
     """Cluster points of a surface to make it less complex
 
@@ -221,6 +476,8 @@ def simplification_clustering_decimation(
     surface: napari.types.SurfaceData
     threshold_percentage: float, optional
         between 0 and 100
+    clean: bool, optional
+        Clean the surface up first, see :func:`clean_mesh`.
 
     Returns
     -------
@@ -230,39 +487,14 @@ def simplification_clustering_decimation(
     --------
     ..[0] https://pymeshlab.readthedocs.io/en/0.1.9/filter_list.html#simplification_clustering_decimation
     """
-    import pymeshlab
-
-    mesh = pymeshlab.Mesh(surface[0], surface[1])
-    ms = pymeshlab.MeshSet()
-    ms.add_mesh(mesh)
-    ms.set_current_mesh(0)
-
-    try:
-        ms.simplification_clustering_decimation(
-            threshold=pymeshlab.Percentage(threshold_percentage)
-        )
-    except AttributeError:
-        ms.meshing_decimation_clustering(
-            threshold=pymeshlab.PercentageValue(threshold_percentage)
-        )
-    mesh = ms.mesh(0)
-
-    faces = np.asarray(mesh.polygonal_face_list())
-    vertices = np.asarray(mesh.vertex_matrix())
-    values = np.ones((len(vertices)))
-
-    return (vertices, faces, values)
-
-
-class CurvatureType(Enum):
-    mean = "Mean"
-    gauss = "Gauss"
-    k1 = "K1"
-    k2 = "K2"
-    approxmean = "ApproxMean"
+    return (
+        MeshPipeline(surface, clean)
+        .simplification_clustering_decimation(threshold_percentage)
+        .to_surface()
+    )
 
 
-@magic_factory
+@magic_factory(widget_init=add_cancel_button("Colorize curvature (apss)"))
 def _colorize_curvature_apss(
     surface: SurfaceData,
     filter_scale: float = 2,
@@ -270,14 +502,27 @@ def _colorize_curvature_apss(
     max_projection_iterations: int = 15,
     spherical_parameter: float = 1,
     curvature_type: CurvatureType = CurvatureType.mean,
-) -> SurfaceData:
-    return _colorize_curvature_apss(
-        surface,
-        filter_scale,
-        projection_accuracy,
-        max_projection_iterations,
-        spherical_parameter,
-        curvature_type,
+    backend: CurvatureBackend = CurvatureBackend.apss,
+    clean: bool = False,
+) -> _FutureSurface:
+    if CurvatureBackend(backend) is CurvatureBackend.discrete:
+        return run_in_background(
+            _discrete_curvature_steps,
+            surface,
+            curvature_type,
+            clean,
+            desc="Colorize curvature (discrete)",
+            total=1,
+        )
+    return _run_pipeline(
+        MeshPipeline(surface, clean).colorize_curvature_apss(
+            filter_scale,
+            projection_accuracy,
+            max_projection_iterations,
+            spherical_parameter,
+            curvature_type,
+        ),
+        "Colorize curvature (apss)",
     )
 
 
@@ -288,6 +533,8 @@ def colorize_curvature_apss(
     max_projection_iterations: int = 15,
     spherical_parameter: float = 1,
     curvature_type: CurvatureType = CurvatureType.mean,
+    backend: CurvatureBackend = CurvatureBackend.apss,
+    clean: bool = False,
 ) -> SurfaceData:
     """Colorize curvature
 
@@ -299,39 +546,28 @@ def colorize_curvature_apss(
     max_projection_iterations: int, optional
     spherical_parameter: float, optional
     curvature_type: CurvatureType, optional
+    backend: CurvatureBackend, optional
+        ``discrete`` computes the curvature with :func:`discrete_curvature`,
+        which is much faster and gives the curvature values themselves rather
+        than values decoded from colors. It ignores the four APSS parameters.
+    clean: bool, optional
+        Clean the surface up first, see :func:`clean_mesh`.
 
     Returns
     -------
     ..[1] https://pymeshlab.readthedocs.io/en/0.1.9/filter_list.html#colorize_curvature_apss
     """
-    import pymeshlab
-
-    mesh = pymeshlab.Mesh(surface[0], surface[1])
-    ms = pymeshlab.MeshSet()
-    ms.add_mesh(mesh)
-    ms.set_current_mesh(0)
-    try:
-        ms.compute_curvature_and_color_apss_per_vertex(
-            filterscale=filter_scale,
-            projectionaccuracy=projection_accuracy,
-            maxprojectioniters=max_projection_iterations,
-            sphericalparameter=spherical_parameter,
-            curvaturetype=curvature_type.value,
-        )
-
-    except AttributeError:
-        ms.colorize_curvature_apss(
-            filterscale=filter_scale,
-            projectionaccuracy=projection_accuracy,
-            maxprojectioniters=max_projection_iterations,
-            sphericalparameter=spherical_parameter,
-            curvaturetype=curvature_type.value,
+    if CurvatureBackend(backend) is CurvatureBackend.discrete:
+        vertices, faces = _filter_input(surface, clean)
+        return vertices, faces, discrete_curvature(vertices, faces, curvature_type)
+    return (
+        MeshPipeline(surface, clean)
+        .colorize_curvature_apss(
+            filter_scale,
+            projection_accuracy,
+            max_projection_iterations,
+            spherical_parameter,
+            curvature_type,
         )
-
-    mesh = ms.mesh(0)
-
-    faces = np.asarray(mesh.polygonal_face_list())
-    vertices = np.asarray(mesh.vertex_matrix())
-    values = np.asarray(mesh.vertex_color_array())
-
-    return (vertices, faces, values)
+        .to_surface()
+    )
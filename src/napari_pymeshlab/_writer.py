@@ -7,40 +7,163 @@ see: https://napari.org/plugins/stable/npe2_manifest_specification.html
 Replace code below according to your needs.
 """
 from __future__ import annotations
-from typing import TYPE_CHECKING, List, Any, Sequence, Tuple, Union
+import os
+import re
+from typing import TYPE_CHECKING, List, Any, Optional, Sequence, Tuple, Union
 
-import pymeshlab as ml
 import numpy as np
 
+from ._convert import as_vertices, color_bytes, colors_to_float
+from ._instrument import stage
+
 if TYPE_CHECKING:
     DataType = Union[Any, Sequence[Any]]
     FullLayerData = Tuple[DataType, dict, str]
 
 
+def _vertex_colors(data, meta, n_vertices):
+    """RGBA bytes of a surface, or None if it has no colors.
+
+    Colors are taken from the surface data, or else from the ``vertex_colors``
+    of its layer.
+    """
+    colors = color_bytes(data[2], n_vertices) if len(data) > 2 else None
+    if colors is None:
+        colors = color_bytes(meta.get("vertex_colors"), n_vertices)
+    return colors
+
+
 def write_single_surface(path: str, data: Any, meta: dict):
-    """Writes a single surface layer to file"""
-    colors = None
-    try:
-        vertices, faces, colors = data  # unwrap surface data
-    except ValueError:
-        vertices, faces = data
+    """Writes a single surface layer to file
+
+    Binary PLY, binary STL and OBJ files are streamed to disk straight from the
+    arrays. Other formats go through a pymeshlab ``MeshSet``. Vertex colors are
+    written from the third array of ``data`` if it holds colors, or else from
+    ``meta["vertex_colors"]``. In single precision (see ``set_precision``),
+    PLY and OBJ files get single precision coordinates.
+    """
+    from ._native import write_native
+
+    vertices, faces = data[:2]  # unwrap surface data
+    vertices = as_vertices(vertices)
+    colors = _vertex_colors(data, meta or {}, len(vertices))
+
+    if write_native(path, vertices, faces, colors):
+        return [path]
 
+    import pymeshlab as ml
 
-    if (colors is not None) and (type(colors) == np.ndarray) and (colors.shape[1] == 4):
-        mesh = ml.Mesh(vertices, faces, v_color_matrix=colors.T)
-    else:
-        mesh = ml.Mesh(vertices, faces)
+    with stage("to mesh", len(vertices), len(faces)) as s:
+        if colors is not None:
+            mesh = ml.Mesh(
+                vertices.astype(np.float64, copy=False),
+                faces,
+                v_color_matrix=colors_to_float(colors, np.float64),
+            )
+        else:
+            mesh = ml.Mesh(vertices.astype(np.float64, copy=False), faces)
 
-    ms = ml.MeshSet()  # create a mesh set
-    ms.add_mesh(mesh)
+        ms = ml.MeshSet()  # create a mesh set
+        ms.add_mesh(mesh)
+        s.output(mesh=mesh)
 
     # save the mesh
     # TODO: here are a lot of optional arguments to be set
-    ms.save_current_mesh(path)
+    with stage("save mesh", mesh=mesh):
+        ms.save_current_mesh(path)
 
     # TODO: how do we handle metadata?
     return [path]
 
-# def write_multiple(path: str, data: List[FullLayerData]):
-#     """Writes multiple layers of different types."""
-#     pass
+
+# formats that hold every layer in one file, as separate objects
+SCENE_EXTENSIONS = (".obj",)
+
+# format of the per-layer files when the path names a directory
+DEFAULT_EXTENSION = ".ply"
+
+
+def _file_names(names, extension):
+    """File names for layers, made safe and unique."""
+    used = set()
+    file_names = []
+    for i, name in enumerate(names):
+        stem = re.sub(r"[^\w\-. ]", "_", str(name)).strip(" .") or f"surface_{i}"
+        candidate, n = stem, 1
+        while candidate.lower() in used:
+            candidate = f"{stem}_{n}"
+            n += 1
+        used.add(candidate.lower())
+        file_names.append(candidate + extension)
+    return file_names
+
+
+def _with_colors(surface, meta):
+    # the workers only get the arrays, so colors of the layer go with them
+    colors = _vertex_colors(surface, meta, len(surface[0]))
+    return tuple(surface[:2]) if colors is None else (*surface[:2], colors)
+
+
+def _write_layer(item):
+    path, data = item
+    return write_single_surface(path, data, {})[0]
+
+
+def write_multiple(
+    path: str, data: List[FullLayerData], n_workers: Optional[int] = None
+):
+    """Writes several surface layers to a directory or to one scene file
+
+    With an ``.obj`` path, all layers go to that file, each as an object named
+    after its layer. Otherwise ``path`` without its extension is a directory,
+    created if needed, that gets one file per layer, named after the layer and
+    in the format of the extension (``.ply`` if there is none). Those files are
+    written in parallel, one process per file, unless there are fewer than
+    ``PARALLEL_MIN_PATHS`` of them.
+
+    Parameters
+    ----------
+    path : str
+    data : list of tuples
+        ``(data, meta, layer_type)`` of the layers; only surfaces are written.
+    n_workers : int, optional
+        Number of processes. Defaults to one per layer, up to the CPU count.
+        Pass 1 to write serially.
+
+    Returns
+    -------
+    list of str
+        The paths written.
+    """
+    from ._parallel import default_workers, map_shared
+    from ._reader import PARALLEL_MIN_PATHS
+
+    layers = [(d, meta) for d, meta, layer_type in data if layer_type == "surface"]
+    names = [meta.get("name", f"surface_{i}") for i, (_, meta) in enumerate(layers)]
+    root, extension = os.path.splitext(path)
+
+    if extension.lower() in SCENE_EXTENSIONS:
+        from ._native import write_obj_scene
+
+        def _meshes():
+            for name, (surface, meta) in zip(names, layers):
+                vertices, faces = as_vertices(surface[0]), np.asarray(surface[1])
+                colors = _vertex_colors(surface, meta, len(vertices))
+                yield name, vertices, faces, colors
+
+        return [write_obj_scene(path, _meshes())]
+
+    directory = root if extension else path
+    os.makedirs(directory, exist_ok=True)
+    items = [
+        (os.path.join(directory, file_name), _with_colors(surface, meta))
+        for file_name, (surface, meta) in zip(
+            _file_names(names, extension or DEFAULT_EXTENSION), layers
+        )
+    ]
+
+    if n_workers is None:
+        n_workers = default_workers(len(items))
+    if n_workers > 1 and len(items) >= PARALLEL_MIN_PATHS:
+        return map_shared(_write_layer, items, n_workers, share_inputs=True)
+    return [_write_layer(item) for item in items]